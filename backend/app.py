@@ -46,6 +46,9 @@ load_dotenv()
 
 # Create Flask app
 app = Flask(__name__)
+# Models hand back native ObjectIds; jsonify stringifies them at the response boundary
+from json_utils import MongoJSONProvider
+app.json = MongoJSONProvider(app)
 
 # ==================== CORS CONFIGURATION ====================
 # 🔧 DEPLOYMENT GUIDE: Comment/Uncomment the appropriate block before deployment
@@ -141,8 +144,13 @@ def cache_refresh():
         for key in cache_keys:
             cache_manager.invalidate(key)
         
-        # Fetch fresh data from Azure
+        # Drop in-process workbook cache so extractors re-download
+        from data_processor import invalidate_cache, load_all_dataframes
+        invalidate_cache()
+        
+        # Fetch fresh data from Azure (all three workbooks in parallel)
         print("☁️  Fetching fresh data from Azure...")
+        load_all_dataframes()
         cache_manager.set("device_yield", extract_device_yield_data())
         cache_manager.set("iv_repeatability", extract_iv_repeatability_data())
         cache_manager.set("all_data_full", get_all_data_full())
@@ -206,13 +214,11 @@ def create_safety_issue():
 @app.route('/api/safety/<issue_id>', methods=['PUT'])
 def update_safety_issue(issue_id):
     from flask import request
-    print(f"\n🔄 Updating safety issue: {issue_id}")
     result = data_api.update_safety_issue(issue_id, request.get_json())
     return result
 
 @app.route('/api/safety/<issue_id>', methods=['DELETE'])
 def delete_safety_issue(issue_id):
-    print(f"\n🗑️ Deleting safety issue: {issue_id}")
     result = data_api.delete_safety_issue(issue_id)
     return result
 
@@ -390,6 +396,10 @@ def clear_all_data_cache():
         
         print("\n🗑️ Clearing ALL MongoDB caches...")
         
+        # 0. Drop in-process workbook cache so the next request re-downloads
+        from data_processor import invalidate_cache
+        invalidate_cache()
+        
         # 1. Clear All Data
         cache_manager.invalidate("all_data_full")
         print("   ✅ Cleared: all_data_full")
@@ -432,17 +442,26 @@ def get_all_data_full_endpoint():
     Returns all_data_full with MongoDB caching for instant loading.
     Cache is refreshed automatically at 8 AM UTC daily.
     Add ?force_refresh=true to bypass cache and get fresh data.
+    Add ?format=columnar for stats as keys + (key, parameter, field) arrays instead of nested dicts.
     """
-    from flask import jsonify, request
-    from data_processor import get_all_data_full
+    from flask import jsonify, request, Response
+    from data_processor import get_all_data_full, get_all_data_full_json, get_all_data_full_columnar_json, invalidate_cache
+    from json_utils import json_response
     from datetime import timedelta
     
     try:
         # Check if force refresh requested (from Refresh button)
         force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
         
+        # Columnar form is served from the in-process memo only (MongoDB keeps the default form)
+        if request.args.get('format') == 'columnar':
+            if force_refresh:
+                invalidate_cache()
+            return Response(get_all_data_full_columnar_json(), mimetype='application/json')
+        
         if force_refresh:
             print("🔄 FORCE REFRESH: User clicked Refresh button - bypassing cache...")
+            invalidate_cache()
             data = get_all_data_full()
             
             # Update MongoDB cache with fresh data
@@ -453,7 +472,7 @@ def get_all_data_full_endpoint():
             except Exception as e:
                 print(f"⚠️ Failed to update MongoDB cache: {e}")
             
-            return jsonify(data)
+            return Response(get_all_data_full_json(), mimetype='application/json')
         
         # Try MongoDB cache first (instant - 0.5 seconds)
         try:
@@ -461,7 +480,7 @@ def get_all_data_full_endpoint():
             cached = cache_manager.get("all_data_full")
             if cached:
                 print("✅ Cache HIT: all_data_full (MongoDB - instant response)")
-                return jsonify(cached)
+                return json_response(cached)
         except ImportError as ie:
             print(f"⚠️ Cache manager not available: {ie} - fetching from Azure")
         except Exception as e:
@@ -479,7 +498,8 @@ def get_all_data_full_endpoint():
         except Exception as e:
             print(f"⚠️ Failed to cache in MongoDB: {e}")
         
-        return jsonify(data)
+        # Serialized once per loaded workbook
+        return Response(get_all_data_full_json(), mimetype='application/json')
     except Exception as e:
         print(f"❌ API Error in all-data-full: {e}")
         import traceback
@@ -614,6 +634,11 @@ def refresh_device_data():
     """Refresh device data from CSV files"""
     return device_data_api.refresh_data()
 
+@app.route('/api/stability/invalidate-data', methods=['POST'])
+def invalidate_device_data():
+    """Invalidate cached device data - called by the ETL job after it writes new files"""
+    return device_data_api.invalidate_data()
+
 @app.route('/api/stability/check-azure-files', methods=['GET'])
 def check_azure_files():
     """Check what files are available in Azure - for debugging"""
@@ -638,6 +663,16 @@ def get_stability_samples_grid_data():
     """Get grid data with sample counts (no positions)"""
     return stability_samples_api.get_grid_data()
 
+@app.route('/api/stability/samples/grid-counts', methods=['GET'])
+def get_stability_samples_grid_counts():
+    """Get sample counts per test type/temperature (no sample lists)"""
+    return stability_samples_api.get_grid_counts()
+
+@app.route('/api/stability/samples/changes', methods=['GET'])
+def get_stability_samples_changes():
+    """Get the samples change version (cheap poll target for the dashboard)"""
+    return stability_samples_api.get_changes()
+
 @app.route('/api/stability/samples/batch-add', methods=['POST'])
 def batch_add_samples():
     """Add multiple samples at once"""
@@ -726,6 +761,13 @@ def update_batch_priority_route(batch_id):
     priority = data.get('priority')
     return data_api.update_batch_priority(batch_id, priority)
 
+@app.route('/api/batches/priorities', methods=['PUT'])
+def update_batch_priorities_bulk_route():
+    """Update priorities for many batches in one request"""
+    from flask import request
+    data = request.get_json() or {}
+    return data_api.update_batch_priorities_bulk(data.get('priorities', []))
+
 # Batch location history
 @app.route('/api/batches/location/snapshot', methods=['POST'])
 def save_batch_location_snapshot():
@@ -1003,7 +1045,8 @@ def auto_remove_expired_devices_on_startup():
             return
         
         device_model = StabilityDeviceModel(stability_db)
-        expired_devices = device_model.check_expired_devices()
+        # Archive and delete all expired devices server-side (aggregation $merge into history + delete_many)
+        expired_devices, removed_count = device_model.remove_expired_devices('System')
         
         if not expired_devices:
             print("✅ No expired devices found")
@@ -1011,25 +1054,8 @@ def auto_remove_expired_devices_on_startup():
             return
         
         print(f"⏰ Found {len(expired_devices)} expired device(s)")
-        removed_count = 0
-        
         for device in expired_devices:
-            try:
-                print(f"   🗑️  Removing {device['device_id']} (expired {device['hours_over']:.2f}h ago)")
-                success = device_model.soft_delete(
-                    device['section_key'],
-                    device['subsection_key'],
-                    device['row'],
-                    device['col'],
-                    'System'
-                )
-                if success:
-                    removed_count += 1
-                    print(f"   ✅ Successfully removed {device['device_id']}")
-                else:
-                    print(f"   ❌ Failed to remove {device['device_id']}")
-            except Exception as e:
-                print(f"   ❌ Error removing {device['device_id']}: {e}")
+            print(f"   🗑️  Removed {device['device_id']} (expired {device['hours_over']:.2f}h ago)")
         
         stability_db.close_connection()
         print(f"🎯 Auto-removal complete: {removed_count}/{len(expired_devices)} devices removed\n")
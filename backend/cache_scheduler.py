@@ -32,12 +32,18 @@ def refresh_all_caches():
             get_all_data_full,
             extract_chart_data,
             extract_device_yield_data,
-            extract_iv_repeatability_data
+            extract_iv_repeatability_data,
+            invalidate_cache,
+            load_all_dataframes
         )
         from cache_manager import cache_manager
         
         total_start = time.time()
         
+        # Scheduled refresh must see the latest workbooks, not the in-process copy
+        invalidate_cache()
+        load_all_dataframes()  # download all three workbooks in parallel
+        
         # 1. Refresh All Data cache
         print("\n📊 1/4 Refreshing All Data (all_data_full)...")
         start_time = time.time()
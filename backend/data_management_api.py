@@ -5,12 +5,18 @@ Handles all CRUD operations for safety issues, kudos, and top issues
 import os
 import json
 import logging
-from datetime import datetime
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from flask import jsonify
-from pymongo import MongoClient
-from bson import ObjectId
+from pymongo import MongoClient, ReadPreference, WriteConcern, UpdateOne, DeleteOne
+import bson
+from bson import ObjectId, Binary
 from dotenv import load_dotenv
+from json_utils import json_response
 
 # Load environment variables
 load_dotenv()
@@ -24,7 +30,6 @@ class DataManagementAPI:
         self.database_name = os.getenv('DATABASE_NAME', 'passdown_db')
         self.client = None
         self.db = None
-        self._connect_to_mongodb()
         
         # Collection names
         self.COLLECTION_SAFETY = 'safety_issues'
@@ -33,6 +38,20 @@ class DataManagementAPI:
         self.COLLECTION_BATCH_PRIORITY = 'batch_priorities'
         self.COLLECTION_BATCH_LOCATION = 'batch_location_history'
         self.COLLECTION_BASELINE_BATCHES = 'baseline_batches'
+        
+        # Collection handles - bound once in _connect_to_mongodb
+        self._bind_collections()
+        self._connect_to_mongodb()
+        
+        # In-process cache for batch priorities (they change rarely)
+        self.PRIORITIES_CACHE_TTL = 30  # seconds
+        self._priorities_cache = None
+        self._priorities_cache_ts = 0
+        self._priorities_lock = threading.Lock()
+        
+        # Identical list queries running concurrently share one DB round trip
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
     
     def _connect_to_mongodb(self):
         """Establish MongoDB connection"""
@@ -50,9 +69,12 @@ class DataManagementAPI:
             self.db = self.client[self.database_name]
             # Test connection
             self.client.server_info()
+            self._bind_collections()
             
             # Create unique index to prevent duplicates
-            self.db['top_issues'].create_index('id', unique=True)
+            self.c_top_issues.create_index('id', unique=True)
+            # Index snapshot timestamps so history reads are a range scan
+            self.c_batch_location.create_index([('timestamp', -1)])
             logging.info("✅ MongoDB connection established")
         except Exception as e:
             logging.error(f"❌ MongoDB connection failed: {e}")
@@ -62,6 +84,37 @@ class DataManagementAPI:
             logging.error(f"Full traceback: {traceback.format_exc()}")
             self.client = None
             self.db = None
+            self._bind_collections()
+    
+    def _bind_collections(self):
+        """Cache Collection handles so handlers skip the self.db[name] lookup"""
+        db = self.db
+        self.c_safety = db[self.COLLECTION_SAFETY] if db is not None else None
+        self.c_kudos = db[self.COLLECTION_KUDOS] if db is not None else None
+        self.c_top_issues = db[self.COLLECTION_TOP_ISSUES] if db is not None else None
+        self.c_batch_priority = db[self.COLLECTION_BATCH_PRIORITY] if db is not None else None
+        self.c_batch_location = db[self.COLLECTION_BATCH_LOCATION] if db is not None else None
+        # Snapshot history is non-critical: w=1 inserts, reads may go to secondaries
+        self.c_batch_location_w1 = (self.c_batch_location.with_options(write_concern=WriteConcern(w=1))
+                                    if db is not None else None)
+        self.c_batch_location_secondary = (self.c_batch_location.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+                                           if db is not None else None)
+        self.c_baseline_batches = db[self.COLLECTION_BASELINE_BATCHES] if db is not None else None
+    
+    @staticmethod
+    def _oid(value):
+        """Cast an id string to ObjectId, raising ValueError on malformed input"""
+        if not ObjectId.is_valid(value):
+            raise ValueError(f"Invalid id: {value}")
+        return ObjectId(value)
+    
+    @staticmethod
+    def _int_id(value):
+        """Cast a numeric id, raising ValueError on malformed input"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid id: {value}")
     
     def _serialize_doc(self, doc):
         """Convert MongoDB document to JSON-serializable format"""
@@ -69,6 +122,27 @@ class DataManagementAPI:
             doc['_id'] = str(doc['_id'])
         return doc
     
+    def _coalesce(self, key, compute_func):
+        """Run compute_func once for all concurrent callers with the same key"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            future.set_result(compute_func())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+        return future.result()
+    
     # ==================== SAFETY ISSUES ====================
     
     def _get_safety_issues_data(self, limit=None, skip=0):
@@ -76,11 +150,18 @@ class DataManagementAPI:
         if self.db is None:
             raise Exception("Database not connected")
         
+        return self._coalesce(
+            (self.COLLECTION_SAFETY, limit, skip),
+            lambda: self._query_safety_issues(limit, skip)
+        )
+    
+    def _query_safety_issues(self, limit, skip):
+        """Run the paginated safety issues query"""
         # Get total count
-        total_count = self.db[self.COLLECTION_SAFETY].count_documents({})
+        total_count = self.c_safety.count_documents({})
         
         # Build query with pagination
-        query = self.db[self.COLLECTION_SAFETY].find().sort('date', -1)
+        query = self.c_safety.find().sort('date', -1)
         if skip > 0:
             query = query.skip(skip)
         if limit:
@@ -102,7 +183,7 @@ class DataManagementAPI:
         """Get all safety issues with optional pagination"""
         try:
             data = self._get_safety_issues_data(limit, skip)
-            return jsonify(data), 200
+            return json_response(data, 200)
         except Exception as e:
             logging.error(f"Error getting safety issues: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -114,7 +195,7 @@ class DataManagementAPI:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
             # Get the next ID (max + 1)
-            existing_issues = list(self.db[self.COLLECTION_SAFETY].find())
+            existing_issues = list(self.c_safety.find())
             next_id = max([item.get('id', 0) for item in existing_issues], default=0) + 1
             
             issue = {
@@ -127,7 +208,7 @@ class DataManagementAPI:
                 'timestamp': datetime.now().isoformat()
             }
             
-            result = self.db[self.COLLECTION_SAFETY].insert_one(issue)
+            result = self.c_safety.insert_one(issue)
             issue['_id'] = str(result.inserted_id)
             
             return jsonify({"success": True, "data": self._serialize_doc(issue)}), 201
@@ -141,12 +222,16 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            logging.info(f"🔄 Updating safety issue {issue_id} with data: {data}")
+            try:
+                oid = self._oid(issue_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
+            logging.debug("🔄 Updating safety issue %s with data: %s", issue_id, data)
             
             update_data = {}
             if 'done' in data:
                 update_data['done'] = data['done']
-                logging.info(f"📝 Setting done status to: {data['done']}")
             if 'issue' in data:
                 update_data['issue'] = data['issue']
             if 'person' in data:
@@ -154,12 +239,12 @@ class DataManagementAPI:
             if 'action' in data:
                 update_data['action'] = data['action']
             
-            result = self.db[self.COLLECTION_SAFETY].update_one(
-                {'_id': ObjectId(issue_id)},
+            result = self.c_safety.update_one(
+                {'_id': oid},
                 {'$set': update_data}
             )
             
-            logging.info(f"✅ Update result: matched={result.matched_count}, modified={result.modified_count}")
+            logging.debug("✅ Update result: matched=%s, modified=%s", result.matched_count, result.modified_count)
             
             if result.matched_count == 0:
                 return jsonify({"success": False, "error": "Issue not found"}), 404
@@ -176,14 +261,19 @@ class DataManagementAPI:
                 logging.error("❌ MongoDB not connected")
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            logging.info(f"🗑️ Attempting to delete safety issue: {issue_id}")
-            result = self.db[self.COLLECTION_SAFETY].delete_one({'_id': ObjectId(issue_id)})
+            try:
+                oid = self._oid(issue_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
+            logging.debug("🗑️ Attempting to delete safety issue: %s", issue_id)
+            result = self.c_safety.delete_one({'_id': oid})
             
             if result.deleted_count == 0:
-                logging.warning(f"⚠️ Safety issue not found: {issue_id}")
+                logging.warning("⚠️ Safety issue not found: %s", issue_id)
                 return jsonify({"success": False, "error": "Issue not found"}), 404
             
-            logging.info(f"✅ Successfully deleted safety issue: {issue_id}")
+            logging.debug("✅ Successfully deleted safety issue: %s", issue_id)
             return jsonify({"success": True, "message": "Issue deleted"}), 200
         except Exception as e:
             logging.error(f"❌ Error deleting safety issue {issue_id}: {e}")
@@ -196,11 +286,18 @@ class DataManagementAPI:
         if self.db is None:
             raise Exception("Database not connected")
         
+        return self._coalesce(
+            (self.COLLECTION_KUDOS, limit, skip),
+            lambda: self._query_kudos(limit, skip)
+        )
+    
+    def _query_kudos(self, limit, skip):
+        """Run the paginated kudos query"""
         # Get total count
-        total_count = self.db[self.COLLECTION_KUDOS].count_documents({})
+        total_count = self.c_kudos.count_documents({})
         
         # Build query with pagination
-        query = self.db[self.COLLECTION_KUDOS].find().sort('date', -1)
+        query = self.c_kudos.find().sort('date', -1)
         if skip > 0:
             query = query.skip(skip)
         if limit:
@@ -222,7 +319,7 @@ class DataManagementAPI:
         """Get all kudos entries with optional pagination"""
         try:
             data = self._get_kudos_data(limit, skip)
-            return jsonify(data), 200
+            return json_response(data, 200)
         except Exception as e:
             logging.error(f"Error getting kudos: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -234,7 +331,7 @@ class DataManagementAPI:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
             # Get the next ID (max + 1)
-            existing_kudos = list(self.db[self.COLLECTION_KUDOS].find())
+            existing_kudos = list(self.c_kudos.find())
             next_id = max([item.get('id', 0) for item in existing_kudos], default=0) + 1
             
             kudos = {
@@ -246,7 +343,7 @@ class DataManagementAPI:
                 'timestamp': datetime.now().isoformat()
             }
             
-            result = self.db[self.COLLECTION_KUDOS].insert_one(kudos)
+            result = self.c_kudos.insert_one(kudos)
             kudos['_id'] = str(result.inserted_id)
             
             return jsonify({"success": True, "data": self._serialize_doc(kudos)}), 201
@@ -260,7 +357,12 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            result = self.db[self.COLLECTION_KUDOS].delete_one({'_id': ObjectId(kudos_id)})
+            try:
+                oid = self._oid(kudos_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
+            result = self.c_kudos.delete_one({'_id': oid})
             
             if result.deleted_count == 0:
                 return jsonify({"success": False, "error": "Kudos not found"}), 404
@@ -286,29 +388,27 @@ class DataManagementAPI:
                 filter_query['status'] = status
             
             # Get total count
-            total_count = self.db[self.COLLECTION_TOP_ISSUES].count_documents(filter_query)
+            total_count = self.c_top_issues.count_documents(filter_query)
             
-            # Build query with pagination
-            query = self.db[self.COLLECTION_TOP_ISSUES].find(filter_query).sort('id', 1)
+            # Build pipeline with pagination; sr_no is an alias of id for frontend compatibility
+            pipeline = [{'$match': filter_query}, {'$sort': {'id': 1}}]
             if skip > 0:
-                query = query.skip(skip)
+                pipeline.append({'$skip': skip})
             if limit:
-                query = query.limit(limit)
+                pipeline.append({'$limit': limit})
+            pipeline.append({'$addFields': {'sr_no': '$id'}})
             
-            issues = list(query)
-            # Add sr_no as alias for id for frontend compatibility
-            for issue in issues:
-                issue['sr_no'] = issue.get('id')
+            issues = list(self.c_top_issues.aggregate(pipeline))
             serialized = [self._serialize_doc(issue) for issue in issues]
             
-            return jsonify({
+            return json_response({
                 "success": True, 
                 "data": serialized,
                 "total": total_count,
                 "count": len(serialized),
                 "skip": skip,
                 "limit": limit
-            }), 200
+            }, 200)
         except Exception as e:
             logging.error(f"Error getting top issues: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -329,7 +429,7 @@ class DataManagementAPI:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
             # Get next ID
-            last_issue = self.db[self.COLLECTION_TOP_ISSUES].find_one(sort=[('id', -1)])
+            last_issue = self.c_top_issues.find_one(sort=[('id', -1)])
             next_id = (last_issue['id'] + 1) if last_issue else 1
             
             # Create issue with Pending status by default
@@ -343,7 +443,7 @@ class DataManagementAPI:
                 'created_at': datetime.now().isoformat()
             }
             
-            result = self.db[self.COLLECTION_TOP_ISSUES].insert_one(issue)
+            result = self.c_top_issues.insert_one(issue)
             issue['_id'] = str(result.inserted_id)
             
             return jsonify({"success": True, "data": self._serialize_doc(issue)}), 201
@@ -366,6 +466,11 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
+            try:
+                issue_id = self._int_id(issue_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
             update_data = {}
             if 'description' in data:
                 update_data['description'] = data['description']
@@ -383,8 +488,8 @@ class DataManagementAPI:
             
             update_data['updated_at'] = datetime.now().isoformat()
             
-            result = self.db[self.COLLECTION_TOP_ISSUES].update_one(
-                {'id': int(issue_id)},
+            result = self.c_top_issues.update_one(
+                {'id': issue_id},
                 {'$set': update_data}
             )
             
@@ -411,7 +516,12 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            result = self.db[self.COLLECTION_TOP_ISSUES].delete_one({'id': int(issue_id)})
+            try:
+                issue_id = self._int_id(issue_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
+            result = self.c_top_issues.delete_one({'id': issue_id})
             
             if result.deleted_count == 0:
                 return jsonify({"success": False, "error": "Issue not found"}), 404
@@ -435,19 +545,34 @@ class DataManagementAPI:
     
     # ==================== BATCH PRIORITIES ====================
     
+    def _invalidate_priorities_cache(self):
+        """Drop the cached priorities so the next read goes to MongoDB"""
+        with self._priorities_lock:
+            self._priorities_cache = None
+            self._priorities_cache_ts = 0
+    
     def get_all_batch_priorities(self):
         """Get all batch priorities"""
         try:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            priorities = list(self.db[self.COLLECTION_BATCH_PRIORITY].find())
+            with self._priorities_lock:
+                if (self._priorities_cache is not None and
+                        time.monotonic() - self._priorities_cache_ts < self.PRIORITIES_CACHE_TTL):
+                    return json_response({"success": True, "data": self._priorities_cache}, 200)
+            
+            priorities = list(self.c_batch_priority.find())
             serialized = [self._serialize_doc(priority) for priority in priorities]
             
             # Convert to dictionary for easier lookup: { batch_id: priority }
             priorities_dict = {p['batch_id']: p['priority'] for p in serialized if 'batch_id' in p and 'priority' in p}
             
-            return jsonify({"success": True, "data": priorities_dict}), 200
+            with self._priorities_lock:
+                self._priorities_cache = priorities_dict
+                self._priorities_cache_ts = time.monotonic()
+            
+            return json_response({"success": True, "data": priorities_dict}, 200)
         except Exception as e:
             logging.error(f"Error getting batch priorities: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -460,7 +585,8 @@ class DataManagementAPI:
             
             # If priority is empty string or None, delete the entry
             if priority is None or priority == '' or priority == 'null':
-                self.db[self.COLLECTION_BATCH_PRIORITY].delete_one({'batch_id': batch_id})
+                self.c_batch_priority.delete_one({'batch_id': batch_id})
+                self._invalidate_priorities_cache()
                 return jsonify({"success": True, "message": "Priority cleared"}), 200
             
             # Accept any value as string (h/high/m/medium/l/low/1/2/3)
@@ -468,7 +594,7 @@ class DataManagementAPI:
             priority_str = str(priority).strip()
             
             # Upsert: update if exists, insert if not
-            result = self.db[self.COLLECTION_BATCH_PRIORITY].update_one(
+            result = self.c_batch_priority.update_one(
                 {'batch_id': batch_id},
                 {'$set': {
                     'batch_id': batch_id,
@@ -477,28 +603,91 @@ class DataManagementAPI:
                 }},
                 upsert=True
             )
+            self._invalidate_priorities_cache()
             
             return jsonify({"success": True, "message": "Priority updated"}), 200
         except Exception as e:
             logging.error(f"Error updating batch priority: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
     
+    def update_batch_priorities_bulk(self, items):
+        """Update priorities for many batches in a single bulk_write
+        items: list of {'batch_id': ..., 'priority': ...}; empty priority clears the entry
+        """
+        try:
+            if self.db is None:
+                return jsonify({"success": False, "error": "Database error"}), 500
+            
+            if not isinstance(items, list) or any(not isinstance(x, dict) or not x.get('batch_id') for x in items):
+                return jsonify({"success": False, "error": "Expected a list of {batch_id, priority}"}), 400
+            
+            if not items:
+                return jsonify({"success": True, "message": "No priorities to update", "updated": 0, "cleared": 0}), 200
+            
+            updated_at = datetime.now().isoformat()
+            ops = []
+            for x in items:
+                batch_id = x['batch_id']
+                priority = x.get('priority')
+                if priority is None or priority == '' or priority == 'null':
+                    ops.append(DeleteOne({'batch_id': batch_id}))
+                else:
+                    ops.append(UpdateOne(
+                        {'batch_id': batch_id},
+                        {'$set': {
+                            'batch_id': batch_id,
+                            'priority': str(priority).strip(),
+                            'updated_at': updated_at
+                        }},
+                        upsert=True
+                    ))
+            
+            result = self.c_batch_priority.bulk_write(ops, ordered=False)
+            self._invalidate_priorities_cache()
+            
+            return jsonify({
+                "success": True,
+                "message": "Priorities updated",
+                "updated": result.upserted_count + result.modified_count,
+                "cleared": result.deleted_count
+            }), 200
+        except Exception as e:
+            logging.error(f"Error bulk updating batch priorities: {e}")
+            return jsonify({"success": False, "error": str(e)}), 500
+    
     # ==================== BATCH LOCATION HISTORY ====================
     
+    SNAPSHOT_ENCODING = 'zlib+bson'
+    
+    def _compress_batches(self, batches_data):
+        """Pack batches list into a zlib-compressed BSON blob"""
+        return Binary(zlib.compress(bson.encode({'b': batches_data}), 6))
+    
+    def _decode_snapshot(self, snapshot):
+        """Restore 'batches' on compressed snapshots (older snapshots are stored raw)"""
+        if snapshot.get('encoding') == self.SNAPSHOT_ENCODING:
+            payload = snapshot.pop('payload')
+            snapshot['batches'] = bson.decode(zlib.decompress(payload))['b']
+            snapshot.pop('encoding', None)
+        return snapshot
+    
     def save_batch_location_snapshot(self, batches_data):
         """Save a snapshot of batch location data to MongoDB for historical tracking"""
         try:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
+            now = datetime.now()
             snapshot = {
-                'timestamp': datetime.now().isoformat(),
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'batches': batches_data,
+                'timestamp': now,
+                'date': now.strftime('%Y-%m-%d'),
+                'payload': self._compress_batches(batches_data),
+                'encoding': self.SNAPSHOT_ENCODING,
                 'count': len(batches_data)
             }
             
-            result = self.db[self.COLLECTION_BATCH_LOCATION].insert_one(snapshot)
+            # Snapshots are non-critical history; acknowledge from the primary only
+            result = self.c_batch_location_w1.insert_one(snapshot)
             
             return jsonify({
                 "success": True,
@@ -515,16 +704,26 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
+            # Snapshots store a BSON date; older ones have an ISO string, which
+            # sorts lexicographically so the same cutoff works for both
+            cutoff = datetime.now() - timedelta(days=days)
+            # History tolerates replica lag, so keep these reads off the primary
             snapshots = list(
-                self.db[self.COLLECTION_BATCH_LOCATION]
-                .find()
+                self.c_batch_location_secondary
+                .find({'$or': [
+                    {'timestamp': {'$gte': cutoff}},
+                    {'timestamp': {'$gte': cutoff.isoformat()}}
+                ]})
                 .sort('timestamp', -1)
-                .limit(days * 24)  # Assuming hourly snapshots
             )
             
-            serialized = [self._serialize_doc(snapshot) for snapshot in snapshots]
+            serialized = []
+            for snapshot in snapshots:
+                if isinstance(snapshot.get('timestamp'), datetime):
+                    snapshot['timestamp'] = snapshot['timestamp'].isoformat()
+                serialized.append(self._serialize_doc(self._decode_snapshot(snapshot)))
             
-            return jsonify({"success": True, "data": serialized}), 200
+            return json_response({"success": True, "data": serialized}, 200)
         except Exception as e:
             logging.error(f"Error getting batch location history: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -539,10 +738,10 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            batches = list(self.db[self.COLLECTION_BASELINE_BATCHES].find().sort('created_at', -1))
+            batches = list(self.c_baseline_batches.find().sort('created_at', -1))
             serialized = [self._serialize_doc(batch) for batch in batches]
             
-            return jsonify({"success": True, "data": serialized}), 200
+            return json_response({"success": True, "data": serialized}, 200)
         except Exception as e:
             logging.error(f"Error getting baseline batches: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -558,7 +757,7 @@ class DataManagementAPI:
                 return jsonify({"success": False, "error": "Batch and sheet are required"}), 400
             
             # Get the max ID from existing data
-            existing_batches = list(self.db[self.COLLECTION_BASELINE_BATCHES].find())
+            existing_batches = list(self.c_baseline_batches.find())
             next_id = max([item.get('id', 0) for item in existing_batches], default=0) + 1
             
             # Create new baseline batch entry
@@ -570,7 +769,7 @@ class DataManagementAPI:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.db[self.COLLECTION_BASELINE_BATCHES].insert_one(new_batch)
+            self.c_baseline_batches.insert_one(new_batch)
             
             return jsonify({
                 "success": True,
@@ -587,7 +786,12 @@ class DataManagementAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database error"}), 500
             
-            result = self.db[self.COLLECTION_BASELINE_BATCHES].delete_one({'id': int(batch_id)})
+            try:
+                batch_id = self._int_id(batch_id)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            
+            result = self.c_baseline_batches.delete_one({'id': batch_id})
             
             if result.deleted_count == 0:
                 return jsonify({"success": False, "error": "Baseline batch not found"}), 404
@@ -1,8 +1,17 @@
 
 import os, io
+import logging
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from statistics import mean, stdev, median, quantiles
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from json_utils import dumps
 
 # Optional: Azure SDK (faster). If not installed, we'll use requests for SAS URL and container listing.
 try:
@@ -10,8 +19,18 @@ try:
 except Exception:
     BlobServiceClient = ContainerClient = BlobClient = None
 
+# Optional: calamine (Rust) xlsx reader - much faster than openpyxl. Falls back to streaming openpyxl.
+# pandas only ships the engine from 2.2 on. The default numpy dtypes are kept: every consumer
+# reads memoized float64 arrays, so dtype_backend='pyarrow' would only add a conversion.
+try:
+    import python_calamine  # noqa: F401
+    XLSX_ENGINE = "calamine" if tuple(int(p) for p in pd.__version__.split('.')[:2]) >= (2, 2) else None
+except Exception:
+    XLSX_ENGINE = None
+
 # -------------------- ENV SETUP --------------------
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 # REQUIRED file name (enforced strictly)
 REQUIRED_BLOB_NAME = os.getenv("BLOB_NAME", "BaseLine.xlsx")
@@ -34,29 +53,283 @@ Supported configurations (set EXACTLY ONE of these modes):
 """
 
 
+# -------------------- BLOB CACHE --------------------
+# Parsed workbooks are memoized per process so back-to-back extractors don't
+# re-download and re-parse the same xlsx. Cached frames are shared: treat as read-only.
+# After the TTL the blob's ETag is checked first; an unchanged blob keeps its frame.
+BLOB_CACHE_TTL = int(os.getenv("BLOB_CACHE_TTL", "300"))  # seconds
+
+# Large blobs are fetched as parallel ranged GETs into one buffer
+DOWNLOAD_CONCURRENCY = 8
+DOWNLOAD_CHUNK_SIZE = 16 * 1024 * 1024  # 16 MiB per range
+_blob_cache = {}
+_blob_cache_lock = threading.Lock()
+_blob_load_locks = {}  # key -> Lock held while that key is (re)loaded, so one thread downloads per key
+
+# One pooled HTTP session for every SAS request, so TCP/TLS connections are reused across downloads
+HTTP_TIMEOUT = (5, 120)  # (connect, read) seconds
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32,
+                                       max_retries=Retry(total=3, backoff_factor=0.2)))
+
+# Azure source settings, read from the environment once (re-read after invalidate_cache())
+AZURE_SOURCE_ENV_VARS = ("BLOB_SAS_URL", "AZURE_CONTAINER_URL", "AZURE_CONTAINER_SAS",
+                         "AZURE_STORAGE_CONNECTION_STRING", "CONTAINER_NAME")
+_azure_env = None
+
+# Column-name lookups per loaded frame, keyed by id(df.columns); rebuilt whenever a frame is (re)loaded
+_column_index_cache = {}
+# Values derived from a loaded frame (batch codes, coerced columns, baseline flags), keyed by
+# (id(df), name); dropped together with the column lookups. Memoized arrays are read-only.
+_frame_memo_cache = {}
+
+
+def invalidate_cache():
+    """Drop all memoized workbooks so the next load fetches fresh data from Azure."""
+    global _azure_env
+    with _blob_cache_lock:
+        _blob_cache.clear()
+        _column_index_cache.clear()
+        _frame_memo_cache.clear()
+        _azure_env = None
+
+
+def _azure_source_env():
+    """Azure source settings as {env var: value}, read once instead of on every request."""
+    global _azure_env
+    env = _azure_env
+    if env is None:
+        env = _azure_env = {name: os.getenv(name) for name in AZURE_SOURCE_ENV_VARS}
+    return env
+
+
+def _cached_frame(key, loader, etag_probe=None):
+    """
+    Return the cached DataFrame for key, calling loader() on miss or expiry.
+    etag_probe: optional callable returning the blob's current ETag (or None); on expiry
+    an unchanged ETag renews the cached frame without downloading the blob again.
+    """
+    with _blob_cache_lock:
+        hit = _blob_cache.get(key)
+        if hit and time.monotonic() - hit[0] < BLOB_CACHE_TTL:
+            return hit[1]
+        load_lock = _blob_load_locks.setdefault(key, threading.Lock())
+    # Single flight: concurrent misses wait for the first thread's load instead of each downloading
+    with load_lock:
+        with _blob_cache_lock:
+            hit = _blob_cache.get(key)
+            if hit and time.monotonic() - hit[0] < BLOB_CACHE_TTL:
+                return hit[1]
+        etag = _probe_etag(etag_probe)
+        if hit and etag and etag == hit[2]:
+            with _blob_cache_lock:
+                _blob_cache[key] = (time.monotonic(), hit[1], etag)
+            return hit[1]
+        df = loader()
+        with _blob_cache_lock:
+            _blob_cache[key] = (time.monotonic(), df, etag)
+            _column_index_cache.clear()
+            _frame_memo_cache.clear()
+        return df
+
+
+def _probe_etag(etag_probe):
+    """Run an ETag probe; any failure just means 'unknown' so the full load reports the real error."""
+    if etag_probe is None:
+        return None
+    try:
+        return etag_probe()
+    except Exception:
+        return None
+
+
+def _column_index(df):
+    """Return (UPPER name -> column, [(lower name, column), ...]) for df, built once per loaded frame."""
+    cols = df.columns
+    hit = _column_index_cache.get(id(cols))
+    if hit is not None and hit[0] is cols:
+        return hit[1], hit[2]
+    colmap, lowered = {}, []
+    for c in cols:
+        colmap.setdefault(str(c).upper(), c)
+        lowered.append((str(c).lower(), c))
+    _column_index_cache[id(cols)] = (cols, colmap, lowered)
+    return colmap, lowered
+
+
+def _frame_memo(df, name, compute):
+    """Return compute(df), computed once per loaded frame and name."""
+    key = (id(df), name)
+    hit = _frame_memo_cache.get(key)
+    if hit is not None and hit[0] is df:
+        return hit[1]
+    value = compute(df)
+    _frame_memo_cache[key] = (df, value)
+    return value
+
+
+def _frame_memo_peek(df, name):
+    """The memoized value for df and name if it was already computed, else None."""
+    hit = _frame_memo_cache.get((id(df), name))
+    return hit[1] if hit is not None and hit[0] is df else None
+
+
+def _read_only(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+def _str_codes(df, column):
+    """
+    (row codes, unique labels) for df[column].astype(str), built once per loaded frame.
+    Rows share a code exactly when their astype(str) values are equal.
+    """
+    def compute(frame):
+        values = frame[column]
+        if values.dtype == object:
+            # Mixed cells hash alike across types (2045 == 2045.0) but stringify differently
+            # ('2045' vs '2045.0'), so object columns are grouped on the strings themselves
+            str_codes, labels = pd.factorize(values.astype(str).to_numpy(), use_na_sentinel=False)
+            return _read_only(str_codes), pd.Index(labels, dtype=object)
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        # Single-dtype column: str() per unique value, as pandas 2.x astype(str) does (missing values become 'nan')
+        str_codes, labels = pd.factorize(pd.Index([str(u) for u in uniques], dtype=object))
+        return _read_only(str_codes[codes]), pd.Index(labels)
+    return _frame_memo(df, ('str_codes', column), compute)
+
+
+def _str_labels(df, column) -> list:
+    """Sorted distinct df[column].dropna() values as str, taken from the memoized codes."""
+    def compute(frame):
+        codes, labels = _str_codes(frame, column)
+        present = np.unique(codes[frame[column].notna().to_numpy()])
+        return tuple(sorted(labels[present]))
+    return list(_frame_memo(df, ('str_labels', column), compute))
+
+
+def _str_equals(df, column, value) -> np.ndarray:
+    """Row mask for df[column].astype(str) == value, as an int compare on the memoized codes."""
+    codes, labels = _str_codes(df, column)
+    code = labels.get_indexer([value])[0]
+    return codes == code if code >= 0 else np.zeros(len(codes), dtype=bool)
+
+
+def _numeric_column(df, col) -> np.ndarray:
+    """df[col] coerced with pd.to_numeric(errors='coerce') as a float64 array, once per loaded frame."""
+    return _frame_memo(df, ('numeric', col), lambda frame: _read_only(
+        pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)))
+
+
+def _value_order(df, col) -> np.ndarray:
+    """Stable argsort of _numeric_column(df, col) (NaN last), once per loaded frame."""
+    return _frame_memo(df, ('value_order', col), lambda frame: _read_only(
+        np.argsort(_numeric_column(frame, col), kind='stable')))
+
+
+def _find_column(df, *needles, exact=()):
+    """First column named one of exact or whose lower-cased name contains any of needles, else None."""
+    def compute(frame):
+        for name, col in _column_index(frame)[1]:
+            if col in exact or any(n in name for n in needles):
+                return col
+        return None
+    return _frame_memo(df, ('find_column', needles, tuple(exact)), compute)
+
+
+def _match_column(df, name):
+    """Column matching name case-insensitively, else None."""
+    return _column_index(df)[0].get(name.upper())
+
+
+def _detect_data_columns(df):
+    """
+    (batch, sheet, baseline) columns of data.xlsx; the last matching column wins for each role.
+    A 'batch' column is never taken as sheet/baseline, and a sheet/sample column never as baseline.
+    """
+    def compute(frame):
+        batch_column = sheet_column = baseline_column = None
+        for name, col in _column_index(frame)[1]:
+            if 'batch' in name:
+                batch_column = col
+            elif 'sheet' in name or 'sample' in name:
+                sheet_column = col
+            elif 'baseline' in name:
+                baseline_column = col
+        return batch_column, sheet_column, baseline_column
+    return _frame_memo(df, 'data_columns', compute)
+
+
+def _parameter_columns(df, mapping) -> dict:
+    """{param: matching column or None} for a param -> column name mapping, resolved once per loaded frame."""
+    return dict(_frame_memo(df, ('parameter_columns', tuple(mapping.items())),
+                            lambda frame: {param: _match_column(frame, name) for param, name in mapping.items()}))
+
+
+def _parse_xlsx(buf, usecols=None) -> pd.DataFrame:
+    """
+    Parse an xlsx file-like buffer into a DataFrame (calamine engine when installed, else streaming openpyxl).
+    usecols: optional callable(column name) -> bool; only matching columns are kept.
+    """
+    if XLSX_ENGINE == "calamine":
+        return pd.read_excel(buf, engine="calamine", usecols=usecols)
+    return _parse_xlsx_read_only(buf, usecols)
+
+
+def _parse_xlsx_read_only(buf, usecols=None) -> pd.DataFrame:
+    """Parse the first sheet with openpyxl read_only mode (streams rows instead of building the DOM)."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(buf, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        # Skip fully blank rows like pd.read_excel does
+        records = [r for r in rows if any(v is not None for v in r)]
+    finally:
+        wb.close()
+    if usecols is not None:
+        keep = [i for i, name in enumerate(header) if usecols(name)]
+        header = [header[i] for i in keep]
+        records = [[r[i] for i in keep] for r in records]
+    return pd.DataFrame(records, columns=list(header))
+
+
 # -------------------- STRICT LOADERS --------------------
-def _read_xlsx_from_blob_sas_url(blob_sas_url: str) -> pd.DataFrame:
-    """Download BaseLine.xlsx via a single Blob SAS URL (exact file)."""
+def _download_from_blob_sas_url(blob_sas_url: str) -> io.BytesIO:
+    """Download BaseLine.xlsx into a buffer via a single Blob SAS URL (exact file)."""
     # Quick sanity: enforce URL targets REQUIRED_BLOB_NAME
     lower = blob_sas_url.lower()
     if not (lower.endswith(REQUIRED_BLOB_NAME.lower()) or f"/{REQUIRED_BLOB_NAME.lower()}?" in lower):
         raise FileNotFoundError(f"BLOB_SAS_URL must point to '{REQUIRED_BLOB_NAME}'.")
     if BlobClient is None:
-        import requests
-        r = requests.get(blob_sas_url)
+        r = _SESSION.get(blob_sas_url, stream=True, timeout=HTTP_TIMEOUT)
         r.raise_for_status()
-        return pd.read_excel(io.BytesIO(r.content))
-    data = BlobClient.from_blob_url(blob_sas_url).download_blob().readall()
-    return pd.read_excel(io.BytesIO(data))
+        return _stream_to_buffer(r)
+    bc = BlobClient.from_blob_url(blob_sas_url, max_chunk_get_size=DOWNLOAD_CHUNK_SIZE)
+    return _sdk_download_to_buffer(bc)
+
+
+def _etag_from_blob_sas_url(blob_sas_url: str):
+    """Current ETag of the blob behind a Blob SAS URL."""
+    if BlobClient is None:
+        return _SESSION.head(blob_sas_url, timeout=HTTP_TIMEOUT).headers.get("ETag")
+    return BlobClient.from_blob_url(blob_sas_url).get_blob_properties().etag
+
+
+def _read_xlsx_from_blob_sas_url(blob_sas_url: str, usecols=None) -> pd.DataFrame:
+    """Download BaseLine.xlsx via a single Blob SAS URL (exact file)."""
+    return _parse_xlsx(_download_from_blob_sas_url(blob_sas_url), usecols)
+
 
-def _strict_read_blob_from_container_sas(container_url: str, sas_token, blob_name: str):
+def _container_blob_url(container_url: str, sas_token, blob_name: str) -> str:
     """
     Accepts either:
     - combined container SAS in container_url (has '?'), or
     - split mode: container_url (no '?') + sas_token ("?sv=...").
     Builds: https://<acct>.blob.core.windows.net/<container>/<blob>?<token>
     """
-    import io, requests, pandas as pd
     from urllib.parse import urlsplit, urlunsplit
 
     if "?" in container_url:
@@ -74,44 +347,168 @@ def _strict_read_blob_from_container_sas(container_url: str, sas_token, blob_nam
         if not sas_token.startswith("?"):
             sas_token = "?" + sas_token
         blob_url = container_url.rstrip("/") + "/" + blob_name + sas_token
+    return blob_url
+
+
+def _etag_from_container_sas(container_url: str, sas_token, blob_name: str):
+    """Current ETag of blob_name via container SAS (None unless the HEAD succeeds)."""
+    head = _SESSION.head(_container_blob_url(container_url, sas_token, blob_name), timeout=HTTP_TIMEOUT)
+    return head.headers.get("ETag") if head.status_code == 200 else None
+
+
+def _download_from_container_sas(container_url: str, sas_token, blob_name: str) -> io.BytesIO:
+    """Download exactly blob_name via container SAS into a buffer. Raises if missing."""
+    blob_url = _container_blob_url(container_url, sas_token, blob_name)
 
     # Optional: print safe URL (without sig) for debugging
     safe = blob_url.split("&sig=")[0]
     print(f"🔐 Fetching: {safe}")
 
-    r = requests.get(blob_url, stream=True)
-    if r.status_code == 200:
-        return pd.read_excel(io.BytesIO(r.content))
-    if r.status_code == 404:
+    head = _SESSION.head(blob_url, timeout=HTTP_TIMEOUT)
+    if head.status_code == 404:
         raise FileNotFoundError(f"'{blob_name}' not found in container.")
-    if r.status_code == 403:
+    if head.status_code == 403:
         raise PermissionError("403 Forbidden: SAS lacks 'r', expired times, or IP restriction (sip) mismatch.")
+    if head.status_code != 200:
+        raise RuntimeError(f"Unexpected status {head.status_code} fetching blob.")
+
+    size = int(head.headers.get("Content-Length") or 0)
+    if size > DOWNLOAD_CHUNK_SIZE:
+        return _ranged_get(blob_url, size)
+
+    r = _SESSION.get(blob_url, stream=True, timeout=HTTP_TIMEOUT)
+    if r.status_code == 200:
+        return _stream_to_buffer(r)
     raise RuntimeError(f"Unexpected status {r.status_code} fetching blob.")
 
 
+def _stream_to_buffer(response) -> io.BytesIO:
+    """Copy a streamed requests response body straight into a buffer (no intermediate bytes)."""
+    buf = io.BytesIO()
+    response.raw.decode_content = True
+    shutil.copyfileobj(response.raw, buf)
+    buf.seek(0)
+    return buf
 
 
+def _sdk_download_to_buffer(blob_client) -> io.BytesIO:
+    """Parallel SDK download written directly into a buffer."""
+    buf = io.BytesIO()
+    blob_client.download_blob(max_concurrency=DOWNLOAD_CONCURRENCY).readinto(buf)
+    buf.seek(0)
+    return buf
 
-def _strict_read_blob_from_conn_str(conn_str: str, container: str, blob_name: str):
-    """Read exactly BaseLine.xlsx via connection string. Raises if missing."""
+
+def _ranged_get(blob_url: str, size: int) -> io.BytesIO:
+    """Fetch a blob as DOWNLOAD_CHUNK_SIZE ranges in parallel into a preallocated buffer."""
+    buf = io.BytesIO(bytes(size))
+    view = buf.getbuffer()
+
+    def fetch(start):
+        end = min(start + DOWNLOAD_CHUNK_SIZE, size) - 1
+        r = _SESSION.get(blob_url, headers={"Range": f"bytes={start}-{end}"}, timeout=HTTP_TIMEOUT)
+        if r.status_code != 206:
+            raise RuntimeError(f"Unexpected status {r.status_code} fetching bytes {start}-{end}.")
+        view[start:end + 1] = r.content
+
+    try:
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY) as pool:
+            list(pool.map(fetch, range(0, size, DOWNLOAD_CHUNK_SIZE)))
+    finally:
+        view.release()
+    return buf
+
+
+def _strict_read_blob_from_container_sas(container_url: str, sas_token, blob_name: str, usecols=None):
+    """Read exactly blob_name via container SAS. Raises if missing."""
+    return _parse_xlsx(_download_from_container_sas(container_url, sas_token, blob_name), usecols)
+
+
+def _download_from_conn_str(conn_str: str, container: str, blob_name: str) -> io.BytesIO:
+    """Download exactly blob_name via connection string. Raises if missing."""
     if BlobServiceClient is None:
         raise RuntimeError("azure-storage-blob is required for connection-string reads (pip install azure-storage-blob).")
-    bsc = BlobServiceClient.from_connection_string(conn_str)
+    bsc = BlobServiceClient.from_connection_string(conn_str, max_chunk_get_size=DOWNLOAD_CHUNK_SIZE)
     cont = bsc.get_container_client(container)
     bc = cont.get_blob_client(blob_name)
     if not bc.exists():
         raise FileNotFoundError(f"Required blob '{blob_name}' not found in container '{container}'.")
-    data = bc.download_blob().readall()
-    return pd.read_excel(io.BytesIO(data))
+    return _sdk_download_to_buffer(bc)
+
+
+def _etag_from_conn_str(conn_str: str, container: str, blob_name: str):
+    """Current ETag of blob_name via connection string."""
+    bsc = BlobServiceClient.from_connection_string(conn_str)
+    return bsc.get_blob_client(container, blob_name).get_blob_properties().etag
+
+
+def _strict_read_blob_from_conn_str(conn_str: str, container: str, blob_name: str, usecols=None):
+    """Read exactly BaseLine.xlsx via connection string. Raises if missing."""
+    return _parse_xlsx(_download_from_conn_str(conn_str, container, blob_name), usecols)
+
+
+# BaseLine.xlsx parameter -> column (case-insensitive); shared by the loader's column filter and extract_chart_data
+CHART_PARAMETERS = {
+    'PCE': 'PCE (%)_AVG',
+    'FF': 'FF (%)_AVG',
+    'Max Power': 'Max Power (mW/cm2)_AVG',
+    'HI': 'HI (%)_AVG',
+    'I_sc': 'J_sc (mA/cm2)_AVG',
+    'V_oc': 'V_oc (V)_AVG',
+    'R_series': 'R_series (Ohm.cm2)_AVG',
+    'R_shunt': 'R_shunt (Ohm.cm2)_AVG'
+}
+
+# data.xlsx parameter -> per-cell measurement column (case-insensitive); used by the sheet-level charts
+CELL_PARAMETERS = {
+    'PCE': 'PCE (%)',
+    'FF': 'FF (%)',
+    'Max Power': 'Max Power (mW/cm2)',
+    'HI': 'HI (%)',
+    'I_sc': 'J_sc (mA/cm2)',
+    'V_oc': 'V_oc (V)',
+    'R_series': 'R_series (Ohm.cm2)',
+    'R_shunt': 'R_shunt (Ohm.cm2)'
+}
+
+# Device_Yield.xlsx parameter -> (exact column names, lower-cased name fragments) of its failed-pixel column
+DEVICE_YIELD_PARAM_PROBES = {
+    'FF': (('FF',), ('ff (',)),
+    'J_sc': (('J_sc',), ('j_sc (', 'jsc')),
+    'Max Power': ((), ('max power', 'maxpower')),
+    'PCE': (('PCE',), ('pce (',)),
+    'R_series': ((), ('r_series', 'rseries')),
+    'R_shunt': ((), ('r_shunt', 'rshunt')),
+    'V_oc': (('V_oc',), ('v_oc (', 'voc')),
+}
+
+# Every Device_Yield.xlsx column extract_device_yield_data may read
+DEVICE_YIELD_COLUMN_HINTS = ('batch', 'total_pixels', 'total_failed_pixels') + tuple(
+    h for _, hints in DEVICE_YIELD_PARAM_PROBES.values() for h in hints)
+DEVICE_YIELD_EXACT_COLUMNS = {n for exact, _ in DEVICE_YIELD_PARAM_PROBES.values() for n in exact}
+
+
+def _baseline_usecols(name) -> bool:
+    """Keep the batch/id column, the parameter columns and their fuzzy alternatives."""
+    upper, lower = str(name).upper(), str(name).lower()
+    return ('batch' in lower or 'id' in lower
+            or any(upper == col.upper() or param.lower() in lower for param, col in CHART_PARAMETERS.items()))
+
+
+def _device_yield_usecols(name) -> bool:
+    """Keep the batch, pixel-count and per-parameter failure columns."""
+    lower = str(name).lower()
+    return name in DEVICE_YIELD_EXACT_COLUMNS or any(h in lower for h in DEVICE_YIELD_COLUMN_HINTS)
 
 
 def _load_baseline_df():
     """STRICT: load only 'BaseLine.xlsx' from Azure. If missing/inaccessible, raise. No local fallback."""
-    blob_sas_url = os.getenv("BLOB_SAS_URL")
-    container_url = os.getenv("AZURE_CONTAINER_URL")
-    sas_token = os.getenv("AZURE_CONTAINER_SAS")
-    conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    container = os.getenv("CONTAINER_NAME")
+    env = _azure_source_env()
+    blob_sas_url = env["BLOB_SAS_URL"]
+    container_url = env["AZURE_CONTAINER_URL"]
+    sas_token = env["AZURE_CONTAINER_SAS"]
+    conn_str = env["AZURE_STORAGE_CONNECTION_STRING"]
+    container = env["CONTAINER_NAME"]
     blob_name = REQUIRED_BLOB_NAME  # enforced exact name
 
     modes = sum(bool(x) for x in [blob_sas_url, (container_url and sas_token), (conn_str and container)])
@@ -124,24 +521,28 @@ def _load_baseline_df():
         )
 
     if blob_sas_url:
-        print("🔐 Loading BaseLine.xlsx via BLOB_SAS_URL (strict)")
-        return _read_xlsx_from_blob_sas_url(blob_sas_url)
+        return _cached_frame(("sas_url", blob_sas_url, blob_name),
+                             lambda: _read_xlsx_from_blob_sas_url(blob_sas_url, _baseline_usecols),
+                             lambda: _etag_from_blob_sas_url(blob_sas_url))
 
     if container_url and sas_token:
-        print("🔐 Loading BaseLine.xlsx via Container SAS (strict)")
-        return _strict_read_blob_from_container_sas(container_url, sas_token, blob_name)
+        return _cached_frame(("container_sas", container_url, blob_name),
+                             lambda: _strict_read_blob_from_container_sas(container_url, sas_token, blob_name, _baseline_usecols),
+                             lambda: _etag_from_container_sas(container_url, sas_token, blob_name))
 
     # connection string
-    print("🔐 Loading BaseLine.xlsx via Connection String (strict)")
-    return _strict_read_blob_from_conn_str(conn_str, container, blob_name)
+    return _cached_frame(("conn_str", container, blob_name),
+                         lambda: _strict_read_blob_from_conn_str(conn_str, container, blob_name, _baseline_usecols),
+                         lambda: _etag_from_conn_str(conn_str, container, blob_name))
 
 
 def _load_data_xlsx():
     """Load 'data.xlsx' from Azure (same location as BaseLine.xlsx)."""
-    container_url = os.getenv("AZURE_CONTAINER_URL")
-    sas_token = os.getenv("AZURE_CONTAINER_SAS")
-    conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    container = os.getenv("CONTAINER_NAME")
+    env = _azure_source_env()
+    container_url = env["AZURE_CONTAINER_URL"]
+    sas_token = env["AZURE_CONTAINER_SAS"]
+    conn_str = env["AZURE_STORAGE_CONNECTION_STRING"]
+    container = env["CONTAINER_NAME"]
     blob_name = "data.xlsx"  # hardcoded to data.xlsx
 
     modes = sum(bool(x) for x in [(container_url and sas_token), (conn_str and container)])
@@ -153,20 +554,23 @@ def _load_data_xlsx():
         )
 
     if container_url and sas_token:
-        print("🔐 Loading data.xlsx via Container SAS")
-        return _strict_read_blob_from_container_sas(container_url, sas_token, blob_name)
+        return _cached_frame(("container_sas", container_url, blob_name),
+                             lambda: _strict_read_blob_from_container_sas(container_url, sas_token, blob_name),
+                             lambda: _etag_from_container_sas(container_url, sas_token, blob_name))
 
     # connection string
-    print("🔐 Loading data.xlsx via Connection String")
-    return _strict_read_blob_from_conn_str(conn_str, container, blob_name)
+    return _cached_frame(("conn_str", container, blob_name),
+                         lambda: _strict_read_blob_from_conn_str(conn_str, container, blob_name),
+                         lambda: _etag_from_conn_str(conn_str, container, blob_name))
 
 
 def _load_device_yield_xlsx():
     """Load 'Device_Yield.xlsx' from Azure (same location as BaseLine.xlsx)."""
-    container_url = os.getenv("AZURE_CONTAINER_URL")
-    sas_token = os.getenv("AZURE_CONTAINER_SAS")
-    conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    container = os.getenv("CONTAINER_NAME")
+    env = _azure_source_env()
+    container_url = env["AZURE_CONTAINER_URL"]
+    sas_token = env["AZURE_CONTAINER_SAS"]
+    conn_str = env["AZURE_STORAGE_CONNECTION_STRING"]
+    container = env["CONTAINER_NAME"]
     blob_name = "Device_Yield.xlsx"
 
     modes = sum(bool(x) for x in [(container_url and sas_token), (conn_str and container)])
@@ -178,94 +582,292 @@ def _load_device_yield_xlsx():
         )
 
     if container_url and sas_token:
-        print("🔐 Loading Device_Yield.xlsx via Container SAS")
-        return _strict_read_blob_from_container_sas(container_url, sas_token, blob_name)
+        return _cached_frame(("container_sas", container_url, blob_name),
+                             lambda: _strict_read_blob_from_container_sas(container_url, sas_token, blob_name, _device_yield_usecols),
+                             lambda: _etag_from_container_sas(container_url, sas_token, blob_name))
 
     # connection string
-    print("🔐 Loading Device_Yield.xlsx via Connection String")
-    return _strict_read_blob_from_conn_str(conn_str, container, blob_name)
+    return _cached_frame(("conn_str", container, blob_name),
+                         lambda: _strict_read_blob_from_conn_str(conn_str, container, blob_name, _device_yield_usecols),
+                         lambda: _etag_from_conn_str(conn_str, container, blob_name))
+
+
+def load_all_dataframes():
+    """
+    Download and parse BaseLine.xlsx, data.xlsx and Device_Yield.xlsx concurrently
+    (wall time = slowest blob) and populate the blob cache.
+    Returns {'baseline': df, 'data': df, 'yield': df}; a source that fails is logged
+    and left out so its extractor reports the error on its own load.
+    """
+    loaders = {
+        'baseline': _load_baseline_df,
+        'data': _load_data_xlsx,
+        'yield': _load_device_yield_xlsx,
+    }
+    frames = {}
+    with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+        futures = {name: pool.submit(fn) for name, fn in loaders.items()}
+        for name, future in futures.items():
+            try:
+                frames[name] = future.result()
+            except Exception as e:
+                print(f"⚠️ Could not load {name} workbook: {e}")
+    return frames
 
 
 
 # -------------------- STATS HELPERS --------------------
+# Grouped stats fan out over columns only when there are cores and rows enough to pay for the threads
+STATS_WORKERS = os.cpu_count() or 1
+STATS_PARALLEL_MIN_ROWS = 200_000
+
 def calculate_box_plot_stats(values):
-    """Calculate box plot statistics from a list of values (keeps your original 'count = len/4')."""
-    if not values or len(values) == 0:
+    """Calculate box plot statistics from a list/array of values (keeps your original 'count = len/4')."""
+    a = np.asarray(values, dtype=np.float64)
+    if a.size == 0:
         return {
             'min': 0, 'q1': 0, 'median': 0, 'q3': 0, 'max': 0,
             'mean': 0, 'std': 0, 'count': 0
         }
 
-    sorted_values = sorted(values)
-    n = len(sorted_values)
+    # Single-group case of the vectorized helper (same quartile method as statistics.quantiles)
+    st = _grouped_box_stats(a, np.zeros(a.size, dtype=np.intp), 1)
+    result = {k: round(float(st[k][0]), 2) for k in ('min', 'q1', 'median', 'q3', 'max', 'mean', 'std')}
+    result['count'] = int(st['count'][0]) / 4  # preserved from your code
+    return result
+
+
+def _grouped_box_stats(values, codes, ngroups):
+    """
+    Vectorized per-group box plot stats.
+    values: float array, codes: group id per value (0..ngroups-1; negative = no group).
+    Quartiles follow statistics.quantiles(n=4) (exclusive method) for n >= 4 and
+    fall back to min/median/max below that, matching calculate_box_plot_stats.
+    Returns dict of arrays (length ngroups): min, q1, median, q3, max, mean, std, count.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    keep = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+
+    # Sort by (group, value) so every group is a contiguous, ordered slice
+    order = np.lexsort((values, codes))
+    v, c = values[order], codes[order]
+    counts = np.bincount(c, minlength=ngroups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has = counts > 0
+    last = starts + np.maximum(counts, 1) - 1
+    safe_v = v if v.size else np.zeros(1)
+
+    def pick(idx):
+        return np.where(has, safe_v[np.clip(idx, 0, max(v.size - 1, 0))], 0.0)
+
+    def exclusive_quartile(i):
+        # statistics.quantiles: m = n + 1, j = i*m // 4, interpolate data[j-1]..data[j]
+        num = i * (counts + 1)
+        j = num // 4
+        delta = num - 4 * j
+        lo = pick(starts + np.clip(j - 1, 0, None))
+        hi = pick(starts + np.minimum(j, counts - 1))
+        return (lo * (4 - delta) + hi * delta) / 4
+
+    vmin, vmax = pick(starts), pick(last)
+    mid_lo = pick(starts + (counts - 1) // 2)
+    mid_hi = pick(starts + counts // 2)
+    med = (mid_lo + mid_hi) / 2
+    q1 = np.where(counts >= 4, exclusive_quartile(1), vmin)
+    q3 = np.where(counts >= 4, exclusive_quartile(3), vmax)
+
+    sums = np.bincount(c, weights=v, minlength=ngroups)
+    mean_ = np.divide(sums, counts, out=np.zeros(ngroups), where=has)
+    sq = np.bincount(c, weights=(v - mean_[c]) ** 2, minlength=ngroups)
+    std = np.sqrt(np.divide(sq, counts - 1, out=np.zeros(ngroups), where=counts > 1))
+
+    return {'min': vmin, 'q1': q1, 'median': med, 'q3': q3, 'max': vmax,
+            'mean': mean_, 'std': std, 'count': counts}
+
+
+def _grouped_describe(values, codes, ngroups, value_order=None, return_sorted=False):
+    """
+    Per-group min/max/mean/std/count and linear q1/median/q3 (same as Series.quantile /
+    np.percentile) from a single sort of all groups plus bincount sums. NaN values are ignored;
+    std is the sample std (NaN for a single value) and empty groups get NaN.
+    value_order: optional stable argsort of values (e.g. memoized per column); the groups are then
+    laid out with a stable (radix) sort of the codes instead of a full lexsort.
+    Returns dict of arrays (length ngroups); with return_sorted, also (sorted values, group starts):
+    group g's non-NaN values, ascending, are sorted_values[starts[g]:starts[g] + count[g]].
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    keep = (codes >= 0) & ~np.isnan(values)
 
-    if n >= 4:
-        q_values = quantiles(sorted_values, n=4)
-        q1, median_val, q3 = q_values[0], q_values[1], q_values[2]
+    if value_order is None:
+        order = np.flatnonzero(keep)
+        order = order[np.lexsort((values[order], codes[order]))]
     else:
-        q1 = sorted_values[0]
-        median_val = median(sorted_values)
-        q3 = sorted_values[-1]
+        order = value_order[keep[value_order]]
+        group_codes = codes[order]
+        if ngroups <= np.iinfo(np.int16).max:
+            group_codes = group_codes.astype(np.int16)
+        order = order[np.argsort(group_codes, kind='stable')]
+    v, c = values[order], codes[order]
+    counts = np.bincount(c, minlength=ngroups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has = counts > 0
+    safe_v = v if v.size else np.full(1, np.nan)
+    top = max(v.size - 1, 0)
+
+    def quantile(q):
+        pos = (np.maximum(counts, 1) - 1) * q
+        lo = np.floor(pos).astype(np.intp)
+        t = pos - lo
+        a = safe_v[np.clip(starts + lo, 0, top)]
+        b = safe_v[np.clip(starts + np.minimum(lo + 1, np.maximum(counts, 1) - 1), 0, top)]
+        # np.percentile's lerp: a + (b-a)*t, taken from the upper end when t >= 0.5
+        diff = b - a
+        out = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+        return np.where(has, out, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_ = np.bincount(c, weights=v, minlength=ngroups) / counts
+        sq = np.bincount(c, weights=(v - mean_[c]) ** 2, minlength=ngroups)
+        std = np.sqrt(sq / (counts - 1))
+    std[counts < 2] = np.nan
+
+    described = {'min': quantile(0.0), 'max': quantile(1.0), 'mean': mean_, 'std': std, 'count': counts,
+                 'q1': quantile(0.25), 'median': quantile(0.5), 'q3': quantile(0.75)}
+    return (described, v, starts) if return_sorted else described
+
+
+# Baseline column values, normalized with str().strip().lower()
+BASELINE_YES_VALUES = ['yes', 'y', 'true', 't', '1']
+BASELINE_NO_VALUES = ['no', 'n', 'false', 'f', '0', 'nan', '']
+
+
+def _baseline_masks(col):
+    """Return (is_baseline, is_normal) bool arrays for a baseline column, normalizing each distinct value once."""
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    values_str = pd.Index([str(u) for u in uniques], dtype=object).str.strip().str.lower()
+    is_baseline = values_str.isin(BASELINE_YES_VALUES)
+    is_normal = values_str.isin(BASELINE_NO_VALUES) | pd.isna(uniques)
+    return is_baseline[codes], is_normal[codes]
+
+
+def _baseline_flags(df, baseline_column):
+    """(is_baseline, is_normal) bool arrays for the whole loaded frame, normalized once per frame."""
+    def compute(frame):
+        is_baseline, is_normal = _baseline_masks(frame[baseline_column])
+        return _read_only(is_baseline), _read_only(is_normal)
+    return _frame_memo(df, ('baseline', baseline_column), compute)
+
+
+def _baseline_split_rows(df, baseline_column):
+    """Rows that are baseline or normal (the rows split into the two box colors), once per frame."""
+    def compute(frame):
+        is_baseline, is_normal = _baseline_flags(frame, baseline_column)
+        return _read_only(is_baseline | is_normal)
+    return _frame_memo(df, ('baseline_split', baseline_column), compute)
+
+
+def _group_stats(df, cols, row_mask, keys, with_values=False):
+    """
+    Describe the memoized numeric columns of the masked rows, grouped by factorized key ids.
+    keys: per-row grouping arrays, already restricted to row_mask.
+    Returns (stats, sizes, values), all keyed by tuple group labels:
+      stats[col][key]  = {'min','q1','median','q3','max','mean','std','count'} (groups with count > 0;
+                         linear quantiles like Series.quantile, sample std, NaN for a single value)
+      sizes[key]       = rows in the group
+      values[col][key] = the group's non-NaN values, ascending (a slice of the sorted layout);
+                         only filled with_values
+    """
+    if not row_mask.any():
+        return {c: {} for c in cols}, {}, ({c: {} for c in cols} if with_values else {})
+    # One int64 id per composite key, in first-appearance order (like groupby(sort=False))
+    combined = np.zeros(int(row_mask.sum()), dtype=np.int64)
+    key_uniques = []
+    for key in keys:
+        key_codes, uniques = pd.factorize(key)
+        combined = combined * len(uniques) + key_codes
+        key_uniques.append(np.asarray(uniques))
+    group_ids, group_combined = pd.factorize(combined)
+    ngroups = len(group_combined)
+    labels = []
+    for uniques in reversed(key_uniques):
+        labels.append(uniques[group_combined % len(uniques)].tolist())
+        group_combined = group_combined // len(uniques)
+    labels = list(zip(*reversed(labels)))
+
+    # Describe over the whole column so the per-frame value order can be reused; unmasked rows get -1
+    frame_ids = np.full(len(row_mask), -1, dtype=np.int64)
+    frame_ids[row_mask] = group_ids
+
+    def describe(c):
+        return _grouped_describe(_numeric_column(df, c), frame_ids, ngroups, _value_order(df, c),
+                                 return_sorted=True)
+
+    # Columns are independent; the sorts release the GIL, so big workbooks describe them in parallel
+    workers = min(len(cols), STATS_WORKERS)
+    if workers > 1 and len(group_ids) >= STATS_PARALLEL_MIN_ROWS:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            described_cols = dict(zip(cols, pool.map(describe, cols)))
+    else:
+        described_cols = {c: describe(c) for c in cols}
 
-    return {
-        'min': round(min(sorted_values), 2),
-        'q1': round(q1, 2),
-        'median': round(median_val, 2),
-        'q3': round(q3, 2),
-        'max': round(max(sorted_values), 2),
-        'mean': round(mean(sorted_values), 2),
-        'std': round(stdev(sorted_values) if len(sorted_values) > 1 else 0, 2),
-        'count': len(sorted_values) / 4  # preserved from your code
-    }
+    stats, values = {}, {}
+    for c in cols:
+        described, sorted_values, starts = described_cols[c]
+        names = list(described)
+        columns = [described[name].tolist() for name in names]
+        stats[c] = {label: dict(zip(names, row)) for label, row in zip(labels, zip(*columns)) if row[4] > 0}
+        if with_values:
+            ends = starts + described['count']
+            values[c] = {label: sorted_values[a:b] for label, a, b in zip(labels, starts.tolist(), ends.tolist())}
+    sizes = dict(zip(labels, np.bincount(group_ids, minlength=ngroups).tolist()))
+    return stats, sizes, values
 
 
 # -------------------- CORE EXTRACTORS (STRICT) --------------------
 def extract_chart_data():
     """Extract chart data from strictly-loaded BaseLine.xlsx."""
-    parameter_mapping = {
-        'PCE': 'PCE (%)_AVG',
-        'FF': 'FF (%)_AVG',
-        'Max Power': 'Max Power (mW/cm2)_AVG',
-        'HI': 'HI (%)_AVG',
-        'I_sc': 'J_sc (mA/cm2)_AVG',
-        'V_oc': 'V_oc (V)_AVG',
-        'R_series': 'R_series (Ohm.cm2)_AVG',
-        'R_shunt': 'R_shunt (Ohm.cm2)_AVG'
-    }
+    parameter_mapping = CHART_PARAMETERS
     empty_stats = {'min': 0, 'q1': 0, 'median': 0, 'q3': 0, 'max': 0, 'mean': 0, 'std': 0, 'count': 0}
     chart_data = {k: [] for k in parameter_mapping}
 
     df = _load_baseline_df()  # <-- will raise if BaseLine.xlsx not accessible
     print(f"✅ Excel loaded. Shape: {df.shape}")
 
-    batch_column = next((c for c in df.columns if 'batch' in str(c).lower() or 'id' in str(c).lower()), None)
+    batch_column = _find_column(df, 'batch', 'id')
     batches = df[batch_column].unique() if batch_column else ['Baseline']
-    colmap = {str(c).upper(): c for c in df.columns}
+
+    # One factorize pass: every row gets its batch's group id (NaN batch -> -1)
+    if batch_column:
+        codes, uniques = pd.factorize(df[batch_column])
+    else:
+        codes, uniques = np.zeros(len(df), dtype=np.intp), pd.Index(['Baseline'])
+    group_of = {u: i for i, u in enumerate(uniques)}
 
     for param, col in parameter_mapping.items():
-        col_key = colmap.get(col.upper())
+        col_key = _match_column(df, col)
         if not col_key:
             # Try fuzzy match
-            for alt in df.columns:
-                if param.lower() in str(alt).lower():
-                    col_key = alt
-                    print(f"✅ Using alternative for {param}: {alt}")
-                    break
+            col_key = _find_column(df, param.lower())
+            if col_key:
+                print(f"✅ Using alternative for {param}: {col_key}")
         if not col_key:
             s = dict(empty_stats); s['batch'] = 'No Data'
             chart_data[param].append(s)
             continue
 
-        if batch_column:
-            for b in batches:
-                vals = pd.to_numeric(df.loc[df[batch_column] == b, col_key], errors='coerce').dropna().tolist()
-                s = calculate_box_plot_stats(vals) if vals else dict(empty_stats)
-                s['batch'] = str(b)
-                chart_data[param].append(s)
-        else:
-            vals = pd.to_numeric(df[col_key], errors='coerce').dropna().tolist()
-            s = calculate_box_plot_stats(vals) if vals else dict(empty_stats)
-            s['batch'] = 'Baseline'
+        vals = _numeric_column(df, col_key)
+        st = _grouped_box_stats(vals, codes, len(uniques))
+        for b in batches:
+            g = group_of.get(b, -1)
+            if g < 0 or st['count'][g] == 0:
+                s = dict(empty_stats)
+            else:
+                s = {k: round(float(st[k][g]), 2) for k in ('min', 'q1', 'median', 'q3', 'max', 'mean', 'std')}
+                s['count'] = int(st['count'][g]) / 4  # preserved from calculate_box_plot_stats
+            s['batch'] = str(b)
             chart_data[param].append(s)
 
     return chart_data
@@ -285,7 +887,7 @@ def extract_device_yield_data():
     df = _load_device_yield_xlsx()
     
     # Find Batch ID column
-    batch_column = next((c for c in df.columns if 'batch' in str(c).lower()), None)
+    batch_column = _find_column(df, 'batch')
     if not batch_column:
         raise ValueError("No Batch ID column found in Device_Yield.xlsx")
     
@@ -294,21 +896,16 @@ def extract_device_yield_data():
     print(f"✅ Found {len(batches)} batches: {batches}")
     
     # Find Total_Pixels and parameter failure columns
-    total_pixels_col = next((c for c in df.columns if 'total_pixels' in str(c).lower() and 'failed' not in str(c).lower()), None)
-    failed_pixels_col = next((c for c in df.columns if 'total_failed_pixels' in str(c).lower()), None)
+    total_pixels_col = next((c for name, c in _column_index(df)[1] if 'total_pixels' in name and 'failed' not in name), None)
+    failed_pixels_col = _find_column(df, 'total_failed_pixels')
     
     if not total_pixels_col or not failed_pixels_col:
         raise ValueError("Missing Total_Pixels or Total_Failed_Pixels columns in Device_Yield.xlsx")
     
     # Parameter failure columns
     param_columns = {
-        'FF': next((c for c in df.columns if c == 'FF' or 'ff (' in str(c).lower()), None),
-        'J_sc': next((c for c in df.columns if c == 'J_sc' or 'j_sc (' in str(c).lower() or 'jsc' in str(c).lower()), None),
-        'Max Power': next((c for c in df.columns if 'max power' in str(c).lower() or 'maxpower' in str(c).lower()), None),
-        'PCE': next((c for c in df.columns if c == 'PCE' or 'pce (' in str(c).lower()), None),
-        'R_series': next((c for c in df.columns if 'r_series' in str(c).lower() or 'rseries' in str(c).lower()), None),
-        'R_shunt': next((c for c in df.columns if 'r_shunt' in str(c).lower() or 'rshunt' in str(c).lower()), None),
-        'V_oc': next((c for c in df.columns if c == 'V_oc' or 'v_oc (' in str(c).lower() or 'voc' in str(c).lower()), None)
+        param: _find_column(df, *hints, exact=exact)
+        for param, (exact, hints) in DEVICE_YIELD_PARAM_PROBES.items()
     }
     
     # Build result structure
@@ -320,48 +917,32 @@ def extract_device_yield_data():
         'parameter_yields': {}  # Individual parameter yields
     }
     
-    # Initialize parameter yields
-    for param in param_columns.keys():
-        result['parameter_yields'][param] = []
-    
-    # Extract data for each batch
-    total_all_pixels = 0
-    total_all_failed = 0
-    
-    for batch in batches:
-        batch_data = df[df[batch_column] == batch]
-        if not batch_data.empty:
-            total_px = batch_data[total_pixels_col].iloc[0]
-            failed_px = batch_data[failed_pixels_col].iloc[0]
-            
-            total_px = int(total_px) if pd.notna(total_px) else 0
-            failed_px = int(failed_px) if pd.notna(failed_px) else 0
-            
-            # Calculate overall yield percentage for this batch
-            yield_pct = ((total_px - failed_px) / total_px * 100) if total_px > 0 else 0
-            
-            result['total_pixels'].append(total_px)
-            result['failed_pixels'].append(failed_px)
-            result['yield_percentages'].append(round(yield_pct, 2))
-            
-            # Calculate individual parameter yields
-            for param, col_name in param_columns.items():
-                if col_name:
-                    param_failed = batch_data[col_name].iloc[0]
-                    param_failed = int(param_failed) if pd.notna(param_failed) else 0
-                    param_yield = ((total_px - param_failed) / total_px * 100) if total_px > 0 else 0
-                    result['parameter_yields'][param].append(round(param_yield, 2))
-                else:
-                    result['parameter_yields'][param].append(0)
-            
-            total_all_pixels += total_px
-            total_all_failed += failed_px
-        else:
-            result['total_pixels'].append(0)
-            result['failed_pixels'].append(0)
-            result['yield_percentages'].append(0)
-            for param in param_columns.keys():
-                result['parameter_yields'][param].append(0)
+    # First row per batch (Device_Yield.xlsx has one row per batch), aligned to the sorted batch list
+    first_rows = df[df[batch_column].notna()].drop_duplicates(subset=batch_column).set_index(batch_column)
+    present = pd.Index(batches).isin(first_rows.index)
+    by_batch = first_rows.reindex(batches)
+
+    def counts(col):
+        """Pixel counts per batch as ints (missing/NaN -> 0)."""
+        return np.array([int(v) if ok and pd.notna(v) else 0 for v, ok in zip(by_batch[col], present)], dtype=np.int64)
+
+    def yield_pcts(failed):
+        """Yield % per batch; 0 where the batch is missing or has no pixels."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = (total_px - failed) / total_px * 100
+        return [round(float(v), 2) if ok else 0 for v, ok in zip(pct, present & (total_px > 0))]
+
+    total_px = counts(total_pixels_col)
+    failed_px = counts(failed_pixels_col)
+
+    result['total_pixels'] = total_px.tolist()
+    result['failed_pixels'] = failed_px.tolist()
+    result['yield_percentages'] = yield_pcts(failed_px)
+    for param, col_name in param_columns.items():
+        result['parameter_yields'][param] = yield_pcts(counts(col_name)) if col_name else [0] * len(batches)
+
+    total_all_pixels = int(total_px.sum())
+    total_all_failed = int(failed_px.sum())
     
     # Calculate overall yield
     overall_yield = ((total_all_pixels - total_all_failed) / total_all_pixels * 100) if total_all_pixels > 0 else 0
@@ -378,15 +959,24 @@ def extract_device_yield_data():
     return result
 
 
+def _parse_dates(column: pd.Series) -> pd.Series:
+    """Date column -> datetime64 (handles Excel serials); cache=True parses each repeated date once."""
+    if str(column.dtype) in ('float64', 'int64'):
+        try:
+            return pd.to_datetime(column, origin='1899-12-30', unit='D', cache=True)
+        except Exception:
+            return pd.to_datetime(column, unit='D', origin='unix', cache=True)
+    return pd.to_datetime(column, errors='coerce', cache=True)
+
+
 def extract_iv_repeatability_data():
     """Extract IV repeatability (daily avg + CV for last 10 days) from data.xlsx."""
     df = _load_data_xlsx()  # Changed from _load_baseline_df() to use data.xlsx
 
-    date_column = next((c for c in df.columns if 'date' in str(c).lower()), None)
+    date_column = _find_column(df, 'date')
     if not date_column:
         raise ValueError("No date column found for IV repeatability analysis.")
 
-    colmap = {str(c).upper(): c for c in df.columns}
     # Updated to include all 8 parameters matching charts_api.py
     iv_parameters = {
         'PCE': 'PCE (%)_AVG',
@@ -399,41 +989,36 @@ def extract_iv_repeatability_data():
         'R_shunt': 'R_shunt (Ohm.cm2)_AVG'
     }
 
-    # Convert to datetime (handles Excel serials)
-    if str(df[date_column].dtype) in ('float64', 'int64'):
-        try:
-            df[date_column] = pd.to_datetime(df[date_column], origin='1899-12-30', unit='D')
-        except Exception:
-            df[date_column] = pd.to_datetime(df[date_column], unit='D', origin='unix')
-    else:
-        df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
+    # Resolve columns on the loaded frame (its lookup index is cached)
+    param_cols = _parameter_columns(df, iv_parameters)
+    present_cols = [c for c in dict.fromkeys(param_cols.values()) if c is not None]
 
-    df = df.dropna(subset=[date_column])
-    if df.empty:
+    dates = _frame_memo(df, ('dates', date_column), lambda frame: _parse_dates(frame[date_column]))
+    valid = dates.notna().to_numpy()
+    if not valid.any():
         raise ValueError("No valid dates found.")
 
-    df = df.sort_values(by=date_column)
-    df['date_only'] = df[date_column].dt.date
-    unique_dates = sorted(df['date_only'].unique())
-    last_10 = unique_dates[-10:] if len(unique_dates) >= 10 else unique_dates
+    # Midnight-normalized datetime64 keys compare vectorized (no Python date objects)
+    date_only = dates.dt.normalize()
+    last_10 = pd.DatetimeIndex(date_only[valid].unique()).sort_values()[-10:]
+
+    # One groupby over the last 10 days on the memoized float64 columns - no frame copy or re-coercion
+    in_window = date_only.isin(last_10).to_numpy()
+    numeric = pd.DataFrame({c: _numeric_column(df, c)[in_window] for c in present_cols}, columns=present_cols)
+    grouped = numeric.groupby(date_only.to_numpy()[in_window])
+    means, stds, counts = grouped.mean(), grouped.std(ddof=1), grouped.count()
 
     daily_data = []
     for d in last_10:
-        day_df = df[df['date_only'] == d]
         point = {'date': d.strftime('%Y-%m-%d'), 'date_short': d.strftime('%m/%d')}
 
-        for param, col_name in iv_parameters.items():
-            col_key = colmap.get(col_name.upper())
-            if col_key and col_key in day_df.columns:
-                vals = pd.to_numeric(day_df[col_key], errors='coerce').dropna()
-                if len(vals) > 0:
-                    avg = round(mean(vals), 3)
-                    cv = round((stdev(vals) / avg * 100), 3) if len(vals) > 1 and avg != 0 else 0
-                    point[f'{param}_avg'] = avg
-                    point[f'{param}_cv'] = cv
-                else:
-                    point[f'{param}_avg'] = 0
-                    point[f'{param}_cv'] = 0
+        for param, col_key in param_cols.items():
+            n = int(counts.at[d, col_key]) if col_key is not None else 0
+            if n > 0:
+                avg = round(float(means.at[d, col_key]), 3)
+                cv = round(float(stds.at[d, col_key]) / avg * 100, 3) if n > 1 and avg != 0 else 0
+                point[f'{param}_avg'] = avg
+                point[f'{param}_cv'] = cv
             else:
                 point[f'{param}_avg'] = 0
                 point[f'{param}_cv'] = 0
@@ -458,36 +1043,38 @@ def get_all_parameters():
 
 
 # -------------------- ALL DATA FUNCTIONS --------------------
+def _sheets_by_batch(df, batch_column, sheet_column, batches):
+    """{batch: sorted sheet labels} from one pass over the (batch, sheet) code pairs of rows with a sheet."""
+    batch_codes, batch_labels = _str_codes(df, batch_column)
+    sheet_codes, sheet_labels = _str_codes(df, sheet_column)
+    has_sheet = df[sheet_column].notna().to_numpy()
+    n_sheets = len(sheet_labels)
+    pair_ids = np.unique(batch_codes[has_sheet].astype(np.int64) * n_sheets + sheet_codes[has_sheet])
+    sheets_by_batch = {}
+    for batch, sheet_name in zip(batch_labels[pair_ids // n_sheets], sheet_labels[pair_ids % n_sheets]):
+        sheets_by_batch.setdefault(batch, []).append(sheet_name)
+    return {batch: sorted(sheets_by_batch.get(batch, [])) for batch in batches}
+
+
 def get_all_data_info():
     """Scan data.xlsx and return batch and sheet information."""
     try:
         df = _load_data_xlsx()
         
         # Get unique batches
-        batch_column = None
-        for col in df.columns:
-            if 'batch' in str(col).lower():
-                batch_column = col
-                break
+        batch_column = _find_column(df, 'batch')
         
         if not batch_column:
             raise ValueError("No batch column found in data.xlsx")
         
-        batches = sorted(df[batch_column].dropna().unique().astype(str))
+        batches = _str_labels(df, batch_column)
         
         # Get sheets information for each batch
         batch_sheets = {}
-        sheet_column = None
-        for col in df.columns:
-            if 'sheet' in str(col).lower() or 'sample' in str(col).lower():
-                sheet_column = col
-                break
+        sheet_column = _find_column(df, 'sheet', 'sample')
         
         if sheet_column:
-            for batch in batches:
-                batch_df = df[df[batch_column].astype(str) == batch]
-                sheets = sorted(batch_df[sheet_column].dropna().unique().astype(str))
-                batch_sheets[batch] = sheets
+            batch_sheets = _sheets_by_batch(df, batch_column, sheet_column, batches)
         else:
             # If no sheet column, create dummy sheets
             for batch in batches:
@@ -516,155 +1103,87 @@ def get_all_data_boxplot(batches, parameters):
         df = _load_data_xlsx()
         
         # Find batch column
-        batch_column = None
-        for col in df.columns:
-            if 'batch' in str(col).lower():
-                batch_column = col
-                break
+        batch_column = _find_column(df, 'batch')
         
         if not batch_column:
             raise ValueError("No batch column found")
         
         # Find baseline column
-        baseline_column = None
-        for col in df.columns:
-            if 'baseline' in str(col).lower():
-                baseline_column = col
-                break
+        baseline_column = _find_column(df, 'baseline')
         
-        if baseline_column:
-            print(f"\n✅ Baseline column found: '{baseline_column}'")
-            print(f"   Unique values: {df[baseline_column].unique()}")
-            print(f"   Value counts:\n{df[baseline_column].value_counts()}")
-            
-            # Check for "Yes" values
-            baseline_values_str = df[baseline_column].astype(str).str.strip().str.lower()
-            yes_count = baseline_values_str.isin(['yes', 'y', 'true', 't', '1']).sum()
-            no_count = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', '']) | df[baseline_column].isna()).sum()
-            
-            print(f"   🔍 Detection results:")
-            print(f"      - 'Yes' entries (will be RED boxes): {yes_count}")
-            print(f"      - 'No' entries (will be BLUE boxes): {no_count}")
-            
-            if yes_count == 0:
-                print(f"   ⚠️ WARNING: No 'Yes' baseline data found! All data will show as normal (BLUE) boxes only.")
-            else:
-                print(f"   ✅ Found {yes_count} baseline measurements - you should see RED dashed boxes!")
-        else:
-            print("ℹ️ No baseline column found in data")
+        # Baseline diagnostics are debug-only: value_counts over the whole sheet is not free
+        if not baseline_column:
+            logger.debug("No baseline column found in data")
+        elif logger.isEnabledFor(logging.DEBUG):
+            is_baseline, is_normal = _baseline_flags(df, baseline_column)
+            logger.debug("Baseline column '%s': value counts %s", baseline_column,
+                         df[baseline_column].value_counts(dropna=False).to_dict())
+            logger.debug("Baseline detection: %d 'Yes' (RED boxes), %d 'No' (BLUE boxes)",
+                         int(is_baseline.sum()), int(is_normal.sum()))
         
-        # Filter by selected batches
-        df_filtered = df[df[batch_column].astype(str).isin(batches)]
+        # Filter by selected batches (int codes per row; the str conversion is done once per loaded frame)
+        codes, labels = _str_codes(df, batch_column)
+        row_mask = labels.isin(batches)[codes]
         
         # Parameter column mapping
-        param_mapping = {
-            'PCE': 'PCE (%)_AVG',
-            'FF': 'FF (%)_AVG',
-            'Max Power': 'Max Power (mW/cm2)_AVG',
-            'HI': 'HI (%)_AVG',
-            'I_sc': 'J_sc (mA/cm2)_AVG',
-            'V_oc': 'V_oc (V)_AVG',
-            'R_series': 'R_series (Ohm.cm2)_AVG',
-            'R_shunt': 'R_shunt (Ohm.cm2)_AVG'
-        }
-        
-        boxplot_data = {}
+        param_mapping = CHART_PARAMETERS
         
+        # Resolve requested parameters to actual columns (case insensitive)
+        resolved = _parameter_columns(df, param_mapping)
+        param_columns = {}
         for param in parameters:
-            if param in param_mapping:
-                col_name = param_mapping[param]
-                # Try to find the column (case insensitive)
-                actual_col = None
-                for col in df.columns:
-                    if str(col).upper() == col_name.upper():
-                        actual_col = col
-                        break
-                
-                if actual_col and actual_col in df_filtered.columns:
-                    # Group by batch (and baseline if exists) and calculate statistics
-                    batch_stats = []
-                    for batch in batches:
-                        batch_df = df_filtered[df_filtered[batch_column].astype(str) == batch]
-                        
-                        if baseline_column and baseline_column in batch_df.columns:
-                            # Split by baseline: Normal (No/False/0) and Baseline (Yes/True/1)
-                            baseline_values_str = batch_df[baseline_column].astype(str).str.strip().str.lower()
-                            has_yes = baseline_values_str.isin(['yes', 'y', 'true', 't', '1']).any()
-                            has_no = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', '']) | batch_df[baseline_column].isna()).any()
-                            
-                            print(f"   Batch {batch}: has_yes={has_yes}, has_no={has_no}")
-                            
-                            for is_baseline in [False, True]:
-                                # Handle multiple baseline value types
-                                if is_baseline:
-                                    # Baseline = "yes", "Yes", "true", "True", "1", 1, True, etc.
-                                    mask = baseline_values_str.isin(['yes', 'y', 'true', 't', '1'])
-                                else:
-                                    # Normal = "no", "No", "false", "False", "0", 0, False, empty, NaN, etc.
-                                    mask = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', ''])) | (batch_df[baseline_column].isna())
-                                
-                                baseline_df = batch_df[mask]
-                                batch_data = pd.to_numeric(baseline_df[actual_col], errors='coerce').dropna()
-                                
-                                if len(batch_data) > 0:
-                                    try:
-                                        q1 = batch_data.quantile(0.25)
-                                        q2 = batch_data.quantile(0.5)  # median
-                                        q3 = batch_data.quantile(0.75)
-                                        iqr = q3 - q1
-                                        lower_whisker = max(batch_data.min(), q1 - 1.5 * iqr)
-                                        upper_whisker = min(batch_data.max(), q3 + 1.5 * iqr)
-                                        
-                                        # Add suffix to batch name for clarity
-                                        batch_name = f"{batch} (Baseline)" if is_baseline else f"{batch} (Normal)"
-                                        
-                                        batch_stats.append({
-                                            'batch': batch_name,
-                                            'is_baseline': is_baseline,
-                                            'min': float(batch_data.min()),
-                                            'q1': float(q1),
-                                            'median': float(q2),
-                                            'q3': float(q3),
-                                            'max': float(batch_data.max()),
-                                            'lower_whisker': float(lower_whisker),
-                                            'upper_whisker': float(upper_whisker),
-                                            'mean': float(batch_data.mean()),
-                                            'std': float(batch_data.std()) if len(batch_data) > 1 else 0.0,
-                                            'count': len(batch_data)
-                                        })
-                                    except Exception as e:
-                                        print(f"Error calculating stats for {batch} (baseline={is_baseline}): {e}")
-                        else:
-                            # No baseline column, use original logic
-                            batch_data = pd.to_numeric(batch_df[actual_col], errors='coerce').dropna()
-                            
-                            if len(batch_data) > 0:
-                                try:
-                                    q1 = batch_data.quantile(0.25)
-                                    q2 = batch_data.quantile(0.5)  # median
-                                    q3 = batch_data.quantile(0.75)
-                                    iqr = q3 - q1
-                                    lower_whisker = max(batch_data.min(), q1 - 1.5 * iqr)
-                                    upper_whisker = min(batch_data.max(), q3 + 1.5 * iqr)
-                                    
-                                    batch_stats.append({
-                                        'batch': batch,
-                                        'is_baseline': False,
-                                        'min': float(batch_data.min()),
-                                        'q1': float(q1),
-                                        'median': float(q2),
-                                        'q3': float(q3),
-                                        'max': float(batch_data.max()),
-                                        'lower_whisker': float(lower_whisker),
-                                        'upper_whisker': float(upper_whisker),
-                                        'mean': float(batch_data.mean()),
-                                        'std': float(batch_data.std()) if len(batch_data) > 1 else 0.0,
-                                        'count': len(batch_data)
-                                    })
-                                except Exception as e:
-                                    print(f"Error calculating stats for {batch}: {e}")
-                    
-                    boxplot_data[param] = batch_stats
+            if resolved.get(param) is not None:
+                param_columns[param] = resolved[param]
+        
+        # Group key: batch string, plus baseline flag when the column exists.
+        # Rows that are neither baseline nor normal are excluded, as before.
+        if baseline_column:
+            is_baseline = _baseline_flags(df, baseline_column)[0]
+            row_mask = row_mask & _baseline_split_rows(df, baseline_column)
+        batch_key = pd.Categorical.from_codes(codes[row_mask], categories=labels)
+        group_keys = [batch_key, is_baseline[row_mask]] if baseline_column else [batch_key]
+        
+        boxplot_data = {param: [] for param in param_columns}
+        if not row_mask.any() or not param_columns:
+            return boxplot_data
+        
+        # One grouped pass over all requested parameter columns (coerced once per loaded frame)
+        cols = list(dict.fromkeys(param_columns.values()))
+        stats, _, _ = _group_stats(df, cols, row_mask, group_keys)
+        
+        for param, actual_col in param_columns.items():
+            summary = stats[actual_col]
+            batch_stats = []
+            for batch in batches:
+                # Split by baseline: Normal (No/False/0) and Baseline (Yes/True/1)
+                splits = [False, True] if baseline_column else [False]
+                for flag in splits:
+                    row = summary.get((batch, flag) if baseline_column else (batch,))
+                    if not row:
+                        continue
+                    if baseline_column:
+                        # Add suffix to batch name for clarity
+                        batch_name = f"{batch} (Baseline)" if flag else f"{batch} (Normal)"
+                    else:
+                        batch_name = batch
+                    iqr = row['q3'] - row['q1']
+                    count = int(row['count'])
+                    batch_stats.append({
+                        'batch': batch_name,
+                        'is_baseline': flag,
+                        'min': float(row['min']),
+                        'q1': float(row['q1']),
+                        'median': float(row['median']),
+                        'q3': float(row['q3']),
+                        'max': float(row['max']),
+                        'lower_whisker': float(max(row['min'], row['q1'] - 1.5 * iqr)),
+                        'upper_whisker': float(min(row['max'], row['q3'] + 1.5 * iqr)),
+                        'mean': float(row['mean']),
+                        'std': float(row['std']) if count > 1 else 0.0,
+                        'count': count
+                    })
+            
+            boxplot_data[param] = batch_stats
         
         return boxplot_data
         
@@ -676,150 +1195,95 @@ def get_all_data_boxplot(batches, parameters):
 def get_all_data_sheet_boxplot(sheets, parameters):
     """Generate box plot data for selected sheets and parameters (grouped by batch)."""
     try:
+        # Parse sheet selections (format: "BATCH-SHEET"); nothing to load for an empty selection
+        requested = [(sheet_key, *sheet_key.split('-', 1)) for sheet_key in sheets if '-' in sheet_key]
+        if not requested:
+            return {'data': [], 'batch_groups': {}, 'parameters': parameters}
+        
         df = _load_data_xlsx()
         
         # Find batch, sheet, and baseline columns
-        batch_column = None
-        sheet_column = None
-        baseline_column = None
-        
-        for col in df.columns:
-            if 'batch' in str(col).lower():
-                batch_column = col
-            elif 'sheet' in str(col).lower() or 'sample' in str(col).lower():
-                sheet_column = col
-            elif 'baseline' in str(col).lower():
-                baseline_column = col
+        batch_column, sheet_column, baseline_column = _detect_data_columns(df)
         
         if not batch_column:
             raise ValueError("No batch column found")
         
         # Parameter column mapping
-        param_mapping = {
-            'PCE': 'PCE (%)',
-            'FF': 'FF (%)',
-            'Max Power': 'Max Power (mW/cm2)',
-            'HI': 'HI (%)',
-            'I_sc': 'J_sc (mA/cm2)',
-            'V_oc': 'V_oc (V)',
-            'R_series': 'R_series (Ohm.cm2)',
-            'R_shunt': 'R_shunt (Ohm.cm2)'
-        }
+        param_mapping = CELL_PARAMETERS
         
-        # Parse sheet selections (format: "BATCH-SHEET")
-        sheet_data = []
-        batch_groups = {}  # Group by batch for consistent coloring
+        # One groupby over the requested batches: (batch, sheet, is_baseline), dropping the parts
+        # that don't apply. Rows that are neither baseline nor normal are excluded, as before.
+        batch_codes, batch_labels = _str_codes(df, batch_column)
+        row_mask = batch_labels.isin([batch_id for _, batch_id, _ in requested])[batch_codes]
+        if baseline_column:
+            baseline_rows = _baseline_flags(df, baseline_column)[0]
+            row_mask = row_mask & _baseline_split_rows(df, baseline_column)
+        keys = [pd.Categorical.from_codes(batch_codes[row_mask], categories=batch_labels)]
+        if sheet_column:
+            sheet_codes, sheet_labels = _str_codes(df, sheet_column)
+            keys.append(pd.Categorical.from_codes(sheet_codes[row_mask], categories=sheet_labels))
+        if baseline_column:
+            keys.append(baseline_rows[row_mask])
+        
+        resolved = _parameter_columns(df, param_mapping)
+        param_columns = {param: resolved[param] for param in parameters if param in param_mapping}
+        cols = [c for c in dict.fromkeys(param_columns.values()) if c]
+        stats, sizes, group_values = _group_stats(df, cols, row_mask, keys, with_values=True)
+        
+        # (param, stats table, sorted values) resolved once for all sheet points
+        tables = [(param, stats[actual_col], group_values[actual_col]) if actual_col else (param, None, None)
+                  for param, actual_col in param_columns.items()]
         
-        for sheet_key in sheets:
-            if '-' in sheet_key:
-                batch_id, sheet_name = sheet_key.split('-', 1)
-                
-                # Group sheets by batch
-                if batch_id not in batch_groups:
-                    batch_groups[batch_id] = []
-                
-                # Filter data for this batch and sheet
-                batch_filter = df[batch_column].astype(str) == batch_id
-                
-                if sheet_column:
-                    sheet_filter = df[sheet_column].astype(str) == sheet_name
-                    filtered_df = df[batch_filter & sheet_filter]
+        def fill_params(sheet_point, group):
+            for param, table, table_values in tables:
+                row = table.get(group) if table is not None else None
+                if row:
+                    # Only points beyond the 1.5*IQR fences are shipped; the box itself is the summary stats.
+                    # The group's values are sorted, so the outliers are its head and tail.
+                    values = table_values[group]
+                    iqr = row['q3'] - row['q1']
+                    low = np.searchsorted(values, row['q1'] - 1.5 * iqr, side='left')
+                    high = np.searchsorted(values, row['q3'] + 1.5 * iqr, side='right')
+                    # Calculate statistics for box plot
+                    sheet_point[param] = {
+                        'outliers': values[:low].tolist() + values[high:].tolist(),
+                        'min': float(row['min']),
+                        'q1': float(row['q1']),
+                        'median': float(row['median']),
+                        'q3': float(row['q3']),
+                        'max': float(row['max']),
+                        'mean': float(row['mean']),
+                        'count': int(row['count'])
+                    }
                 else:
-                    # If no sheet column, just use batch data
-                    filtered_df = df[batch_filter]
-                
-                if not filtered_df.empty:
-                    # Check if we need to split by baseline
-                    if baseline_column and baseline_column in filtered_df.columns:
-                        # Create two sheet points: one for normal, one for baseline
-                        for is_baseline in [False, True]:
-                            # Handle multiple baseline value types
-                            baseline_values_str = filtered_df[baseline_column].astype(str).str.strip().str.lower()
-                            
-                            if is_baseline:
-                                # Baseline = "yes", "Yes", "true", "True", "1", 1, True, etc.
-                                mask = baseline_values_str.isin(['yes', 'y', 'true', 't', '1'])
-                            else:
-                                # Normal = "no", "No", "false", "False", "0", 0, False, empty, NaN, etc.
-                                mask = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', ''])) | (filtered_df[baseline_column].isna())
-                            
-                            baseline_df = filtered_df[mask]
-                            
-                            if not baseline_df.empty:
-                                baseline_suffix = ' (Baseline)' if is_baseline else ''
-                                sheet_point = {
-                                    'sheet': sheet_key + baseline_suffix, 
-                                    'batch': batch_id, 
-                                    'sheet_name': sheet_name + baseline_suffix,
-                                    'is_baseline': is_baseline
-                                }
-                                
-                                for param in parameters:
-                                    if param in param_mapping:
-                                        col_name = param_mapping[param]
-                                        # Find actual column (case insensitive)
-                                        actual_col = None
-                                        for col in df.columns:
-                                            if str(col).upper() == col_name.upper():
-                                                actual_col = col
-                                                break
-                                        
-                                        if actual_col and actual_col in baseline_df.columns:
-                                            param_data = pd.to_numeric(baseline_df[actual_col], errors='coerce').dropna()
-                                            if len(param_data) > 0:
-                                                # Calculate statistics for box plot
-                                                sheet_point[param] = {
-                                                    'values': param_data.tolist(),
-                                                    'min': float(param_data.min()),
-                                                    'q1': float(param_data.quantile(0.25)),
-                                                    'median': float(param_data.quantile(0.5)),
-                                                    'q3': float(param_data.quantile(0.75)),
-                                                    'max': float(param_data.max()),
-                                                    'mean': float(param_data.mean()),
-                                                    'count': len(param_data)
-                                                }
-                                            else:
-                                                sheet_point[param] = None
-                                        else:
-                                            sheet_point[param] = None
-                                
-                                sheet_data.append(sheet_point)
-                                batch_groups[batch_id].append(sheet_point)
-                    else:
-                        # No baseline column, use original logic
-                        sheet_point = {'sheet': sheet_key, 'batch': batch_id, 'sheet_name': sheet_name, 'is_baseline': False}
-                        
-                        for param in parameters:
-                            if param in param_mapping:
-                                col_name = param_mapping[param]
-                                # Find actual column (case insensitive)
-                                actual_col = None
-                                for col in df.columns:
-                                    if str(col).upper() == col_name.upper():
-                                        actual_col = col
-                                        break
-                                
-                                if actual_col and actual_col in filtered_df.columns:
-                                    param_data = pd.to_numeric(filtered_df[actual_col], errors='coerce').dropna()
-                                    if len(param_data) > 0:
-                                        # Calculate statistics for box plot
-                                        sheet_point[param] = {
-                                            'values': param_data.tolist(),
-                                            'min': float(param_data.min()),
-                                            'q1': float(param_data.quantile(0.25)),
-                                            'median': float(param_data.quantile(0.5)),
-                                            'q3': float(param_data.quantile(0.75)),
-                                            'max': float(param_data.max()),
-                                            'mean': float(param_data.mean()),
-                                            'count': len(param_data)
-                                        }
-                                    else:
-                                        sheet_point[param] = None
-                                else:
-                                    sheet_point[param] = None
-                        
-                        sheet_data.append(sheet_point)
-                        batch_groups[batch_id].append(sheet_point)
+                    sheet_point[param] = None
+        
+        sheet_data = []
+        batch_groups = {}  # Group by batch for consistent coloring: indices into sheet_data
+        
+        for sheet_key, batch_id, sheet_name in requested:
+            # Group sheets by batch
+            if batch_id not in batch_groups:
+                batch_groups[batch_id] = []
+            
+            # If no sheet column, just use batch data
+            group = (batch_id, sheet_name) if sheet_column else (batch_id,)
+            
+            # Create two sheet points when split by baseline: one for normal, one for baseline
+            for is_baseline in ([False, True] if baseline_column else [None]):
+                key = group + (is_baseline,) if baseline_column else group
+                if not sizes.get(key):
+                    continue
+                baseline_suffix = ' (Baseline)' if is_baseline else ''
+                sheet_point = {
+                    'sheet': sheet_key + baseline_suffix,
+                    'batch': batch_id,
+                    'sheet_name': sheet_name + baseline_suffix,
+                    'is_baseline': bool(is_baseline)
+                }
+                fill_params(sheet_point, key)
+                batch_groups[batch_id].append(len(sheet_data))
+                sheet_data.append(sheet_point)
         
         return {
             'data': sheet_data,
@@ -832,76 +1296,100 @@ def get_all_data_sheet_boxplot(sheets, parameters):
         return {'data': [], 'batch_groups': {}, 'parameters': parameters}
 
 
+def _linechart_from_prefetch(prefetched, requested, parameters):
+    """Line chart points (sheet means) projected from a get_all_data_full() payload."""
+    sheet_data = []
+    for sheet_key, batch_id, sheet_name in requested:
+        entry = prefetched['sheet_stats'].get(sheet_key)
+        # Keys are "BATCH-SHEET"; a batch containing '-' must not match a different split
+        if not entry or entry['batch'] != batch_id or entry['sheet_name'] != sheet_name:
+            continue
+        if not any(param in entry for param in CELL_PARAMETERS):
+            continue  # sheet listed for the batch but without rows
+        sheet_point = {'sheet': sheet_key, 'batch': batch_id, 'sheet_name': sheet_name}
+        for param in parameters:
+            if param in CELL_PARAMETERS:
+                stats = entry.get(param)
+                sheet_point[param] = stats['mean'] if stats else None
+        sheet_data.append(sheet_point)
+    return sheet_data
+
+
 def get_all_data_linechart(sheets, parameters):
     """Generate line chart data for selected sheets and parameters."""
     try:
+        # Parse sheet selections (format: "BATCH-SHEET"); nothing to load for an empty selection
+        requested = [(sheet_key, *sheet_key.split('-', 1)) for sheet_key in sheets if '-' in sheet_key]
+        if not requested:
+            return {'data': [], 'parameters': parameters}
+        
         df = _load_data_xlsx()
         
         # Find batch and sheet columns
-        batch_column = None
-        sheet_column = None
-        
-        for col in df.columns:
-            if 'batch' in str(col).lower():
-                batch_column = col
-            elif 'sheet' in str(col).lower() or 'sample' in str(col).lower():
-                sheet_column = col
+        batch_column, sheet_column, _ = _detect_data_columns(df)
         
         if not batch_column:
             raise ValueError("No batch column found")
         
         # Parameter column mapping
-        param_mapping = {
-            'PCE': 'PCE (%)',
-            'FF': 'FF (%)',
-            'Max Power': 'Max Power (mW/cm2)',
-            'HI': 'HI (%)',
-            'I_sc': 'J_sc (mA/cm2)',
-            'V_oc': 'V_oc (V)',
-            'R_series': 'R_series (Ohm.cm2)',
-            'R_shunt': 'R_shunt (Ohm.cm2)'
-        }
+        param_mapping = CELL_PARAMETERS
         
-        # Parse sheet selections (format: "BATCH-SHEET")
-        sheet_data = []
-        for sheet_key in sheets:
-            if '-' in sheet_key:
-                batch_id, sheet_name = sheet_key.split('-', 1)
-                
-                # Filter data for this batch and sheet
-                batch_filter = df[batch_column].astype(str) == batch_id
-                
-                if sheet_column:
-                    sheet_filter = df[sheet_column].astype(str) == sheet_name
-                    filtered_df = df[batch_filter & sheet_filter]
+        # Sheet means are already in the full prefetch when it was built for this frame
+        prefetched = _frame_memo_peek(df, 'all_data_full') if sheet_column else None
+        if prefetched is not None:
+            return {
+                'data': _linechart_from_prefetch(prefetched, requested, parameters),
+                'parameters': parameters
+            }
+        
+        # Join the requested (batch, sheet) pairs against the memoized codes once: every row gets the
+        # slot of its pair (or -1), instead of one boolean mask per requested sheet.
+        # If no sheet column, just use batch data
+        batch_codes, batch_labels = _str_codes(df, batch_column)
+        pair_keys = [(batch_id, sheet_name if sheet_column else None) for _, batch_id, sheet_name in requested]
+        req_batch = batch_labels.get_indexer([b for b, _ in pair_keys])
+        row_pairs = batch_codes.astype(np.int64)
+        req_pairs = req_batch.astype(np.int64)
+        if sheet_column:
+            sheet_codes, sheet_labels = _str_codes(df, sheet_column)
+            req_sheet = sheet_labels.get_indexer([s for _, s in pair_keys])
+            row_pairs = row_pairs * len(sheet_labels) + sheet_codes
+            req_pairs = np.where((req_batch >= 0) & (req_sheet >= 0),
+                                 req_pairs * len(sheet_labels) + req_sheet, -1)
+        slots = pd.Index(np.unique(req_pairs[req_pairs >= 0]))
+        row_slot = slots.get_indexer(row_pairs)
+        in_request = row_slot >= 0
+        row_slot = row_slot[in_request]
+        sizes = np.bincount(row_slot, minlength=len(slots))
+        
+        # Per-slot mean of each parameter (slices of the memoized float64 columns)
+        resolved = _parameter_columns(df, param_mapping)
+        means = {}
+        for param in parameters:
+            if param in param_mapping and param not in means:
+                actual_col = resolved[param]
+                if actual_col:
+                    values = _numeric_column(df, actual_col)[in_request]
+                    valid = ~np.isnan(values)
+                    counts = np.bincount(row_slot[valid], minlength=len(slots))
+                    sums = np.bincount(row_slot[valid], weights=values[valid], minlength=len(slots))
+                    means[param] = (sums, counts)
                 else:
-                    # If no sheet column, just use batch data
-                    filtered_df = df[batch_filter]
-                
-                if not filtered_df.empty:
-                    # Get data for each parameter
-                    sheet_point = {'sheet': sheet_key, 'batch': batch_id, 'sheet_name': sheet_name}
-                    
-                    for param in parameters:
-                        if param in param_mapping:
-                            col_name = param_mapping[param]
-                            # Find actual column (case insensitive)
-                            actual_col = None
-                            for col in df.columns:
-                                if str(col).upper() == col_name.upper():
-                                    actual_col = col
-                                    break
-                            
-                            if actual_col and actual_col in filtered_df.columns:
-                                param_data = pd.to_numeric(filtered_df[actual_col], errors='coerce').dropna()
-                                if len(param_data) > 0:
-                                    sheet_point[param] = float(param_data.mean())  # Use mean of sheet data
-                                else:
-                                    sheet_point[param] = None
-                            else:
-                                sheet_point[param] = None
-                    
-                    sheet_data.append(sheet_point)
+                    means[param] = None
+        
+        sheet_data = []
+        for (sheet_key, batch_id, sheet_name), slot in zip(requested, slots.get_indexer(req_pairs)):
+            if slot < 0 or not sizes[slot]:
+                continue
+            sheet_point = {'sheet': sheet_key, 'batch': batch_id, 'sheet_name': sheet_name}
+            for param in parameters:
+                if param in means:
+                    sums_counts = means[param]
+                    if sums_counts is not None and sums_counts[1][slot] > 0:
+                        sheet_point[param] = float(sums_counts[0][slot] / sums_counts[1][slot])  # Use mean of sheet data
+                    else:
+                        sheet_point[param] = None
+            sheet_data.append(sheet_point)
         
         return {
             'data': sheet_data,
@@ -913,216 +1401,164 @@ def get_all_data_linechart(sheets, parameters):
         return {'data': [], 'parameters': parameters}
 
 
-def get_all_data_full():
-    """
-    Prefetch ALL data at once for frontend caching.
-    Returns complete statistics for all batches and all sheets.
-    This eliminates the need for repeated Azure fetches on every selection change.
-    """
-    try:
-        print("🚀 Loading complete dataset from Azure for prefetching...")
-        df = _load_data_xlsx()
-        
-        # Find batch, sheet, and baseline columns
-        batch_column = None
-        sheet_column = None
-        baseline_column = None
-        
-        for col in df.columns:
-            if 'batch' in str(col).lower():
-                batch_column = col
-            elif 'sheet' in str(col).lower() or 'sample' in str(col).lower():
-                sheet_column = col
-            elif 'baseline' in str(col).lower():
-                baseline_column = col
-        
-        if not batch_column:
-            raise ValueError("No batch column found in data.xlsx")
-        
-        # Check baseline data
-        if baseline_column:
-            print(f"\n✅ Baseline column found: '{baseline_column}'")
-            baseline_values_str = df[baseline_column].astype(str).str.strip().str.lower()
-            yes_count = baseline_values_str.isin(['yes', 'y', 'true', 't', '1']).sum()
-            no_count = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', '']) | df[baseline_column].isna()).sum()
-            
-            print(f"   🔍 Baseline data summary:")
-            print(f"      - 'Yes' entries (RED boxes): {yes_count}")
-            print(f"      - 'No' entries (BLUE boxes): {no_count}")
-            
+def _build_all_data_full(df):
+    """Complete statistics for all batches and all sheets of the loaded data.xlsx frame."""
+    # Find batch, sheet, and baseline columns
+    batch_column, sheet_column, baseline_column = _detect_data_columns(df)
+    
+    if not batch_column:
+        raise ValueError("No batch column found in data.xlsx")
+    
+    # Check baseline data (diagnostics are debug-only)
+    if baseline_column:
+        baseline_rows, normal_rows = _baseline_flags(df, baseline_column)
+        if logger.isEnabledFor(logging.DEBUG):
+            yes_count = int(baseline_rows.sum())
+            logger.debug("Baseline column '%s': %d 'Yes' (RED boxes), %d 'No' (BLUE boxes)",
+                         baseline_column, yes_count, int(normal_rows.sum()))
             if yes_count == 0:
-                print(f"   ⚠️  WARNING: No 'Yes' baseline data! All boxes will be BLUE (normal data only)")
-            else:
-                print(f"   ✅ You should see both BLUE (normal) and RED (baseline) boxes!")
-        else:
-            print("ℹ️  No baseline column found in data")
-        
-        # Parameter column mapping
-        param_mapping = {
-            'PCE': 'PCE (%)',
-            'FF': 'FF (%)',
-            'Max Power': 'Max Power (mW/cm2)',
-            'HI': 'HI (%)',
-            'I_sc': 'J_sc (mA/cm2)',
-            'V_oc': 'V_oc (V)',
-            'R_series': 'R_series (Ohm.cm2)',
-            'R_shunt': 'R_shunt (Ohm.cm2)'
+                logger.debug("No 'Yes' baseline data - all boxes will be BLUE (normal data only)")
+    else:
+        logger.debug("No baseline column found in data")
+    
+    # Parameter column mapping
+    param_mapping = CELL_PARAMETERS
+    
+    all_parameters = list(param_mapping.keys())
+    batches = _str_labels(df, batch_column)
+    
+    # ========== BATCH-LEVEL STATISTICS ==========
+    logger.debug("Processing batch-level statistics for %d batches", len(batches))
+    batch_stats = {}
+    
+    # Resolve parameter columns once; stats come from one groupby per level below
+    param_columns = _parameter_columns(df, param_mapping)
+    present_cols = [c for c in dict.fromkeys(param_columns.values()) if c]
+    batch_codes, batch_labels = _str_codes(df, batch_column)
+    batch_keys = pd.Categorical.from_codes(batch_codes, categories=batch_labels)
+    all_rows = np.ones(len(df), dtype=bool)
+    
+    def describe(row, with_std):
+        stats = {
+            'min': float(row['min']),
+            'q1': float(row['q1']),
+            'median': float(row['median']),
+            'q3': float(row['q3']),
+            'max': float(row['max']),
+            'mean': float(row['mean']),
         }
+        count = int(row['count'])
+        if with_std:
+            stats['std'] = float(row['std']) if count > 1 else 0.0
+        stats['count'] = count
+        return stats
+    
+    # (batch, is_baseline) groups over rows that are baseline or normal; (batch,) without a baseline column
+    if baseline_column:
+        split_rows = _baseline_split_rows(df, baseline_column)
+        by_batch, _, _ = _group_stats(df, present_cols, split_rows,
+                                      [batch_keys[split_rows], baseline_rows[split_rows]])
+    else:
+        by_batch, _, _ = _group_stats(df, present_cols, all_rows, [batch_keys])
+    
+    for param in all_parameters:
+        actual_col = param_columns[param]
         
-        all_parameters = list(param_mapping.keys())
-        batches = sorted(df[batch_column].dropna().unique().astype(str))
-        
-        # ========== BATCH-LEVEL STATISTICS ==========
-        print("📊 Processing batch-level statistics...")
-        print(f"   🔍 Found {len(batches)} unique batches to process")
-        batch_stats = {}
-        created_batch_names = []
-        
-        for param in all_parameters:
-            col_name = param_mapping[param]
-            actual_col = None
-            
-            # Find actual column (case insensitive)
-            for col in df.columns:
-                if str(col).upper() == col_name.upper():
-                    actual_col = col
-                    break
+        if actual_col:
+            batch_stats[param] = []
+            summary = by_batch[actual_col]
             
-            if actual_col and actual_col in df.columns:
-                batch_stats[param] = []
-                
-                for batch in batches:
-                    batch_df = df[df[batch_column].astype(str) == batch]
-                    
-                    # Split by baseline if column exists
-                    if baseline_column and baseline_column in batch_df.columns:
-                        baseline_values_str = batch_df[baseline_column].astype(str).str.strip().str.lower()
-                        
-                        for is_baseline in [False, True]:
-                            if is_baseline:
-                                mask = baseline_values_str.isin(['yes', 'y', 'true', 't', '1'])
-                            else:
-                                mask = (baseline_values_str.isin(['no', 'n', 'false', 'f', '0', 'nan', '']) | batch_df[baseline_column].isna())
-                            
-                            baseline_df = batch_df[mask]
-                            batch_data = pd.to_numeric(baseline_df[actual_col], errors='coerce').dropna()
-                            
-                            if len(batch_data) > 0:
-                                batch_name = f"{batch} (Baseline)" if is_baseline else f"{batch} (Normal)"
-                                if param == 'PCE' and batch_name not in created_batch_names:  # Log only once per batch
-                                    created_batch_names.append(batch_name)
-                                batch_stats[param].append({
-                                    'batch': batch_name,
-                                    'is_baseline': is_baseline,
-                                    'color': '#ef4444' if is_baseline else '#3b82f6',
-                                    'min': float(batch_data.min()),
-                                    'q1': float(batch_data.quantile(0.25)),
-                                    'median': float(batch_data.quantile(0.5)),
-                                    'q3': float(batch_data.quantile(0.75)),
-                                    'max': float(batch_data.max()),
-                                    'mean': float(batch_data.mean()),
-                                    'std': float(batch_data.std()) if len(batch_data) > 1 else 0.0,
-                                    'count': len(batch_data)
-                                })
-                    else:
-                        # No baseline column
-                        batch_data = pd.to_numeric(batch_df[actual_col], errors='coerce').dropna()
+            for batch in batches:
+                # Split by baseline if column exists
+                if baseline_column:
+                    for is_baseline in [False, True]:
+                        row = summary.get((batch, is_baseline))
                         
-                        if len(batch_data) > 0:
+                        if row:
+                            batch_name = f"{batch} (Baseline)" if is_baseline else f"{batch} (Normal)"
                             batch_stats[param].append({
-                                'batch': batch,
-                                'is_baseline': False,
-                                'color': '#3b82f6',
-                                'min': float(batch_data.min()),
-                                'q1': float(batch_data.quantile(0.25)),
-                                'median': float(batch_data.quantile(0.5)),
-                                'q3': float(batch_data.quantile(0.75)),
-                                'max': float(batch_data.max()),
-                                'mean': float(batch_data.mean()),
-                                'std': float(batch_data.std()) if len(batch_data) > 1 else 0.0,
-                                'count': len(batch_data)
+                                'batch': batch_name,
+                                'is_baseline': is_baseline,
+                                'color': '#ef4444' if is_baseline else '#3b82f6',
+                                **describe(row, with_std=True)
                             })
-        
-        # ========== SHEET-LEVEL STATISTICS ==========
-        print(f"   ✅ Created {len(created_batch_names)} batch entries with baseline split:")
-        for i, name in enumerate(sorted(created_batch_names)[:10]):  # Show first 10
-            print(f"      {i+1}. {name}")
-        if len(created_batch_names) > 10:
-            print(f"      ... and {len(created_batch_names) - 10} more")
-        print("📄 Processing sheet-level statistics...")
-        sheet_stats = {}
-        
-        # Get all batch-sheet combinations
-        batch_sheets = {}
-        if sheet_column:
-            for batch in batches:
-                batch_df = df[df[batch_column].astype(str) == batch]
-                sheets = sorted(batch_df[sheet_column].dropna().unique().astype(str))
-                batch_sheets[batch] = sheets
-        else:
-            # If no sheet column, create dummy sheets
-            for batch in batches:
-                batch_sheets[batch] = ['S001', 'S002', 'S003']
-        
-        # Calculate statistics for each sheet
-        for batch in batches:
-            for sheet_name in batch_sheets[batch]:
-                sheet_key = f"{batch}-{sheet_name}"
-                sheet_stats[sheet_key] = {
-                    'sheet': sheet_key,
-                    'batch': batch,
-                    'sheet_name': sheet_name
-                }
-                
-                # Filter data for this batch and sheet
-                batch_filter = df[batch_column].astype(str) == batch
-                
-                if sheet_column:
-                    sheet_filter = df[sheet_column].astype(str) == sheet_name
-                    filtered_df = df[batch_filter & sheet_filter]
                 else:
-                    filtered_df = df[batch_filter]
-                
-                if not filtered_df.empty:
-                    for param in all_parameters:
-                        col_name = param_mapping[param]
-                        actual_col = None
-                        
-                        # Find actual column (case insensitive)
-                        for col in df.columns:
-                            if str(col).upper() == col_name.upper():
-                                actual_col = col
-                                break
-                        
-                        if actual_col and actual_col in filtered_df.columns:
-                            param_data = pd.to_numeric(filtered_df[actual_col], errors='coerce').dropna()
-                            
-                            if len(param_data) > 0:
-                                sheet_stats[sheet_key][param] = {
-                                    'min': float(param_data.min()),
-                                    'q1': float(param_data.quantile(0.25)),
-                                    'median': float(param_data.quantile(0.5)),
-                                    'q3': float(param_data.quantile(0.75)),
-                                    'max': float(param_data.max()),
-                                    'mean': float(param_data.mean()),
-                                    'count': len(param_data)
-                                }
-                            else:
-                                sheet_stats[sheet_key][param] = None
-                        else:
-                            sheet_stats[sheet_key][param] = None
-        
-        print(f"✅ Prefetch complete: {len(batches)} batches, {len(sheet_stats)} sheets, {len(all_parameters)} parameters")
-        
-        return {
-            'batches': batches,
-            'batch_sheets': batch_sheets,
-            'parameters': all_parameters,
-            'batch_stats': batch_stats,
-            'sheet_stats': sheet_stats,
-            'total_batches': len(batches),
-            'total_sheets': len(sheet_stats)
-        }
+                    # No baseline column
+                    row = summary.get((batch,))
+                    
+                    if row:
+                        batch_stats[param].append({
+                            'batch': batch,
+                            'is_baseline': False,
+                            'color': '#3b82f6',
+                            **describe(row, with_std=True)
+                        })
+    
+    # ========== SHEET-LEVEL STATISTICS ==========
+    if baseline_column and logger.isEnabledFor(logging.DEBUG):
+        created_batch_names = sorted(entry['batch'] for entry in batch_stats.get('PCE', []))
+        logger.debug("Created %d batch entries with baseline split, first 10: %s",
+                     len(created_batch_names), created_batch_names[:10])
+    logger.debug("Processing sheet-level statistics")
+    sheet_stats = {}
+    
+    # Get all batch-sheet combinations
+    batch_sheets = {}
+    if sheet_column:
+        batch_sheets = _sheets_by_batch(df, batch_column, sheet_column, batches)
+        sheet_codes, sheet_labels = _str_codes(df, sheet_column)
+        sheet_keys = pd.Categorical.from_codes(sheet_codes, categories=sheet_labels)
+        by_sheet, sheet_sizes, _ = _group_stats(df, present_cols, all_rows, [batch_keys, sheet_keys])
+    else:
+        # If no sheet column, create dummy sheets (each shows its whole batch)
+        for batch in batches:
+            batch_sheets[batch] = ['S001', 'S002', 'S003']
+        by_sheet, sheet_sizes, _ = _group_stats(df, present_cols, all_rows, [batch_keys])
+    
+    # Calculate statistics for each sheet; (param, stats table) pairs are resolved once, not per sheet
+    sheet_tables = [(param, by_sheet[param_columns[param]] if param_columns[param] else None)
+                    for param in all_parameters]
+    for batch in batches:
+        for sheet_name in batch_sheets[batch]:
+            sheet_key = f"{batch}-{sheet_name}"
+            sheet_stats[sheet_key] = {
+                'sheet': sheet_key,
+                'batch': batch,
+                'sheet_name': sheet_name
+            }
+            
+            group = (batch, sheet_name) if sheet_column else (batch,)
+            if sheet_sizes.get(group):
+                for param, table in sheet_tables:
+                    row = table.get(group) if table is not None else None
+                    sheet_stats[sheet_key][param] = describe(row, with_std=False) if row else None
+    
+    logger.debug("Prefetch complete: %d batches, %d sheets, %d parameters",
+                 len(batches), len(sheet_stats), len(all_parameters))
+    
+    return {
+        'batches': batches,
+        'batch_sheets': batch_sheets,
+        'parameters': all_parameters,
+        'batch_stats': batch_stats,
+        'sheet_stats': sheet_stats,
+        'total_batches': len(batches),
+        'total_sheets': len(sheet_stats)
+    }
+
+
+def get_all_data_full():
+    """
+    Prefetch ALL data at once for frontend caching.
+    Returns complete statistics for all batches and all sheets.
+    This eliminates the need for repeated Azure fetches on every selection change.
+    The result is memoized on the loaded frame, so repeat prefetches of an unchanged
+    workbook (same ETag) skip the groupby work entirely.
+    """
+    try:
+        logger.debug("Loading complete dataset from Azure for prefetching")
+        df = _load_data_xlsx()
+        return _frame_memo(df, 'all_data_full', _build_all_data_full)
         
     except Exception as e:
         print(f"❌ Error in get_all_data_full: {e}")
@@ -1138,3 +1574,68 @@ def get_all_data_full():
             'total_sheets': 0,
             'error': str(e)
         }
+
+
+def get_all_data_full_json() -> bytes:
+    """get_all_data_full() as JSON bytes, serialized once per loaded frame."""
+    try:
+        df = _load_data_xlsx()
+        return _frame_memo(df, 'all_data_full_json', lambda frame: dumps(_frame_memo(frame, 'all_data_full', _build_all_data_full)))
+    except Exception:
+        return dumps(get_all_data_full())  # error payload
+
+
+# Per-parameter stats in the columnar payload, in array order
+FULL_BATCH_STAT_FIELDS = ['min', 'q1', 'median', 'q3', 'max', 'mean', 'std', 'count']
+FULL_SHEET_STAT_FIELDS = ['min', 'q1', 'median', 'q3', 'max', 'mean', 'count']
+
+
+def _columnar_all_data_full(payload):
+    """
+    get_all_data_full() as keys + float32 arrays of shape (keys, parameters, fields) instead of a
+    dict per (key, parameter). Missing stats are NaN (null in JSON).
+    """
+    params = payload['parameters']
+    p_index = {param: j for j, param in enumerate(params)}
+
+    batch_rows = {}
+    for param, entries in payload['batch_stats'].items():
+        for entry in entries:
+            batch_rows.setdefault(entry['batch'], {'is_baseline': entry['is_baseline'], 'stats': {}})['stats'][param] = entry
+    batch_arr = np.full((len(batch_rows), len(params), len(FULL_BATCH_STAT_FIELDS)), np.nan, dtype=np.float32)
+    for i, row in enumerate(batch_rows.values()):
+        for param, entry in row['stats'].items():
+            batch_arr[i, p_index[param]] = [entry[f] for f in FULL_BATCH_STAT_FIELDS]
+
+    sheet_keys = list(payload['sheet_stats'])
+    sheet_arr = np.full((len(sheet_keys), len(params), len(FULL_SHEET_STAT_FIELDS)), np.nan, dtype=np.float32)
+    for i, sheet_key in enumerate(sheet_keys):
+        entry = payload['sheet_stats'][sheet_key]
+        for param in params:
+            if entry.get(param):
+                sheet_arr[i, p_index[param]] = [entry[param][f] for f in FULL_SHEET_STAT_FIELDS]
+
+    return {
+        'batches': payload['batches'],
+        'batch_sheets': payload['batch_sheets'],
+        'parameters': params,
+        'batch_keys': list(batch_rows),
+        'batch_is_baseline': [row['is_baseline'] for row in batch_rows.values()],
+        'batch_fields': FULL_BATCH_STAT_FIELDS,
+        'batch_stats': batch_arr,
+        'sheet_keys': sheet_keys,
+        'sheet_fields': FULL_SHEET_STAT_FIELDS,
+        'sheet_stats': sheet_arr,
+        'total_batches': payload['total_batches'],
+        'total_sheets': payload['total_sheets'],
+    }
+
+
+def get_all_data_full_columnar_json() -> bytes:
+    """Columnar get_all_data_full() as JSON bytes, built and serialized once per loaded frame."""
+    try:
+        df = _load_data_xlsx()
+        return _frame_memo(df, 'all_data_full_columnar_json', lambda frame: dumps(_columnar_all_data_full(
+            _frame_memo(frame, 'all_data_full', _build_all_data_full))))
+    except Exception:
+        return dumps(get_all_data_full())  # error payload
@@ -0,0 +1,79 @@
+"""
+JSON Response Helpers
+orjson-backed Flask responses for large list payloads
+"""
+import json
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    from bson import ObjectId
+except ImportError:
+    ObjectId = None
+
+
+def _default(value):
+    """stdlib json fallback for values orjson handles natively (numpy arrays -> lists, NaN -> null)"""
+    if hasattr(value, 'tolist'):
+        if getattr(value, 'dtype', None) is not None and value.dtype.kind == 'f':
+            value = value.astype(object)
+            value[value != value] = None
+        return value.tolist()
+    return str(value)
+
+
+def dumps(payload):
+    """Serialize payload to JSON bytes (orjson when installed, stdlib json otherwise)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Build a JSON Response without going through flask.jsonify"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """flask.jsonify provider that also serializes Mongo ObjectIds (as their hex string)
+    
+    Encodes with orjson when installed; dates keep Flask's HTTP-date format either way.
+    """
+    
+    @staticmethod
+    def default(value):
+        if ObjectId is not None and isinstance(value, ObjectId):
+            return str(value)
+        return DefaultJSONProvider.default(value)
+    
+    def _orjson_dumps(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        if not ORJSON_AVAILABLE or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj, indent=kwargs.get('indent')).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        if not ORJSON_AVAILABLE or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        if not ORJSON_AVAILABLE:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._orjson_dumps(obj, indent=indent) + b"\n", mimetype=self.mimetype)
@@ -30,23 +30,12 @@ def automatic_device_checker():
             return 0
             
         device_model = StabilityDeviceModel(stability_db)
-        expired_devices = device_model.check_expired_devices()
+        expired_devices, removed_count = device_model.remove_expired_devices('system')
         
-        removed_count = 0
         if expired_devices:
-            print(f"⚠️  Found {len(expired_devices)} expired devices - processing removal...")
-            
+            print(f"⚠️  Found {len(expired_devices)} expired devices - archived and removed in one batch")
             for device in expired_devices:
-                success = device_model.soft_delete(
-                    section_key=device['section_key'],
-                    subsection_key=device['subsection_key'],
-                    row=device['row'],
-                    col=device['col'],
-                    removed_by='system'
-                )
-                if success:
-                    removed_count += 1
-                    print(f"✅ Auto-removed device {device.get('device_id', 'Unknown')} from {device['section_key']}/{device['subsection_key']} ({device['row']},{device['col']})")
+                print(f"   {device.get('device_id', 'Unknown')} at {device['section_key']}/{device['subsection_key']} ({device['row']},{device['col']})")
             
             print(f"🎯 Automatic removal complete: {removed_count}/{len(expired_devices)} devices processed")
         else:
@@ -100,7 +89,8 @@ class StabilityAPI:
                 return jsonify({'success': False, 'error': 'Database connection failed'}), 500
             
             device_model = StabilityDeviceModel(stability_db)
-            devices = device_model.get_all()
+            # Iterated once: stream the cursor instead of materializing every device first
+            devices = device_model.iter_all()
             
             # Organize devices by grid structure
             grid_data = {
@@ -119,9 +109,9 @@ class StabilityAPI:
             
             # Populate grid with active devices
             for device in devices:
-                # Handle both old (camelCase) and new (snake_case) field names
-                section_key = device.get("section_key") or device.get("sectionKey")
-                subsection_key = device.get("subsection_key") or device.get("subsectionKey")
+                # Device fields are stored as canonical camelCase (see stability_models._canonicalize)
+                section_key = device.get("sectionKey")
+                subsection_key = device.get("subsectionKey")
                 row = device.get("row")
                 col = device.get("col")
                 
@@ -135,19 +125,19 @@ class StabilityAPI:
                 if section_key in grid_data and subsection_key in grid_data[section_key]:
                     # Convert to camelCase for frontend
                     device_for_frontend = {
-                        "id": device.get("device_id"),
-                        "deviceId": device.get("device_id"),
+                        "id": device.get("deviceId"),
+                        "deviceId": device.get("deviceId"),
                         "sectionKey": section_key,
                         "subsectionKey": subsection_key,
                         "row": row,
                         "col": col,
-                        "inDate": device.get("in_date"),
-                        "inTime": device.get("in_time"),
+                        "inDate": device.get("inDate"),
+                        "inTime": device.get("inTime"),
                         "hours": device.get("hours"),
                         "minutes": device.get("minutes"),
                         "seconds": device.get("seconds"),
-                        "timeHours": device.get("time_hours"),
-                        "createdBy": device.get("created_by"),
+                        "timeHours": device.get("timeHours"),
+                        "createdBy": device.get("createdBy"),
                         "createdAt": device.get("created_at").isoformat() if device.get("created_at") else None,
                         "status": device.get("status"),
                         "hasT80": device.get("has_t80", False),
@@ -447,17 +437,7 @@ class StabilityAPI:
                 return jsonify({'success': False, 'error': 'Database connection failed'}), 500
                 
             device_model = StabilityDeviceModel(stability_db)
-            expired_devices = device_model.check_expired_devices()
-            
-            removed_count = 0
-            if expired_devices:
-                for device in expired_devices:
-                    success = device_model.soft_delete(
-                        device['section_key'], device['subsection_key'],
-                        device['row'], device['col'], 'system'
-                    )
-                    if success:
-                        removed_count += 1
+            expired_devices, removed_count = device_model.remove_expired_devices('system')
             
             stability_db.close_connection()
             return jsonify({
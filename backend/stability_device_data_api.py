@@ -3,12 +3,83 @@ Stability Device Data API
 Provides graph data for individual devices from device_FR_averaged.csv
 """
 
+import csv
+import io
+import numpy as np
 import pandas as pd
 import os
+import threading
 from pathlib import Path
-from flask import jsonify
+from collections import OrderedDict
+from flask import Response
 import requests
-from io import StringIO
+from tempfile import SpooledTemporaryFile
+from json_utils import dumps, json_response
+
+# Downloads are streamed into a spooled temp file: kept in memory up to this size, then rolled to disk
+DOWNLOAD_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (5, 120)  # (connect, read) seconds
+
+# Serialized get_device_data responses kept per data generation (LRU)
+DEVICE_PAYLOAD_CACHE_SIZE = 256
+
+# Layout contract for the device_FR_averaged.parquet writer: rows sorted by 'Device', small row
+# groups with statistics, e.g. df.sort_values('Device').to_parquet(path, row_group_size=10_000,
+# compression='zstd', statistics=True). Per-device row groups then cover disjoint Device ranges, so a
+# filtered read (filters=[('Device', '==', device_id)]) prunes to ~1 group. Partial rewrites must keep
+# the ordering.
+
+# Keep-alive connections for the ranged parquet reads (one GET per column chunk)
+_SESSION = requests.Session()
+
+# Optional: pyarrow's multithreaded CSV parser. Falls back to pandas' default C parser.
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = None
+
+# Returned by _download_file_from_azure when the blob still has the ETag the caller sent
+_NOT_MODIFIED = object()
+
+
+class _BlobRangeFile(io.RawIOBase):
+    """Seekable read-only view of a blob that fetches only the requested bytes with HTTP Range GETs"""
+    
+    def __init__(self, url, size, etag=None):
+        self._url = url
+        self._size = size
+        self._pos = 0
+        # Fail the read (rather than mix two versions) if the blob is replaced mid-read
+        self._headers = {'If-Match': etag} if etag else {}
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+    
+    def readinto(self, b):
+        n = min(len(b), self._size - self._pos)
+        if n <= 0:
+            return 0
+        response = _SESSION.get(self._url, headers={**self._headers, 'Range': f'bytes={self._pos}-{self._pos + n - 1}'},
+                                timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+        # A server that ignores Range answers 200 with the whole blob
+        data = response.content if response.status_code == 206 else response.content[self._pos:self._pos + n]
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
 
 class StabilityDeviceDataAPI:
     """API for stability device performance data"""
@@ -18,22 +89,58 @@ class StabilityDeviceDataAPI:
         self.azure_container_url = os.getenv('AZURE_CONTAINER_URL')
         self.azure_container_sas = os.getenv('AZURE_CONTAINER_SAS')
         
-        # Cache for dataframes with timestamps
-        self._fr_df = None
-        self._fr_df_timestamp = None
-        self._t80_df = None
-        self._t80_df_timestamp = None
-        
-        # Cache TTL in seconds (30 minutes = 1800 seconds)
-        self.cache_ttl = 900  # Auto-refresh every 30 minutes - fresh data for LS Station!
-        
         # Available parameters for graphing
         self.available_parameters = [
             'PCE', 'Max_Power', 'FF', 'J_sc', 'V_oc', 'HI', 'R_shunt', 'R_series'
         ]
+        
+        # Cached files, one entry per dataset:
+        #   files      - candidate blobs, first that exists wins (Parquet first, CSV fallback)
+        #   columns    - projection for the parquet read (None = all columns)
+        #   prepare    - optional post-download step
+        #   df/index/ts/devices - cached frame, {device: row positions}, load time, sorted device list
+        #   etags      - {filename: ETag} of the loaded file, sent as If-None-Match when revalidating
+        #   load_lock  - serializes cold-start loads so concurrent first requests share one download
+        #   refreshing - held while a background refresh is in flight
+        self._caches = {
+            'fr': self._cache_entry(
+                ['device_FR_averaged.parquet', 'device_FR_averaged.csv'],
+                columns=['Device', 'Device_ID', 'Time_hrs', 'Batch'] + self.available_parameters,
+                prepare=self._prepare_fr_data
+            ),
+            't80': self._cache_entry(['T80_summary.parquet', 'T80_summary.csv'])
+        }
+        
+        # Frame, index and timestamp of a cache are swapped (and read) together under this lock
+        self._swap_lock = threading.Lock()
+        
+        # {(device_id, generation): JSON bytes}; generation is bumped on every frame swap
+        self._data_generation = 0
+        self._device_payloads = OrderedDict()
+        self._payload_lock = threading.Lock()
+        
+        # {filename: ETag} recorded by _download_file_from_azure
+        self._etags = {}
+        
+        # Cache TTL in seconds (30 minutes = 1800 seconds)
+        self.cache_ttl = 900  # Auto-refresh every 30 minutes - fresh data for LS Station!
+    
+    @staticmethod
+    def _cache_entry(files, columns=None, prepare=None):
+        """Empty cache registry entry (see __init__)"""
+        return {
+            'files': files, 'columns': columns, 'prepare': prepare,
+            'df': None, 'index': None, 'ts': None, 'devices': None, 'etags': {},
+            'load_lock': threading.Lock(), 'refreshing': threading.Lock()
+        }
     
-    def _download_file_from_azure(self, filename, columns=None):
-        """Download file from Azure Blob Storage - supports CSV and Parquet"""
+    def _download_file_from_azure(self, filename, columns=None, if_none_match=None):
+        """
+        Download file from Azure Blob Storage - supports CSV and Parquet
+        
+        With if_none_match (an ETag from self._etags) the request is conditional and
+        _NOT_MODIFIED is returned, without transferring the blob, if it has not changed.
+        """
         try:
             if not self.azure_container_url or not self.azure_container_sas:
                 print(f"⚠️ Azure credentials not configured")
@@ -44,25 +151,54 @@ class StabilityDeviceDataAPI:
             
             print(f"📥 Downloading {filename}..." + (f" (columns: {columns})" if columns else ""))
             
-            # Download the file
-            response = requests.get(blob_url, stream=True)
-            response.raise_for_status()
-            
-            # Check file type
-            if filename.endswith('.parquet'):
-                # Parquet: MUCH faster, supports column filtering
-                import io
-                df = pd.read_parquet(
-                    io.BytesIO(response.content),
-                    columns=columns  # Only load needed columns - HUGE performance boost!
-                )
-            else:
-                # CSV fallback
-                df = pd.read_csv(
-                    StringIO(response.text),
-                    usecols=columns
-                )
-            
+            # Parquet with a column list: fetch only the footer and those column chunks
+            if columns and filename.endswith('.parquet'):
+                try:
+                    df, etag = self._read_parquet_columns(blob_url, columns, if_none_match)
+                    if df is _NOT_MODIFIED:
+                        print(f"✅ {filename} unchanged (ETag match), keeping cached data")
+                        return df
+                    self._etags[filename] = etag
+                    print(f"✅ Downloaded {filename}: {len(df)} rows, {len(df.columns)} columns")
+                    return df
+                except Exception as e:
+                    print(f"⚠️ Ranged read of {filename} failed ({e}), downloading the whole file...")
+            
+            with SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES) as buf:
+                # Download the file in chunks (the whole blob is never held as one bytes object)
+                conditional = {'If-None-Match': if_none_match} if if_none_match else {}
+                with requests.get(blob_url, stream=True, headers=conditional, timeout=DOWNLOAD_TIMEOUT) as response:
+                    if response.status_code == 304:
+                        print(f"✅ {filename} unchanged (ETag match), keeping cached data")
+                        return _NOT_MODIFIED
+                    response.raise_for_status()
+                    etag = response.headers.get('ETag')
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        buf.write(chunk)
+                buf.seek(0)
+                
+                # Check file type
+                if filename.endswith('.parquet'):
+                    # Parquet: MUCH faster, supports column filtering
+                    df = pd.read_parquet(
+                        buf,
+                        columns=columns  # Only load needed columns - HUGE performance boost!
+                    )
+                else:
+                    # CSV fallback: parse the raw bytes (no decoded str copy of the whole file).
+                    # Projected columns are matched against the header first: usecols rejects missing names
+                    usecols = None
+                    if columns:
+                        header = next(csv.reader([buf.readline().decode('utf-8-sig')]), [])
+                        buf.seek(0)
+                        usecols = [c for c in dict.fromkeys(columns) if c in header] or None
+                    df = pd.read_csv(
+                        buf,
+                        usecols=usecols,
+                        **({'engine': CSV_ENGINE} if CSV_ENGINE else {})
+                    )
+            
+            self._etags[filename] = etag
             print(f"✅ Downloaded {filename}: {len(df)} rows, {len(df.columns)} columns")
             return df
             
@@ -70,83 +206,184 @@ class StabilityDeviceDataAPI:
             print(f"❌ Error downloading {filename} from Azure: {e}")
             return pd.DataFrame()
     
-    def _load_fr_data(self, columns=None):
-        """Load device_FR_averaged file from Azure - auto-refreshes every 8 hours"""
-        import time
+    @staticmethod
+    def _read_parquet_columns(blob_url, columns, if_none_match=None):
+        """
+        Read the given columns (those present in the schema) of a parquet blob over HTTP Range requests
         
-        # Check if cache is expired (8 hours = 28800 seconds)
-        current_time = time.time()
-        cache_expired = (
-            self._fr_df is None or 
-            self._fr_df_timestamp is None or 
-            (current_time - self._fr_df_timestamp) > self.cache_ttl
+        Returns (df, ETag), or (_NOT_MODIFIED, ETag) if the blob still matches if_none_match.
+        """
+        import pyarrow.parquet as pq
+        
+        head = _SESSION.head(blob_url, headers={'If-None-Match': if_none_match} if if_none_match else {},
+                             timeout=DOWNLOAD_TIMEOUT)
+        if head.status_code == 304:
+            return _NOT_MODIFIED, if_none_match
+        head.raise_for_status()
+        size = int(head.headers['Content-Length'])
+        etag = head.headers.get('ETag')
+        
+        with io.BufferedReader(_BlobRangeFile(blob_url, size, etag), buffer_size=DOWNLOAD_CHUNK_SIZE) as f:
+            names = pq.ParquetFile(f).schema_arrow.names
+            f.seek(0)
+            return pd.read_parquet(f, columns=[c for c in dict.fromkeys(columns) if c in names]), etag
+    
+    @staticmethod
+    def _build_device_index(df):
+        """{device: row positions} over the 'Device' (or 'Device_ID') column, or None if neither exists"""
+        device_column = 'Device' if 'Device' in df.columns else 'Device_ID' if 'Device_ID' in df.columns else None
+        if device_column is None:
+            return None
+        return df.groupby(device_column, sort=False, observed=True).indices
+    
+    @staticmethod
+    def _t80_info(t80_df, device_rows):
+        """T80 fields of a device's (first) T80 summary row; missing columns and NaN become None/False"""
+        # One dict conversion instead of a Series membership test + lookup per field
+        t80_row = t80_df.iloc[device_rows[0]].to_dict()
+        
+        def value(col):
+            v = t80_row.get(col)
+            return None if v is None or pd.isna(v) else v
+        
+        reached, t80_hours, initial_pce, t80_pce = (
+            value(col) for col in ('Reached_T80', 'T80_hours', 'Baseline_PCE', 'Threshold_PCE')
         )
+        return {
+            'has_t80': bool(reached) if reached is not None else False,
+            't80_hours': float(t80_hours) if t80_hours is not None else None,
+            'initial_pce': float(initial_pce) if initial_pce is not None else None,
+            't80_pce': float(t80_pce) if t80_pce is not None else None
+        }
+    
+    def _prepare_fr_data(self, df):
+        """Post-download step for device_FR_averaged: compact id columns and sort by (device, time)"""
+        if df.empty:
+            print(f"❌ Neither Parquet nor CSV found! Check Azure container.")
+            print(f"   Container URL: {self.azure_container_url}")
+            print(f"   Looking for: device_FR_averaged.parquet or .csv")
+            return df
         
-        # Load/refresh data if cache is empty or expired
-        if cache_expired:
-            df = pd.DataFrame()
-            
-            # Try Parquet first (10-100x faster!) - EXACT filename from Azure
-            filename = "device_FR_averaged.parquet"
-            if self._fr_df is None:
-                print(f"🔍 Loading {filename} with ~1000 samples (FIRST TIME)...")
-            else:
-                print(f"🔄 Refreshing {filename} (cache expired after 30 minutes)...")
-            
-            df = self._download_file_from_azure(filename, columns=None)  # Load ALL columns
-            
-            if df.empty:
-                print(f"⚠️ {filename} not found, trying CSV...")
-                filename = "device_FR_averaged.csv"
-                df = self._download_file_from_azure(filename, columns=None)
-            
-            if df.empty:
-                print(f"❌ Neither Parquet nor CSV found! Check Azure container.")
-                print(f"   Container URL: {self.azure_container_url}")
-                print(f"   Looking for: device_FR_averaged.parquet or .csv")
-            else:
-                print(f"✅ Cached {len(df)} rows for ALL devices - valid for 30 minutes")
-            
-            self._fr_df = df
-            self._fr_df_timestamp = current_time
+        # Columns stay on the NumPy backend: the float columns form one (n_columns, n_rows) block, so each
+        # column is already contiguous, and per-device take() + to_numpy() is ~8x faster than on Arrow arrays.
+        # Parameters and Time_hrs stay float64: float32 would change the served values (10.1234 -> 10.12339973).
+        # Low-cardinality id columns as category: int codes instead of one Python str per row
+        for col in ('Device', 'Device_ID', 'Batch'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
         
-        # Filter columns in memory if requested (super fast!)
-        if columns and self._fr_df is not None:
-            existing_cols = [col for col in columns if col in self._fr_df.columns]
-            return self._fr_df[existing_cols] if existing_cols else self._fr_df
+        # Sort once by (device, time) so each device's rows come out of the index already in time order
+        device_column = 'Device' if 'Device' in df.columns else 'Device_ID' if 'Device_ID' in df.columns else None
+        if device_column is not None and 'Time_hrs' in df.columns:
+            df = df.sort_values([device_column, 'Time_hrs'], ignore_index=True)
+        print(f"✅ Cached {len(df)} rows for ALL devices - valid for 30 minutes")
+        return df
+    
+    def _fetch_cached(self, name, revalidate=False):
+        """
+        Download a cached file (first of its candidate files that exists); empty DataFrame if none does
+        
+        With revalidate=True the downloads are conditional on the stored ETags and
+        _NOT_MODIFIED is returned if the file is unchanged.
+        """
+        cache = self._caches[name]
+        etags = cache['etags'] if revalidate else {}
+        
+        df = pd.DataFrame()
+        for filename in cache['files']:
+            df = self._download_file_from_azure(filename, columns=cache['columns'], if_none_match=etags.get(filename))
+            if df is _NOT_MODIFIED:
+                return df
+            if not df.empty:
+                cache['etags'] = {filename: self._etags.get(filename)}
+                if filename.endswith('.csv'):
+                    # Still downloads every byte; only parsing is projected
+                    print(f"⚠️ Loaded {filename}: the CSV fallback is deprecated - publish {cache['files'][0]} instead")
+                break
+            print(f"⚠️ {filename} not found" + (", trying next..." if filename != cache['files'][-1] else ""))
         
-        return self._fr_df
+        return cache['prepare'](df) if cache['prepare'] else df
     
-    def _load_t80_data(self):
-        """Load T80_summary file from Azure - auto-refreshes every 8 hours"""
+    def _store_cached(self, name, df, timestamp):
+        """Swap in a new dataframe together with its device index"""
+        device_index = self._build_device_index(df)
+        cache = self._caches[name]
+        with self._swap_lock:
+            cache['df'], cache['index'], cache['ts'], cache['devices'] = df, device_index, timestamp, None
+            self._new_data_generation()
+    
+    def _new_data_generation(self):
+        """Invalidate the serialized device payloads (call with _swap_lock held)"""
+        self._data_generation += 1
+        with self._payload_lock:
+            self._device_payloads.clear()
+    
+    def _refresh_async(self, name):
+        """Background refresh of a cache (stale data keeps being served until the swap)"""
         import time
         
-        # Check if cache is expired (8 hours)
+        cache = self._caches[name]
+        try:
+            df = self._fetch_cached(name, revalidate=True)
+            if df is _NOT_MODIFIED:
+                # Upstream unchanged: keep the cached frame, restart its TTL
+                with self._swap_lock:
+                    cache['ts'] = time.time()
+            elif not df.empty:
+                # Keep serving the stale copy if the download failed
+                self._store_cached(name, df, time.time())
+        except Exception as e:
+            print(f"❌ Background refresh of {cache['files'][0]} failed: {e}")
+        finally:
+            cache['refreshing'].release()
+    
+    def _load_cached(self, name, with_index=False):
+        """
+        Load a cached file from Azure - auto-refreshes every 30 minutes
+        
+        Only a cold start downloads on the request path; an expired cache is served stale while a
+        background thread refreshes it. With with_index=True returns (df, device index) from the same load.
+        """
+        import time
+        
+        cache = self._caches[name]
         current_time = time.time()
         cache_expired = (
-            self._t80_df is None or 
-            self._t80_df_timestamp is None or 
-            (current_time - self._t80_df_timestamp) > self.cache_ttl
+            cache['df'] is None or 
+            cache['ts'] is None or 
+            (current_time - cache['ts']) > self.cache_ttl
         )
         
         if cache_expired:
-            # Try Parquet first, fallback to CSV
-            filename = "T80_summary.parquet"
-            if self._t80_df is None:
-                print(f"🔍 Loading {filename}...")
-            else:
-                print(f"🔄 Refreshing {filename} (cache expired after 8 hours)...")
-            
-            df = self._download_file_from_azure(filename)
-            
-            if df.empty:
-                filename = "T80_summary.csv"
-                df = self._download_file_from_azure(filename)
-            
-            self._t80_df = df
-            self._t80_df_timestamp = current_time
+            if cache['df'] is None:
+                # Concurrent cold-start requests wait for a single download
+                with cache['load_lock']:
+                    if cache['df'] is None:
+                        print(f"🔍 Loading {cache['files'][0]} (FIRST TIME)...")
+                        self._store_cached(name, self._fetch_cached(name), current_time)
+            elif cache['refreshing'].acquire(blocking=False):
+                print(f"🔄 Refreshing {cache['files'][0]} in background (cache expired after 30 minutes)...")
+                threading.Thread(target=self._refresh_async, args=(name,), daemon=True).start()
         
-        return self._t80_df
+        with self._swap_lock:
+            df, device_index = cache['df'], cache['index']
+        
+        return (df, device_index) if with_index else df
+    
+    def _load_fr_data(self, columns=None, with_index=False):
+        """Load device_FR_averaged (see _load_cached), optionally filtered to the given columns"""
+        fr_df, device_index = self._load_cached('fr', with_index=True)
+        
+        # Filter columns in memory if requested (super fast!)
+        if columns and fr_df is not None:
+            existing_cols = [col for col in columns if col in fr_df.columns]
+            fr_df = fr_df[existing_cols] if existing_cols else fr_df
+        
+        return (fr_df, device_index) if with_index else fr_df
+    
+    def _load_t80_data(self, with_index=False):
+        """Load T80_summary (see _load_cached)"""
+        return self._load_cached('t80', with_index=with_index)
     
     def get_device_data(self, device_id):
         """
@@ -161,83 +398,74 @@ class StabilityDeviceDataAPI:
         try:
             print(f"🔍 Fetching data for {device_id}...")
             
-            # OPTIMIZATION: Only load columns we need for this device
-            # This makes it MUCH faster with large files!
-            needed_columns = ['Device', 'Device_ID', 'Time_hrs', 'Batch'] + self.available_parameters
+            # Read before loading: a concurrent swap can only file newer data under an older key
+            generation = self._data_generation
+            
+            # The cached frame holds only the served columns (projected at download)
+            fr_df, fr_device_index = self._load_fr_data(with_index=True)
+            t80_df, t80_device_index = self._load_t80_data(with_index=True)
             
-            # Load only needed columns (Parquet is super fast at this!)
-            fr_df = self._load_fr_data(columns=needed_columns)
-            t80_df = self._load_t80_data()
+            # Repeat requests for a device are served from the serialized response
+            key = (device_id, generation)
+            with self._payload_lock:
+                body = self._device_payloads.get(key)
+                if body is not None:
+                    self._device_payloads.move_to_end(key)
+            if body is not None:
+                return Response(body, mimetype='application/json')
             
             if fr_df.empty:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Device FR data not available'
-                }), 404
-            
-            # Filter data for this device - check both 'Device' and 'Device_ID' columns
-            if 'Device' in fr_df.columns:
-                device_data = fr_df[fr_df['Device'] == device_id].copy()
-            elif 'Device_ID' in fr_df.columns:
-                device_data = fr_df[fr_df['Device_ID'] == device_id].copy()
-            else:
-                return jsonify({
+                }, 404)
+            
+            # Look up this device's rows in the per-device index ('Device', else 'Device_ID' column)
+            if fr_device_index is None:
+                return json_response({
                     'success': False,
                     'error': 'Device column not found in CSV'
-                }), 404
+                }, 404)
             
-            if device_data.empty:
-                return jsonify({
+            device_rows = fr_device_index.get(device_id)
+            if device_rows is None:
+                return json_response({
                     'success': False,
                     'error': f'No data found for device {device_id}'
-                }), 404
-            
-            # Sort by time
-            device_data = device_data.sort_values('Time_hrs')
-            
-            # Prepare time series data
-            time_series = []
-            for _, row in device_data.iterrows():
-                data_point = {
-                    'time_hrs': float(row['Time_hrs']),
-                    'batch': int(row['Batch']) if pd.notna(row['Batch']) else 0
-                }
-                
-                # Add all available parameters
-                for param in self.available_parameters:
-                    if param in row and pd.notna(row[param]):
-                        data_point[param] = float(row[param])
-                    else:
-                        data_point[param] = None
-                
-                time_series.append(data_point)
+                }, 404)
+            
+            # Select the device's rows first: no per-request copy of whole columns
+            # (rows are stored sorted by time within each device, so no per-request sort)
+            device_data = fr_df.take(device_rows)
+            
+            # Prepare time series data: one array per column, zipped into records (no per-row Series)
+            batch = device_data['Batch']
+            columns = {
+                'time_hrs': device_data['Time_hrs'].to_numpy(dtype='float64').tolist(),
+                'batch': [int(b) if present else 0 for b, present in zip(batch.tolist(), batch.notna().tolist())]
+            }
+            
+            # Add all available parameters (missing values and columns become None)
+            present = set(device_data.columns)
+            for param in self.available_parameters:
+                if param in present:
+                    values = device_data[param].to_numpy(dtype='float64', na_value=np.nan).tolist()
+                    columns[param] = [None if v != v else v for v in values]
+                else:
+                    columns[param] = [None] * len(device_data)
+            
+            time_series = [dict(zip(columns, row)) for row in zip(*columns.values())]
             
             # Get T80 info if available from T80 summary
             t80_info = {'has_t80': False}
             if not t80_df.empty:
                 # Check for device in T80 summary
-                if 'Device' in t80_df.columns:
-                    t80_row = t80_df[t80_df['Device'] == device_id]
-                elif 'Device_ID' in t80_df.columns:
-                    t80_row = t80_df[t80_df['Device_ID'] == device_id]
-                else:
-                    t80_row = pd.DataFrame()
+                t80_rows = t80_device_index.get(device_id) if t80_device_index is not None else None
                 
-                if not t80_row.empty:
-                    t80_row = t80_row.iloc[0]
-                    # Check if device has reached T80
-                    reached = False
-                    if 'Reached_T80' in t80_row:
-                        reached = bool(t80_row['Reached_T80']) if pd.notna(t80_row['Reached_T80']) else False
-                    
-                    t80_info = {
-                        'has_t80': reached,
-                        't80_hours': float(t80_row['T80_hours']) if 'T80_hours' in t80_row and pd.notna(t80_row['T80_hours']) else None,
-                        'initial_pce': float(t80_row['Baseline_PCE']) if 'Baseline_PCE' in t80_row and pd.notna(t80_row['Baseline_PCE']) else None,
-                        't80_pce': float(t80_row['Threshold_PCE']) if 'Threshold_PCE' in t80_row and pd.notna(t80_row['Threshold_PCE']) else None
-                    }
-            
-            return jsonify({
+                if t80_rows is not None:
+                    t80_info = self._t80_info(t80_df, t80_rows)
+            
+            body = dumps({
                 'success': True,
                 'device_id': device_id,
                 'data_points': len(time_series),
@@ -246,12 +474,19 @@ class StabilityDeviceDataAPI:
                 'available_parameters': self.available_parameters
             })
             
+            with self._payload_lock:
+                self._device_payloads[key] = body
+                if len(self._device_payloads) > DEVICE_PAYLOAD_CACHE_SIZE:
+                    self._device_payloads.popitem(last=False)
+            
+            return Response(body, mimetype='application/json')
+            
         except Exception as e:
             print(f"❌ Error getting device data: {e}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
-            }), 500
+            }, 500)
     
     def get_available_devices(self):
         """Get list of all devices with data"""
@@ -259,20 +494,33 @@ class StabilityDeviceDataAPI:
             fr_df = self._load_fr_data()
             
             if fr_df.empty:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'No device data available'
-                }), 404
-            
-            # Check for both 'Device' and 'Device_ID' columns
-            if 'Device' in fr_df.columns:
-                devices = sorted(fr_df['Device'].unique().tolist())
-            elif 'Device_ID' in fr_df.columns:
-                devices = sorted(fr_df['Device_ID'].unique().tolist())
-            else:
-                devices = []
+                }, 404)
+            
+            # The sorted list only changes when a new frame is swapped in - built once per frame
+            with self._swap_lock:
+                fr_cache = self._caches['fr']
+                devices = fr_cache['devices'] if fr_cache['df'] is fr_df else None
+            
+            if devices is None:
+                # Check for both 'Device' and 'Device_ID' columns
+                device_column = 'Device' if 'Device' in fr_df.columns else 'Device_ID' if 'Device_ID' in fr_df.columns else None
+                if device_column is None:
+                    devices = []
+                elif isinstance(fr_df[device_column].dtype, pd.CategoricalDtype):
+                    # Categories are the de-duplicated ids (all observed at load), usually already sorted
+                    categories = fr_df[device_column].cat.categories
+                    devices = categories.tolist() if categories.is_monotonic_increasing else sorted(categories.tolist())
+                else:
+                    devices = sorted(fr_df[device_column].unique().tolist())
+                
+                with self._swap_lock:
+                    if fr_cache['df'] is fr_df:
+                        fr_cache['devices'] = devices
             
-            return jsonify({
+            return json_response({
                 'success': True,
                 'devices': devices,
                 'count': len(devices)
@@ -280,41 +528,32 @@ class StabilityDeviceDataAPI:
             
         except Exception as e:
             print(f"❌ Error getting available devices: {e}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
-            }), 500
+            }, 500)
     
     def check_device_t80_status(self, device_id):
         """Check if a device has reached T80"""
         try:
-            t80_df = self._load_t80_data()
+            t80_df, t80_device_index = self._load_t80_data(with_index=True)
             
             if t80_df.empty:
                 # T80 summary doesn't exist or is empty - this is normal
                 return {'has_t80': False}
             
-            # Check both 'Device_ID' and 'Device' columns for compatibility
-            if 'Device' in t80_df.columns:
-                device_t80 = t80_df[t80_df['Device'] == device_id]
-            elif 'Device_ID' in t80_df.columns:
-                device_t80 = t80_df[t80_df['Device_ID'] == device_id]
-            else:
+            # Check both 'Device_ID' and 'Device' columns for compatibility (per-device index)
+            if t80_device_index is None:
                 print(f"⚠️ T80 summary has no Device_ID or Device column")
                 return {'has_t80': False}
             
-            if device_t80.empty:
+            device_rows = t80_device_index.get(device_id)
+            if device_rows is None:
                 # Device not in T80 summary - hasn't reached T80 yet
                 return {'has_t80': False}
             
             # Device found in T80 summary - it has reached T80
-            t80_row = device_t80.iloc[0]
-            return {
-                'has_t80': bool(t80_row['Reached_T80']) if 'Reached_T80' in t80_row and pd.notna(t80_row['Reached_T80']) else False,
-                't80_hours': float(t80_row['T80_hours']) if 'T80_hours' in t80_row and pd.notna(t80_row['T80_hours']) else None,
-                'initial_pce': float(t80_row['Baseline_PCE']) if 'Baseline_PCE' in t80_row and pd.notna(t80_row['Baseline_PCE']) else None,
-                't80_pce': float(t80_row['Threshold_PCE']) if 'Threshold_PCE' in t80_row and pd.notna(t80_row['Threshold_PCE']) else None
-            }
+            return self._t80_info(t80_df, device_rows)
             
         except Exception as e:
             print(f"❌ Error checking T80 status for {device_id}: {e}")
@@ -322,35 +561,74 @@ class StabilityDeviceDataAPI:
             traceback.print_exc()
             return {'has_t80': False}
     
+    def check_device_t80_status_bulk(self, device_ids):
+        """T80 status for many devices at once: {device_id: check_device_t80_status-style dict}"""
+        try:
+            t80_df, t80_device_index = self._load_t80_data(with_index=True)
+            
+            if t80_df.empty or t80_device_index is None:
+                return {device_id: {'has_t80': False} for device_id in device_ids}
+            
+            statuses = {}
+            for device_id in device_ids:
+                device_rows = t80_device_index.get(device_id)
+                statuses[device_id] = self._t80_info(t80_df, device_rows) if device_rows is not None else {'has_t80': False}
+            return statuses
+            
+        except Exception as e:
+            print(f"❌ Error checking T80 status for {len(device_ids)} devices: {e}")
+            return {device_id: {'has_t80': False} for device_id in device_ids}
+    
     def refresh_data(self):
         """Clear cache and reload data from files"""
         print("🔄 Force refresh requested - clearing cache...")
-        self._fr_df = None
-        self._t80_df = None
-        self._fr_df_timestamp = None
-        self._t80_df_timestamp = None
+        with self._swap_lock:
+            for cache in self._caches.values():
+                cache.update(df=None, index=None, ts=None, devices=None, etags={})
+            self._new_data_generation()
         
         # Attempt to reload
         fr_df = self._load_fr_data()
         t80_df = self._load_t80_data()
         
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Data refreshed successfully',
             'fr_rows': len(fr_df) if not fr_df.empty else 0,
             't80_rows': len(t80_df) if not t80_df.empty else 0
         })
     
+    def invalidate_data(self):
+        """
+        Mark the cached files as stale (called by the ETL job after it writes new files)
+        
+        The cached frames keep being served while a background revalidation fetches the new ones;
+        unchanged files cost only a 304.
+        """
+        print("🔄 Invalidation requested - revalidating cached data...")
+        with self._swap_lock:
+            for cache in self._caches.values():
+                cache['ts'] = None
+        
+        # Starts the background refreshes (or loads synchronously on a cold cache)
+        self._load_fr_data()
+        self._load_t80_data()
+        
+        return json_response({
+            'success': True,
+            'message': 'Cache invalidated - data is being revalidated'
+        })
+    
     def check_azure_files(self):
         """Check what files are available in Azure - for debugging"""
         try:
             from azure.storage.blob import BlobServiceClient
             
             if not self.azure_container_url or not self.azure_container_sas:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Azure credentials not configured'
-                }), 500
+                }, 500)
             
             # Parse container URL
             account_url = '/'.join(self.azure_container_url.split('/')[:3])
@@ -370,7 +648,7 @@ class StabilityDeviceDataAPI:
                     'size': f"{blob.size / (1024*1024):.2f} MB"
                 })
             
-            return jsonify({
+            return json_response({
                 'success': True,
                 'container': container_name,
                 'files': files,
@@ -378,11 +656,11 @@ class StabilityDeviceDataAPI:
             })
             
         except Exception as e:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e),
                 'container_url': self.azure_container_url
-            }), 500
+            }, 500)
     
     def get_cache_status(self):
         """
@@ -394,40 +672,42 @@ class StabilityDeviceDataAPI:
             from datetime import datetime, timedelta
             
             current_time = time.time()
+            fr_df, fr_timestamp = self._caches['fr']['df'], self._caches['fr']['ts']
+            t80_df, t80_timestamp = self._caches['t80']['df'], self._caches['t80']['ts']
             
             # Check FR data cache
             fr_status = {
-                'cached': self._fr_df is not None,
-                'rows': len(self._fr_df) if self._fr_df is not None else 0,
-                'devices': len(self._fr_df['Device_ID'].unique()) if self._fr_df is not None and 'Device_ID' in self._fr_df.columns else 0
+                'cached': fr_df is not None,
+                'rows': len(fr_df) if fr_df is not None else 0,
+                'devices': len(fr_df['Device_ID'].unique()) if fr_df is not None and 'Device_ID' in fr_df.columns else 0
             }
             
-            if self._fr_df_timestamp:
-                age_seconds = current_time - self._fr_df_timestamp
+            if fr_timestamp:
+                age_seconds = current_time - fr_timestamp
                 remaining_seconds = self.cache_ttl - age_seconds
                 
-                fr_status['cached_at'] = datetime.fromtimestamp(self._fr_df_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                fr_status['cached_at'] = datetime.fromtimestamp(fr_timestamp).strftime('%Y-%m-%d %H:%M:%S')
                 fr_status['age_hours'] = round(age_seconds / 3600, 2)
                 fr_status['expires_in_hours'] = round(remaining_seconds / 3600, 2)
-                fr_status['will_refresh_at'] = datetime.fromtimestamp(self._fr_df_timestamp + self.cache_ttl).strftime('%Y-%m-%d %H:%M:%S')
+                fr_status['will_refresh_at'] = datetime.fromtimestamp(fr_timestamp + self.cache_ttl).strftime('%Y-%m-%d %H:%M:%S')
                 fr_status['expired'] = remaining_seconds <= 0
             
             # Check T80 data cache
             t80_status = {
-                'cached': self._t80_df is not None,
-                'rows': len(self._t80_df) if self._t80_df is not None else 0
+                'cached': t80_df is not None,
+                'rows': len(t80_df) if t80_df is not None else 0
             }
             
-            if self._t80_df_timestamp:
-                age_seconds = current_time - self._t80_df_timestamp
+            if t80_timestamp:
+                age_seconds = current_time - t80_timestamp
                 remaining_seconds = self.cache_ttl - age_seconds
                 
-                t80_status['cached_at'] = datetime.fromtimestamp(self._t80_df_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                t80_status['cached_at'] = datetime.fromtimestamp(t80_timestamp).strftime('%Y-%m-%d %H:%M:%S')
                 t80_status['age_hours'] = round(age_seconds / 3600, 2)
                 t80_status['expires_in_hours'] = round(remaining_seconds / 3600, 2)
                 t80_status['expired'] = remaining_seconds <= 0
             
-            return jsonify({
+            return json_response({
                 'success': True,
                 'cache_ttl_hours': self.cache_ttl / 3600,
                 'fr_data': fr_status,
@@ -437,18 +717,21 @@ class StabilityDeviceDataAPI:
             
         except Exception as e:
             print(f"❌ Error getting cache status: {e}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
-            }), 500
+            }, 500)
 
 
 # Singleton instance
 _device_data_api_instance = None
+_init_lock = threading.Lock()
 
 def get_device_data_api():
-    """Get or create the singleton device data API instance"""
+    """Get or create the singleton device data API instance (thread-safe)"""
     global _device_data_api_instance
     if _device_data_api_instance is None:
-        _device_data_api_instance = StabilityDeviceDataAPI()
+        with _init_lock:
+            if _device_data_api_instance is None:
+                _device_data_api_instance = StabilityDeviceDataAPI()
     return _device_data_api_instance
@@ -5,53 +5,338 @@ Uses the same MongoDB connection as the main data management system
 
 import os
 import time
+import atexit
+import queue
+import threading
 import logging
+import logging.handlers
 from datetime import datetime, timedelta
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import json
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# debug.log trace of position lookups and deletes: one long-lived file handle, written from a
+# background listener thread so request threads only enqueue records
+_debug_log = logging.getLogger("stability.debug")
+_debug_log.setLevel(logging.DEBUG)
+_debug_log.propagate = False
+_debug_log_handler = logging.handlers.QueueHandler(queue.Queue(-1))
+_debug_log.addHandler(_debug_log_handler)
+_debug_log_listener = None
+_debug_log_pid = None
+_debug_log_lock = threading.Lock()
+
+
+def _start_debug_log_listener():
+    """Start the debug.log listener thread in this process (threads don't survive gunicorn's fork)"""
+    global _debug_log_listener, _debug_log_pid
+    with _debug_log_lock:
+        if _debug_log_pid == os.getpid():
+            return
+        if _debug_log_pid is not None:
+            # Forked from a process that had a listener: start from a fresh queue
+            _debug_log_handler.queue = queue.Queue(-1)
+        _debug_log_listener = logging.handlers.QueueListener(
+            _debug_log_handler.queue,
+            logging.handlers.RotatingFileHandler("debug.log", maxBytes=10_000_000, backupCount=3, encoding="utf-8", delay=True)
+        )
+        _debug_log_listener.start()
+        atexit.register(_debug_log_listener.stop)
+        _debug_log_pid = os.getpid()
+
+
+def _reset_debug_log_lock():
+    global _debug_log_lock
+    _debug_log_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_debug_log_lock)
+
+
+def _trace(msg, *args):
+    """Debug-level trace to the module logger and debug.log (formatted only if a handler takes it)"""
+    logger.debug(msg, *args)
+    if _debug_log_pid != os.getpid():
+        _start_debug_log_listener()
+    _debug_log.debug(msg, *args)
+
+# Opt-in: a TTL index deletes expired devices and a change stream archives each deletion to history,
+# replacing the expiry polling. Needs a replica set, MongoDB 6+ (pre-images) and a server clock that
+# matches the naive local times stored in expiry_at.
+TTL_EXPIRY_ENABLED = os.getenv('STABILITY_TTL_EXPIRY', '').lower() in ('1', 'true', 'yes')
+# removed_by on history entries archived by the TTL watcher
+TTL_REMOVED_BY = "System-TTL"
+
+# Legacy snake_case field -> canonical camelCase field stored on stability devices
+CANONICAL_FIELDS = {
+    'section_key': 'sectionKey',
+    'subsection_key': 'subsectionKey',
+    'in_date': 'inDate',
+    'in_time': 'inTime',
+    'time_hours': 'timeHours',
+    'device_id': 'deviceId',
+    'created_by': 'createdBy'
+}
+
+
+# Fields the device list consumers read (the grid view); everything else stays on the server
+DEVICE_LIST_FIELDS = (
+    'deviceId', 'sectionKey', 'subsectionKey', 'row', 'col', 'inDate', 'inTime',
+    'hours', 'minutes', 'seconds', 'timeHours', 'createdBy', 'created_at', 'status', 't80_reached_at'
+)
+
+# Fields check_expired_devices needs
+EXPIRY_FIELDS = ('deviceId', 'sectionKey', 'subsectionKey', 'row', 'col', 'inDate', 'inTime', 'timeHours')
+
+
+# Fields expiry_at (and in_datetime) are derived from
+SCHEDULE_FIELDS = ('inDate', 'inTime', 'timeHours')
+
+# Server-side equivalents of _parse_in_datetime / _expiry_at, for pipeline updates
+# (null when the schedule is missing/unparseable)
+IN_DATETIME_EXPR = {
+    "$dateFromString": {"dateString": {"$concat": ["$inDate", " ", "$inTime"]}, "onError": None, "onNull": None}
+}
+_TIME_HOURS_EXPR = {"$convert": {"input": "$timeHours", "to": "double", "onError": None, "onNull": None}}
+EXPIRY_AT_EXPR = {
+    "$cond": [
+        {"$in": [_TIME_HOURS_EXPR, [None, 0]]},
+        None,
+        {"$add": [IN_DATETIME_EXPR, {"$multiply": [_TIME_HOURS_EXPR, 3600 * 1000]}]}
+    ]
+}
+
+
+def _canonicalize(data):
+    """Copy of data with legacy snake_case field names mapped to their camelCase names"""
+    return {CANONICAL_FIELDS.get(key, key): value for key, value in data.items()}
+
+
+def _parse_in_datetime(in_date, in_time):
+    """Device in date + time as a datetime (time as HH:MM:SS or HH:MM)"""
+    # Pick the format up front instead of trying one and catching the ValueError
+    fmt = "%Y-%m-%d %H:%M:%S" if in_time.count(':') == 2 else "%Y-%m-%d %H:%M"
+    return datetime.strptime(f"{in_date} {in_time}", fmt)
+
+
+def _in_datetime(device):
+    """The device's in datetime: the stored in_datetime, else parsed from inDate/inTime (None if unusable)"""
+    if isinstance(device.get('in_datetime'), datetime):
+        return device['in_datetime']
+    in_date, in_time = device.get('inDate'), device.get('inTime')
+    if not in_date or not in_time:
+        return None
+    try:
+        return _parse_in_datetime(in_date, in_time)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _object_id(device_id):
+    """ObjectId for a device/history id given either natively or as its hex string"""
+    from bson import ObjectId
+    return device_id if isinstance(device_id, ObjectId) else ObjectId(device_id)
+
+
+def _expiry_at(device):
+    """When the device's planned time runs out (in datetime + timeHours), or None without a usable schedule"""
+    in_datetime = _in_datetime(device)
+    time_hours = device.get('timeHours')
+    if not time_hours or in_datetime is None:
+        return None
+    try:
+        return in_datetime + timedelta(hours=float(time_hours))
+    except (ValueError, TypeError):
+        return None
+
 class StabilityDatabaseManager:
     """Database connection manager for stability system"""
     
-    def __init__(self):
-        # MongoDB connection - following exact same pattern as DataManagementAPI
-        self.connection_string = os.getenv('MONGODB_CONNECTION_STRING')
-        self.database_name = os.getenv('DATABASE_NAME', 'passdown_db')
-        self.client = None
-        self.db = None
-        self.connected = False
-        self._connect_to_mongodb()
+    # Indexes and the field-name migration run once per process, not on every manager instantiation
+    _indexes_ensured = False
+    _fields_migrated = False
+    # Background thread archiving TTL deletions (TTL_EXPIRY_ENABLED only)
+    _expiry_watcher = None
+    # Process-wide manager: its pooled client is shared by every request
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    def __new__(cls):
+        """Return the shared connected manager; only the first call (or a retry after failure) connects"""
+        with cls._instance_lock:
+            if cls._instance is not None:
+                return cls._instance
+            instance = super().__new__(cls)
+            # MongoDB connection - following exact same pattern as DataManagementAPI
+            instance.connection_string = os.getenv('MONGODB_CONNECTION_STRING')
+            instance.database_name = os.getenv('DATABASE_NAME', 'passdown_db')
+            instance.client = None
+            instance.db = None
+            instance.connected = False
+            instance._connect_to_mongodb()
+            if instance.connected:
+                cls._instance = instance
+                atexit.register(instance.client.close)
+            return instance
     
     def _connect_to_mongodb(self):
         """Establish MongoDB connection - exact same pattern as DataManagementAPI"""
         try:
             if not self.connection_string:
-                logging.warning("MongoDB connection string not found. Using local fallback.")
+                logger.warning("MongoDB connection string not found. Using local fallback.")
                 return
             
-            self.client = MongoClient(self.connection_string)
+            # Pooled client, connected on first use; later managers reuse it without a handshake
+            self.client = MongoClient(
+                self.connection_string, connect=False, maxPoolSize=100, serverSelectionTimeoutMS=5000
+            )
             self.db = self.client[self.database_name]
-            # Test connection
+            # Test connection (once per process)
             self.client.server_info()
-            logging.info("✅ Stability MongoDB connection established")
+            logger.info("✅ Stability MongoDB connection established")
             self.connected = True
+            self._ensure_indexes()
+            self._migrate_field_names()
+            if TTL_EXPIRY_ENABLED:
+                self._start_ttl_expiry()
         except Exception as e:
-            logging.error(f"❌ Stability MongoDB connection failed: {e}")
+            logger.error("❌ Stability MongoDB connection failed: %s", e)
             self.client = None
             self.db = None
             self.connected = False
     
+    def _ensure_indexes(self):
+        """Create the indexes behind the position and history lookups (idempotent, once per process)"""
+        if StabilityDatabaseManager._indexes_ensured:
+            return
+        try:
+            # get_by_position: equality on section/subsection/row/col
+            self.db.stability_devices.create_index(
+                [("sectionKey", 1), ("subsectionKey", 1), ("row", 1), ("col", 1), ("status", 1)],
+                name="pos_lookup"
+            )
+            # update_by_position upserts: at most one active device per position
+            try:
+                self.db.stability_devices.create_index(
+                    [("sectionKey", 1), ("subsectionKey", 1), ("row", 1), ("col", 1)],
+                    unique=True, partialFilterExpression={"status": "active"}, name="pos_active"
+                )
+            except Exception as e:
+                logger.warning("⚠️ Could not create unique position index (duplicate active devices?): %s", e)
+            # check_expired_devices: equality on status, range on expiry_at
+            self.db.stability_devices.create_index([("status", 1), ("expiry_at", 1)], name="expiry_lookup")
+            # StabilityHistoryModel.get_by_device_id: equality on deviceId or legacy device_id, newest
+            # first (one index per $or branch)
+            self.db.stability_history.create_index([("deviceId", 1), ("created_at", -1)], name="device_history_camel")
+            self.db.stability_history.create_index([("device_id", 1), ("created_at", -1)], name="device_history")
+            StabilityDatabaseManager._indexes_ensured = True
+        except Exception as e:
+            logger.warning("⚠️ Could not create stability indexes: %s", e)
+    
+    def _migrate_field_names(self):
+        """One-shot schema upgrade: legacy snake_case fields -> camelCase names, backfill expiry_at"""
+        if StabilityDatabaseManager._fields_migrated:
+            return
+        try:
+            legacy = {"$or": [{field: {"$exists": True}} for field in CANONICAL_FIELDS]}
+            if self.db.stability_devices.find_one(legacy, {"_id": 1}) is not None:
+                for snake, camel in CANONICAL_FIELDS.items():
+                    # Rename where the camelCase field is missing, drop the duplicate where both exist
+                    self.db.stability_devices.update_many(
+                        {snake: {"$exists": True}, camel: {"$exists": False}}, {"$rename": {snake: camel}}
+                    )
+                    self.db.stability_devices.update_many({snake: {"$exists": True}}, {"$unset": {snake: ""}})
+                logger.info("✅ Migrated stability device fields to camelCase")
+            
+            # History entries copy the device fields; make sure the position is readable as camelCase
+            for snake in ('section_key', 'subsection_key'):
+                self.db.stability_history.update_many(
+                    {snake: {"$exists": True}, CANONICAL_FIELDS[snake]: {"$exists": False}},
+                    [{"$set": {CANONICAL_FIELDS[snake]: f"${snake}"}}]
+                )
+            
+            # Devices written before expiry_at / in_datetime existed get them computed server-side
+            self.db.stability_devices.update_many(
+                {"expiry_at": {"$exists": False}}, [{"$set": {"expiry_at": EXPIRY_AT_EXPR}}]
+            )
+            self.db.stability_devices.update_many(
+                {"in_datetime": {"$exists": False}}, [{"$set": {"in_datetime": IN_DATETIME_EXPR}}]
+            )
+            StabilityDatabaseManager._fields_migrated = True
+        except Exception as e:
+            logger.warning("⚠️ Could not migrate stability field names: %s", e)
+    
+    def _start_ttl_expiry(self):
+        """Let MongoDB delete expired devices and archive the deletions from a change stream (once per process)"""
+        if StabilityDatabaseManager._expiry_watcher is not None:
+            return
+        try:
+            # Deletion events carry the deleted document only with pre-images enabled
+            self.db.command("collMod", "stability_devices", changeStreamPreAndPostImages={"enabled": True})
+            self.db.stability_devices.create_index([("expiry_at", 1)], expireAfterSeconds=0, name="expiry_ttl")
+        except Exception as e:
+            logger.warning("⚠️ Could not enable TTL expiry for stability devices: %s", e)
+            return
+        
+        watcher = threading.Thread(target=self._archive_ttl_deletions, daemon=True)
+        StabilityDatabaseManager._expiry_watcher = watcher
+        watcher.start()
+    
+    def _archive_ttl_deletions(self):
+        """Change-stream loop: archive every deleted device that has no history entry yet
+        
+        Reconnects with backoff after errors (network blips, failovers), resuming after the last seen
+        change, so TTL deletions keep being archived for the life of the process.
+        """
+        # Own client so the long-lived change stream does not hold a connection from the request pool
+        client = MongoClient(self.connection_string)
+        db = client[self.database_name]
+        history_model = StabilityHistoryModel(self)
+        history_model.collection = db.stability_history
+        resume_token = None
+        backoff = 1
+        try:
+            while True:
+                try:
+                    with db.stability_devices.watch(
+                        [{"$match": {"operationType": "delete"}}], full_document_before_change="whenAvailable",
+                        resume_after=resume_token
+                    ) as stream:
+                        backoff = 1
+                        for change in stream:
+                            device = change.get("fullDocumentBeforeChange")
+                            # Every delete shows up here, including delete()/soft_delete() and the expiry
+                            # sweep, which archive the device themselves. Only an expired device can be a
+                            # TTL deletion; for those the event may still beat the caller's own archive,
+                            # which then replaces this entry (see archive_device)
+                            expiry_at = device.get("expiry_at") if device else None
+                            if isinstance(expiry_at, datetime) and expiry_at <= datetime.now():
+                                history_model.archive_device(device, TTL_REMOVED_BY)
+                            resume_token = stream.resume_token
+                except Exception as e:
+                    # A resume token that fell off the oplog (ChangeStreamHistoryLost) can't be resumed from
+                    if isinstance(e, OperationFailure) and e.code == 286:
+                        resume_token = None
+                    logger.warning("⚠️ Stability TTL expiry watcher interrupted, retrying in %ss: %s", backoff, e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+        finally:
+            client.close()
+    
     def connect(self):
         """Legacy connect method for backward compatibility"""
         return self.connected
     
     def close_connection(self):
-        """Close database connection"""
-        if self.client:
+        """Release the manager after a request; the shared pooled client stays open (closed at exit)"""
+        if self.client and self is not StabilityDatabaseManager._instance:
             self.client.close()
             self.connected = False
 
@@ -62,140 +347,139 @@ class StabilityDeviceModel:
         self.db_manager = db_manager
         self.collection = db_manager.db.stability_devices
     
-    def get_all(self):
-        """Get all active devices with T80 status"""
+    def get_all(self, fields=DEVICE_LIST_FIELDS):
+        """Get all active devices with T80 status (only the given fields; None for whole documents)"""
         try:
-            devices = list(self.collection.find({"status": {"$ne": "removed"}}))
-            
-            # Import device data API to check T80 status
-            try:
-                from stability_device_data_api import get_device_data_api
-                device_data_api = get_device_data_api()
-            except:
-                device_data_api = None
-            
-            # Convert ObjectId to string and add T80 status
-            for device in devices:
-                device['_id'] = str(device['_id'])
-                
-                # Check T80 status if device has deviceId
-                if device_data_api and 'deviceId' in device:
-                    t80_status = device_data_api.check_device_t80_status(device['deviceId'])
-                    device['has_t80'] = t80_status.get('has_t80', False)
-                    if t80_status.get('has_t80'):
-                        device['t80_info'] = t80_status
-                else:
-                    device['has_t80'] = False
-            
-            return devices
+            return list(self.iter_all(fields))
         except Exception as e:
-            print(f"Error getting devices: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error getting devices: %s", e)
             return []
     
+    def iter_all(self, fields=DEVICE_LIST_FIELDS, batch_size=500):
+        """Yield active devices with T80 status as the cursor streams them (for callers that iterate once)"""
+        projection = {field: 1 for field in fields} if fields else None
+        cursor = self.collection.find({"status": {"$ne": "removed"}}, projection).batch_size(batch_size)
+        
+        # Import device data API to check T80 status
+        try:
+            from stability_device_data_api import get_device_data_api
+            device_data_api = get_device_data_api()
+        except:
+            device_data_api = None
+        
+        # T80 status is looked up in bulk once per cursor batch, not per device
+        batch = []
+        for device in cursor:
+            batch.append(device)
+            if len(batch) == batch_size:
+                yield from self._with_t80_status(batch, device_data_api)
+                batch = []
+        if batch:
+            yield from self._with_t80_status(batch, device_data_api)
+    
+    @staticmethod
+    def _with_t80_status(devices, device_data_api):
+        """Add has_t80 / t80_info to a batch of devices"""
+        t80_statuses = {}
+        if device_data_api:
+            t80_statuses = device_data_api.check_device_t80_status_bulk(
+                [device['deviceId'] for device in devices if 'deviceId' in device]
+            )
+        
+        # Add T80 status (_id stays an ObjectId; jsonify stringifies it)
+        for device in devices:
+            # Check T80 status if device has deviceId
+            if device_data_api and 'deviceId' in device:
+                t80_status = t80_statuses.get(device['deviceId'], {})
+                device['has_t80'] = t80_status.get('has_t80', False)
+                if t80_status.get('has_t80'):
+                    device['t80_info'] = t80_status
+            else:
+                device['has_t80'] = False
+        
+        return devices
+    
     def get_by_id(self, device_id):
         """Get device by ID"""
         try:
-            from bson import ObjectId
-            device = self.collection.find_one({"_id": ObjectId(device_id)})
-            if device:
-                device['_id'] = str(device['_id'])
-            return device
+            return self.collection.find_one({"_id": _object_id(device_id)})
         except Exception as e:
-            print(f"Error getting device by ID: {e}")
+            logger.error("Error getting device by ID: %s", e)
             return None
     
+    @staticmethod
+    def _position_query(section_key, subsection_key, row, col):
+        """Filter for the active device at a grid position"""
+        # Field names are canonical camelCase (see _canonicalize / _migrate_field_names)
+        return {
+            "sectionKey": section_key,
+            "subsectionKey": subsection_key,
+            "row": row,
+            "col": col,
+            "status": {"$ne": "removed"}
+        }
+    
     def get_by_position(self, section_key, subsection_key, row, col):
         """Get device at specific position"""
         try:
-            # Primary query using camelCase (which is what the database actually uses)
-            query = {
-                "sectionKey": section_key,
-                "subsectionKey": subsection_key,
-                "row": row,
-                "col": col,
-                "status": {"$ne": "removed"}
-            }
+            query = self._position_query(section_key, subsection_key, row, col)
             
-            debug_msg = f"🔍 get_by_position query: section='{section_key}', subsection='{subsection_key}', row={row}, col={col}"
-            print(debug_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{debug_msg}\n")
+            _trace("🔍 get_by_position query: section='%s', subsection='%s', row=%s, col=%s",
+                   section_key, subsection_key, row, col)
             
             device = self.collection.find_one(query)
             
-            # If not found with camelCase, try snake_case as fallback
-            if not device:
-                query_fallback = {
-                    "section_key": section_key,
-                    "subsection_key": subsection_key,
-                    "row": row,
-                    "col": col,
-                    "status": {"$ne": "removed"}
-                }
-                device = self.collection.find_one(query_fallback)
-                if device:
-                    fallback_msg = f"� Found device using snake_case fallback"
-                    print(fallback_msg)
-                    with open("debug.log", "a", encoding="utf-8") as f:
-                        f.write(f"{fallback_msg}\n")
-            
             if device:
-                device['_id'] = str(device['_id'])
-                result_msg = f"✅ Found device: {device.get('deviceId', device.get('device_id', 'unknown'))}"
-                print(result_msg)
-                with open("debug.log", "a", encoding="utf-8") as f:
-                    f.write(f"{result_msg}\n")
+                _trace("✅ Found device: %s", device.get('deviceId', 'unknown'))
             else:
-                result_msg = f"❌ No device found at position"
-                print(result_msg)
-                with open("debug.log", "a", encoding="utf-8") as f:
-                    f.write(f"{result_msg}\n")
+                _trace("❌ No device found at position")
             return device
         except Exception as e:
-            error_msg = f"Error getting device by position: {e}"
-            print(error_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{error_msg}\n")
+            logger.error("Error getting device by position: %s", e)
+            _debug_log.debug("Error getting device by position: %s", e)
             return None
     
     def create(self, data):
         """Create new device"""
         try:
+            data = _canonicalize(data)
             # Add metadata
             data['created_at'] = datetime.now()
+            # Parsed once here and stored as a BSON date, so readers never re-parse inDate/inTime
+            data['in_datetime'] = _in_datetime(data)
+            data['expiry_at'] = _expiry_at(data)
             data['status'] = 'active'
             
             result = self.collection.insert_one(data)
-            return str(result.inserted_id)
+            return result.inserted_id
         except Exception as e:
-            print(f"Error creating device: {e}")
+            logger.error("Error creating device: %s", e)
             return None
     
     def update(self, device_id, data):
         """Update device by ID"""
         try:
-            from bson import ObjectId
-            update_data = data.copy()
+            device_query = {"_id": _object_id(device_id)}
+            update_data = _canonicalize(data)
             update_data['updated_at'] = datetime.now()
             
-            result = self.collection.update_one(
-                {"_id": ObjectId(device_id)},
-                {"$set": update_data}
-            )
+            result = self.collection.update_one(device_query, {"$set": update_data})
+            if any(field in update_data for field in SCHEDULE_FIELDS):
+                self._refresh_expiry(device_query)
             return result.modified_count > 0
         except Exception as e:
-            print(f"Error updating device: {e}")
+            logger.error("Error updating device: %s", e)
             return False
     
+    def _refresh_expiry(self, query):
+        """Recompute in_datetime and expiry_at from the stored schedule after a partial update"""
+        self.collection.update_one(query, [{"$set": {"in_datetime": IN_DATETIME_EXPR, "expiry_at": EXPIRY_AT_EXPR}}])
+    
     def delete(self, device_id):
         """Delete device by ID - archives to history then removes from stability_devices"""
         try:
-            from bson import ObjectId
-            
-            # Get the device first
-            device = self.get_by_id(device_id)
+            # Match and delete in one round trip; the returned pre-image is what gets archived
+            device = self.collection.find_one_and_delete({"_id": _object_id(device_id)})
             if not device:
                 return False
             
@@ -203,163 +487,153 @@ class StabilityDeviceModel:
             history_model = StabilityHistoryModel(self.db_manager)
             history_result = history_model.archive_device(device, "System")
             if not history_result:
-                print(f"Failed to archive device to history")
+                logger.warning("Failed to archive device to history")
+                self._restore(device)
                 return False
             
-            # Actually DELETE the device from stability_devices
-            result = self.collection.delete_one({"_id": ObjectId(device_id)})
-            return result.deleted_count > 0
+            return True
         except Exception as e:
-            print(f"Error deleting device: {e}")
+            logger.error("Error deleting device: %s", e)
             return False
     
+    def _restore(self, device):
+        """Put back a device whose archiving failed after it was deleted"""
+        try:
+            self.collection.insert_one(device)
+        except Exception as e:
+            logger.error("❌ Could not restore device %s: %s", device.get('deviceId', 'unknown'), e)
+    
     def update_by_position(self, section_key, subsection_key, row, col, data):
         """Update or create device at position"""
         try:
-            # Check if device exists
-            existing = self.get_by_position(section_key, subsection_key, row, col)
+            now = datetime.now()
+            update_data = _canonicalize(data)
+            update_data['updated_at'] = now
             
-            if existing:
-                # Update existing device
-                update_data = data.copy()
-                update_data['updated_at'] = datetime.now()
-                
-                result = self.collection.update_one(
-                    {"_id": existing["_id"]},
-                    {"$set": update_data}
-                )
-                return result.modified_count > 0
-            else:
-                # Create new device
-                data['section_key'] = section_key
-                data['subsection_key'] = subsection_key
-                data['row'] = row
-                data['col'] = col
-                return self.create(data) is not None
+            # One atomic upsert instead of read-then-update/create; the pipeline form lets the new or
+            # merged schedule derive in_datetime/expiry_at in the same write. The unique "pos_active"
+            # index keeps concurrent upserts from inserting two devices at one position.
+            result = self.collection.update_one(
+                self._position_query(section_key, subsection_key, row, col),
+                [
+                    {"$set": {field: {"$literal": value} for field, value in update_data.items()}},
+                    {"$set": {
+                        "created_at": {"$ifNull": ["$created_at", now]},
+                        "status": {"$ifNull": ["$status", "active"]}
+                    }},
+                    {"$set": {"in_datetime": IN_DATETIME_EXPR, "expiry_at": EXPIRY_AT_EXPR}}
+                ],
+                upsert=True
+            )
+            return result.upserted_id is not None or result.modified_count > 0
                 
         except Exception as e:
-            print(f"Error updating device: {e}")
+            logger.error("Error updating device: %s", e)
             return False
     
     def soft_delete(self, section_key, subsection_key, row, col, removed_by):
         """Soft delete device (mark as removed)"""
         try:
-            debug_msg = f"🗑️ soft_delete called: section='{section_key}', subsection='{subsection_key}', row={row}, col={col}"
-            print(debug_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{debug_msg}\n")
+            _trace("🗑️ soft_delete called: section='%s', subsection='%s', row=%s, col=%s",
+                   section_key, subsection_key, row, col)
             
-            device = self.get_by_position(section_key, subsection_key, row, col)
+            # Match and delete in one round trip; the returned pre-image is what gets archived
+            device = self.collection.find_one_and_delete(self._position_query(section_key, subsection_key, row, col))
             if not device:
-                error_msg = f"❌ soft_delete: Device not found at position"
-                print(error_msg)
-                with open("debug.log", "a", encoding="utf-8") as f:
-                    f.write(f"{error_msg}\n")
+                _trace("❌ soft_delete: Device not found at position")
                 return False
             
-            success_msg = f"📦 Device found for deletion: {device.get('deviceId', device.get('device_id', 'unknown'))}"
-            print(success_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{success_msg}\n")
+            _trace("🗑️ Deleted device from stability_devices: %s (_id: %s)", device.get('deviceId', 'unknown'), device['_id'])
             
             # Move to history
-            try:
-                history_model = StabilityHistoryModel(self.db_manager)
-                history_model.archive_device(device, removed_by)
-                print(f"📝 Device archived to history")
-            except Exception as history_error:
-                print(f"⚠️ Warning: Could not archive to history: {history_error}")
-                return False  # Don't delete if archiving failed
-            
-            # Store the _id for deletion BEFORE archiving
-            from bson import ObjectId
-            device_object_id = device['_id']
-            if isinstance(device_object_id, str):
-                device_object_id = ObjectId(device_object_id)
-            
-            # Actually DELETE the device from stability_devices collection using _id
-            delete_query = {"_id": device_object_id}
-            
-            delete_msg = f"🗑️ Deleting device from stability_devices with _id: {device_object_id}"
-            print(delete_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{delete_msg}\n")
-            
-            result = self.collection.delete_one(delete_query)
-            final_msg = f"📊 Delete result: deleted_count={result.deleted_count}"
-            print(final_msg)
-            with open("debug.log", "a", encoding="utf-8") as f:
-                f.write(f"{final_msg}\n")
-            
-            if result.deleted_count > 0:
-                print(f"✅ Successfully deleted device from stability_devices collection")
-            else:
-                print(f"❌ Failed to delete device - deleted_count is 0")
+            history_model = StabilityHistoryModel(self.db_manager)
+            if not history_model.archive_device(device, removed_by):
+                logger.warning("⚠️ Could not archive device %s to history, restoring it", device.get('deviceId', 'unknown'))
+                self._restore(device)  # Don't lose the device if archiving failed
+                return False
             
-            return result.deleted_count > 0
+            logger.debug("📝 Device archived to history")
+            return True
             
         except Exception as e:
-            print(f"Error soft deleting device: {e}")
+            logger.error("Error soft deleting device: %s", e)
             return False
     
+    @staticmethod
+    def _expiry_summary(device, current_time):
+        """Position and lateness of an expired device, as reported by the expiry endpoints"""
+        expiry_time = device['expiry_at']
+        return {
+            'device_id': device.get('deviceId', 'Unknown'),
+            'section_key': device.get('sectionKey', 'Unknown'),
+            'subsection_key': device.get('subsectionKey', ''),
+            'row': device['row'],
+            'col': device['col'],
+            'expired_time': expiry_time.isoformat(),
+            'hours_over': (current_time - expiry_time).total_seconds() / 3600
+        }
+    
     def check_expired_devices(self):
         """Check for devices that have exceeded their time limit"""
         try:
             expired_devices = []
-            active_devices = self.get_all()
+            # Local time, like the stored (naive) expiry_at
+            current_time = datetime.now()
             
-            for device in active_devices:
-                # Support both camelCase and snake_case field names
-                time_hours = device.get('time_hours') or device.get('timeHours')
-                in_date = device.get('in_date') or device.get('inDate')
-                in_time = device.get('in_time') or device.get('inTime')
-                
-                # Check if device has required fields
-                if not time_hours or not in_date or not in_time:
-                    continue
-                
+            # Expiry is decided by the server on the indexed expiry_at; only expired devices come back
+            expired = self.collection.find(
+                {"status": {"$ne": "removed"}, "expiry_at": {"$lt": current_time}},
+                {field: 1 for field in EXPIRY_FIELDS + ('expiry_at',)}
+            )
+            
+            for device in expired:
                 try:
-                    # Parse in_date and in_time - handle both HH:MM and HH:MM:SS formats
-                    in_datetime_str = f"{in_date} {in_time}"
-                    # Try parsing with seconds first, then without
-                    try:
-                        in_datetime = datetime.strptime(in_datetime_str, "%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        in_datetime = datetime.strptime(in_datetime_str, "%Y-%m-%d %H:%M")
-                    
-                    # Calculate expiry time
-                    time_hours_float = float(time_hours)
-                    expiry_time = in_datetime + timedelta(hours=time_hours_float)
-                    
-                    # Check if expired - use local time
-                    current_time = datetime.now()
-                    print(f"🕐 Device {device.get('deviceId')}: in={in_datetime}, expiry={expiry_time}, now={current_time}")
-                    
-                    if current_time > expiry_time:
-                        # Get section/subsection keys with fallback to both naming conventions
-                        section_key = device.get('sectionKey') or device.get('section_key', 'Unknown')
-                        subsection_key = device.get('subsectionKey') or device.get('subsection_key', '')
-                        device_id = device.get('deviceId') or device.get('device_id', 'Unknown')
+                    logger.debug("🕐 Device %s: expiry=%s, now=%s", device.get('deviceId'), device['expiry_at'], current_time)
+                    expired_devices.append(self._expiry_summary(device, current_time))
                         
-                        expired_devices.append({
-                            'device_id': device_id,
-                            'section_key': section_key,
-                            'subsection_key': subsection_key,
-                            'row': device['row'],
-                            'col': device['col'],
-                            'expired_time': expiry_time.isoformat(),
-                            'hours_over': (current_time - expiry_time).total_seconds() / 3600
-                        })
-                        
-                except (ValueError, KeyError) as e:
-                    print(f"Error parsing device time data: {e}")
+                except KeyError as e:
+                    logger.error("Error reading device position: %s", e)
                     continue
             
             return expired_devices
             
         except Exception as e:
-            print(f"Error checking expired devices: {e}")
+            logger.error("Error checking expired devices: %s", e)
             return []
+    
+    def remove_expired_devices(self, removed_by):
+        """Move every expired device to history server-side; returns (expired summaries, removed count)"""
+        try:
+            current_time = datetime.now()
+            expired_query = {"status": {"$ne": "removed"}, "expiry_at": {"$lt": current_time}}
+            
+            # Only the summary fields cross the wire; the documents themselves never leave the server
+            expired_devices, expired_ids = [], []
+            for device in self.collection.find(expired_query, {field: 1 for field in EXPIRY_FIELDS + ('expiry_at',)}):
+                expired_ids.append(device['_id'])
+                try:
+                    expired_devices.append(self._expiry_summary(device, current_time))
+                except KeyError as e:
+                    logger.error("Error reading device position: %s", e)
+            if not expired_ids:
+                return [], 0
+            
+            # Scoped to the listed ids and still expired, so a device whose schedule is extended
+            # meanwhile is neither archived nor deleted
+            moved_query = {**expired_query, "_id": {"$in": expired_ids}}
+            self.collection.aggregate(
+                [{"$match": moved_query}]
+                + StabilityHistoryModel.history_entry_stages(removed_by, current_time)
+                # History entries keep the device's _id, so a sweep retried after a failed delete
+                # does not archive the same device twice
+                + [{"$merge": {"into": "stability_history", "whenMatched": "keepExisting", "whenNotMatched": "insert"}}]
+            )
+            result = self.collection.delete_many(moved_query)
+            return expired_devices, result.deleted_count
+            
+        except Exception as e:
+            logger.error("Error removing expired devices: %s", e)
+            return [], 0
 
 class StabilityHistoryModel:
     """Model for stability device history"""
@@ -371,51 +645,30 @@ class StabilityHistoryModel:
     def get_by_device_id(self, device_id):
         """Get history for a specific device ID"""
         try:
+            # Entries archived since the camelCase migration carry deviceId; older ones only device_id
             history = list(self.collection.find({
-                "device_id": device_id
-            }).sort("created_at", -1))  # Most recent first
-            
-            # Convert ObjectId to string
-            for item in history:
-                item['_id'] = str(item['_id'])
-            
+                "$or": [{"deviceId": device_id}, {"device_id": device_id}]
+            }).sort("created_at", -1).batch_size(500))  # Most recent first
             return history
         except Exception as e:
-            print(f"Error getting device history: {e}")
+            logger.error("Error getting device history: %s", e)
             return []
     
     def get_by_position(self, section_key, subsection_key, row, col):
         """Get history for specific position"""
         try:
-            # Try both field naming conventions (camelCase and snake_case)
-            query_camelcase = {
+            # Archived entries always carry the camelCase position (see archive_device / _migrate_field_names)
+            query = {
                 "sectionKey": section_key,
                 "subsectionKey": subsection_key,
                 "row": row,
                 "col": col
             }
             
-            query_snake_case = {
-                "section_key": section_key,
-                "subsection_key": subsection_key,
-                "row": row,
-                "col": col
-            }
-            
-            # First try camelCase (which is what device model uses)
-            history = list(self.collection.find(query_camelcase).sort("created_at", -1))
-            
-            # If no results with camelCase, try snake_case
-            if not history:
-                history = list(self.collection.find(query_snake_case).sort("created_at", -1))
-            
-            # Convert ObjectId to string
-            for item in history:
-                item['_id'] = str(item['_id'])
-            
+            history = list(self.collection.find(query).sort("created_at", -1).batch_size(500))
             return history
         except Exception as e:
-            print(f"Error getting history: {e}")
+            logger.error("Error getting history: %s", e)
             return []
     
     def add_entry(self, data):
@@ -423,70 +676,121 @@ class StabilityHistoryModel:
         try:
             data['created_at'] = datetime.now()
             result = self.collection.insert_one(data)
-            return str(result.inserted_id)
+            return result.inserted_id
         except Exception as e:
-            print(f"Error adding history entry: {e}")
+            logger.error("Error adding history entry: %s", e)
             return None
     
-    def archive_device(self, device, removed_by):
-        """Archive device to history"""
+    @staticmethod
+    def _build_history_entry(device, removed_by, now):
+        """History document for a device removed at now"""
+        # New dict without the device's _id (archive_device keys the entry on it separately)
+        history_entry = {key: value for key, value in device.items() if key != '_id'}
+        history_entry['removed_by'] = removed_by
+        history_entry['removed_at'] = now
+        
+        # Calculate duration and set removal times
+        in_datetime = _in_datetime(device)
+        if in_datetime is not None:
+            total_seconds = int((now - in_datetime).total_seconds())
+            history_entry['duration_hours'] = total_seconds // 3600
+            history_entry['duration_minutes'] = (total_seconds % 3600) // 60
+            history_entry['duration_seconds'] = total_seconds % 60
+            history_entry['actual_hours_stayed'] = total_seconds / 3600
+            history_entry['out_date'] = now.strftime("%Y-%m-%d")
+            history_entry['out_time'] = now.strftime("%H:%M")
+        
+        # Copy planned duration from device if available
+        if 'hours' in device or 'minutes' in device or 'seconds' in device:
+            history_entry['planned_hours'] = device.get('hours', 0)
+            history_entry['planned_minutes'] = device.get('minutes', 0)
+            history_entry['planned_seconds'] = device.get('seconds', 0)
+        
+        return history_entry
+    
+    @staticmethod
+    def history_entry_stages(removed_by, now):
+        """Aggregation stages turning device documents into history entries, as _build_history_entry does"""
+        def when(condition, value):
+            # Field omitted (like the Python version) when the condition fails
+            return {"$cond": [condition, value, "$$REMOVE"]}
+        
+        has_stay = {"$ne": ["$_stay", None]}
+        has_planned = {"$or": [{"$ne": [{"$type": f"${field}"}, "missing"]} for field in ('hours', 'minutes', 'seconds')]}
+        return [
+            {"$set": {
+                "removed_by": {"$literal": removed_by},
+                "removed_at": now,
+                "_stay": {"$cond": [
+                    {"$eq": [{"$type": "$in_datetime"}, "date"]},
+                    {"$toLong": {"$trunc": {"$divide": [{"$subtract": [now, "$in_datetime"]}, 1000]}}},
+                    None
+                ]}
+            }},
+            {"$set": {
+                "duration_hours": when(has_stay, {"$toLong": {"$floor": {"$divide": ["$_stay", 3600]}}}),
+                "duration_minutes": when(has_stay, {"$toLong": {"$floor": {"$divide": [{"$mod": ["$_stay", 3600]}, 60]}}}),
+                "duration_seconds": when(has_stay, {"$mod": ["$_stay", 60]}),
+                "actual_hours_stayed": when(has_stay, {"$divide": ["$_stay", 3600]}),
+                "out_date": when(has_stay, now.strftime("%Y-%m-%d")),
+                "out_time": when(has_stay, now.strftime("%H:%M")),
+                "planned_hours": when(has_planned, {"$ifNull": ["$hours", 0]}),
+                "planned_minutes": when(has_planned, {"$ifNull": ["$minutes", 0]}),
+                "planned_seconds": when(has_planned, {"$ifNull": ["$seconds", 0]})
+            }},
+            {"$unset": "_stay"}
+        ]
+    
+    def archive_device(self, device, removed_by, now=None):
+        """Archive device to history (removed at now, default the current time)
+        
+        The entry takes the device's _id (as the expiry sweep's $merge does), so archiving the same
+        device again - e.g. by the TTL watcher after delete() - keeps the first entry instead of adding one.
+        The one exception is an entry the TTL watcher wrote first, which any other archive replaces.
+        """
         try:
-            history_entry = device.copy()
-            history_entry['removed_by'] = removed_by
-            history_entry['removed_at'] = datetime.now()
-            print(f"Archiving device to history: {history_entry}")
-            # Remove the original _id to create new history entry
-            if '_id' in history_entry:
-                del history_entry['_id']
-            
-            # Ensure consistent field naming - prefer snake_case for history
-            if 'section_key' in history_entry and 'sectionKey' not in history_entry:
-                history_entry['sectionKey'] = history_entry['section_key']
-            if 'subsection_key' in history_entry and 'subsectionKey' not in history_entry:
-                history_entry['subsectionKey'] = history_entry['subsection_key']
-            
-            # Normalize createdBy to created_by for consistency
-            if 'createdBy' in history_entry:
-                history_entry['created_by'] = history_entry['createdBy']
-            
-            # Calculate duration and set removal times
-            in_date = device.get('inDate') or device.get('in_date')
-            in_time = device.get('inTime') or device.get('in_time')
-            
-            if in_date and in_time:
-                try:
-                    in_datetime_str = f"{in_date} {in_time}"
-                    # Handle both HH:MM and HH:MM:SS formats
-                    try:
-                        in_datetime = datetime.strptime(in_datetime_str, "%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        in_datetime = datetime.strptime(in_datetime_str, "%Y-%m-%d %H:%M")
-                    
-                    duration = datetime.now() - in_datetime
-                    
-                    total_seconds = int(duration.total_seconds())
-                    history_entry['duration_hours'] = total_seconds // 3600
-                    history_entry['duration_minutes'] = (total_seconds % 3600) // 60
-                    history_entry['duration_seconds'] = total_seconds % 60
-                    history_entry['actual_hours_stayed'] = total_seconds / 3600
-                    
-                    # Set out_date and out_time
-                    now = datetime.now()
-                    history_entry['out_date'] = now.strftime("%Y-%m-%d")
-                    history_entry['out_time'] = now.strftime("%H:%M")
-                    
-                except (ValueError, KeyError):
-                    pass
-            
-            # Copy planned duration from device if available
-            if 'hours' in device or 'minutes' in device or 'seconds' in device:
-                history_entry['planned_hours'] = device.get('hours', 0)
-                history_entry['planned_minutes'] = device.get('minutes', 0) 
-                history_entry['planned_seconds'] = device.get('seconds', 0)
-            
-            result = self.collection.insert_one(history_entry)
-            return str(result.inserted_id)
+            history_entry = self._build_history_entry(device, removed_by, now or datetime.now())
+            logger.debug("Archiving device to history: %s", history_entry)
+            if '_id' not in device:
+                return self.collection.insert_one(history_entry).inserted_id
+            if removed_by == TTL_REMOVED_BY:
+                self.collection.update_one({'_id': device['_id']}, {'$setOnInsert': history_entry}, upsert=True)
+                return device['_id']
+            try:
+                # Inserts the entry, or replaces one from the TTL watcher; any other existing entry
+                # fails the upsert on the duplicate _id and is kept
+                self.collection.replace_one({'_id': device['_id'], 'removed_by': TTL_REMOVED_BY}, history_entry, upsert=True)
+            except DuplicateKeyError:
+                pass
+            return device['_id']
             
         except Exception as e:
-            print(f"Error archiving device: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error archiving device: %s", e)
+            return None
+    
+    def archive_many(self, devices, removed_by, now=None):
+        """Archive several devices to history in one round trip (raises BulkWriteError on partial failure)"""
+        # One removal time for the whole batch
+        now = now or datetime.now()
+        if not devices:
+            return []
+        logger.debug("Archiving %d device(s) to history", len(devices))
+        # Keyed on each device's _id like archive_device, so already archived devices are left alone
+        # (TTL watcher entries excepted)
+        if removed_by == TTL_REMOVED_BY:
+            requests = [
+                UpdateOne({'_id': device['_id']}, {'$setOnInsert': self._build_history_entry(device, removed_by, now)}, upsert=True)
+                for device in devices
+            ]
+        else:
+            requests = [
+                ReplaceOne({'_id': device['_id'], 'removed_by': TTL_REMOVED_BY}, self._build_history_entry(device, removed_by, now), upsert=True)
+                for device in devices
+            ]
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate _ids are devices that already have a history entry
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])) or e.details.get('writeConcernErrors'):
+                raise
+        return [device['_id'] for device in devices]
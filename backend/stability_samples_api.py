@@ -4,130 +4,349 @@ No row/col tracking - only counts and lists
 """
 
 import os
+import re
+import time
 import logging
+import threading
+import uuid
 from datetime import datetime, timedelta
-from flask import jsonify, request
-from pymongo import MongoClient
+from flask import Response, request
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import OperationFailure
 from bson import ObjectId
 from dotenv import load_dotenv
+from json_utils import dumps, json_response
 
 load_dotenv()
 
+# Read responses are reused for this many seconds (the dashboard polls); any sample write clears them
+RESPONSE_CACHE_TTL = float(os.getenv('STABILITY_SAMPLES_CACHE_TTL', '5'))
+RESPONSE_CACHE_SIZE = 64
+
+# History is served in pages of completed samples (newest first); the client pages on with next_cursor
+HISTORY_PAGE_SIZE = 100
+HISTORY_PAGE_MAX = 500
+
+# Opt-in: watch stability_samples with a change stream (needs a replica set) so writes made by other
+# processes also clear this process's cached reads and bump the change version the dashboard polls
+CHANGE_STREAM_ENABLED = os.getenv('STABILITY_SAMPLES_CHANGE_STREAM', '').lower() in ('1', 'true', 'yes')
+
+# Sample fields the grid and its sample detail dialog read
+GRID_SAMPLE_FIELDS = (
+    'testType', 'temperature', 'deviceId', 'inDate', 'inTime', 'hours', 'minutes', 'seconds',
+    'timeHours', 'targetHours', 'batchName', 'motivation', 'status'
+)
+
+
+# Grid cells: (testType, temperature) -> (rows, cols, capacity)
+_GRID_CONFIG = {
+    ("LS w/Temp", "37C"): (6, 4, 24),
+    ("LS w/Temp", "65C"): (6, 4, 24),
+    ("LS w/Temp", "85C"): (6, 4, 24),
+    ("Damp Heat", ""): (6, 6, 36),
+    ("Outdoor Testing", ""): (20, 15, 300)
+}
+
+
+def _build_grid(counts, samples_by_cell=None):
+    """gridData response ({testType: {temperature: cell}}) from per-cell counts and, optionally, sample lists"""
+    grid_data = {}
+    for cell_key, (rows, cols, capacity) in _GRID_CONFIG.items():
+        cell = {"rows": rows, "cols": cols, "capacity": capacity, "count": counts.get(cell_key, 0)}
+        if samples_by_cell is not None:
+            cell["samples"] = samples_by_cell.get(cell_key, [])
+        test_type, temperature = cell_key
+        grid_data.setdefault(test_type, {})[temperature] = cell
+    return grid_data
+
+
+# Responses go through json_utils.dumps, which writes ObjectIds (_id) as their hex string
+
+# Sample inDate/inTime format, '%m/%d/%Y %H:%M:%S' (matched directly instead of going through strptime)
+_IN_DATETIME_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{1,2}):(\d{1,2})')
+
+
+def _parse_in_datetime(in_date, in_time):
+    """Sample inDate/inTime as a datetime, or None if missing/unparseable"""
+    match = _IN_DATETIME_RE.fullmatch(f"{in_date} {in_time}")
+    if match is None:
+        return None
+    month, day, year, hour, minute, second = map(int, match.groups())
+    try:
+        return datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        # Well-formed but not a real date/time (e.g. 13/45/2024)
+        return None
+
+
+def _completion_pipeline(removed_at, removal_type):
+    """Update pipeline marking samples completed, with the stay (inDate/inTime -> removed_at) computed server-side"""
+    stay_seconds = {"$trunc": {"$divide": [{"$subtract": [removed_at, "$_in_dt"]}, 1000]}}
+    return [
+        {'$set': {
+            'status': 'completed',
+            'removed_at': removed_at,
+            'removal_type': removal_type,
+            # inDatetime is stored at insert; older samples fall back to parsing inDate/inTime
+            '_in_dt': {'$ifNull': ['$inDatetime', {'$dateFromString': {
+                'dateString': {'$concat': ['$inDate', ' ', '$inTime']},
+                'format': '%m/%d/%Y %H:%M:%S', 'onError': None, 'onNull': None
+            }}]}
+        }},
+        # Unparseable in date/time counts as zero duration
+        {'$set': {'_sec': {'$ifNull': [{'$toLong': stay_seconds}, 0]}}},
+        {'$set': {
+            'hours': {'$toLong': {'$floor': {'$divide': ['$_sec', 3600]}}},
+            'minutes': {'$toLong': {'$floor': {'$divide': [{'$mod': ['$_sec', 3600]}, 60]}}},
+            'seconds': {'$mod': ['$_sec', 60]}
+        }},
+        {'$unset': ['_in_dt', '_sec']}
+    ]
+
+
 class StabilitySamplesAPI:
     """API for managing stability samples without position tracking"""
     
     def __init__(self):
-        # MongoDB connection
+        # MongoDB connection (opened on first use, see db)
         self.connection_string = os.getenv('MONGODB_CONNECTION_STRING')
         self.database_name = os.getenv('DATABASE_NAME', 'passdown_db')
         self.client = None
-        self.db = None
-        self._connect_to_mongodb()
+        self._db = None
+        self._connect_lock = threading.Lock()
+        self._response_cache = {}
+        self._response_cache_lock = threading.Lock()
+        # Change version: bumped on every sample write seen by this process (prefix tells processes apart)
+        self._version_prefix = uuid.uuid4().hex[:8]
+        self._data_version = 0
+        
+        # Device data API (T80 status), resolved once instead of per grid request
+        try:
+            from stability_device_data_api import get_device_data_api
+            self._device_data_api = get_device_data_api()
+        except Exception:
+            self._device_data_api = None
+        
+        if not self.connection_string:
+            logging.warning("MongoDB connection string not found")
+    
+    @property
+    def db(self):
+        """Database handle, connecting on first use (None without a connection string or on failure)"""
+        if self._db is None and self.connection_string:
+            with self._connect_lock:
+                if self._db is None:
+                    self._connect_to_mongodb()
+        return self._db
         
     def _connect_to_mongodb(self):
-        """Establish MongoDB connection"""
+        """Create the MongoDB client; no handshake here, connection problems surface on the first command"""
         try:
-            if not self.connection_string:
-                logging.warning("MongoDB connection string not found")
-                return
-            
-            self.client = MongoClient(self.connection_string)
-            self.db = self.client[self.database_name]
-            self.client.server_info()
-            logging.info("✅ Stability Samples MongoDB connection established")
+            # Pool sized for concurrent dashboard polling; zlib wire compression needs no extra package
+            # (zstd/snappy would warn and be ignored without zstandard/python-snappy installed)
+            self.client = MongoClient(
+                self.connection_string,
+                maxPoolSize=200,
+                minPoolSize=20,
+                compressors='zlib',
+                retryReads=True,
+                socketTimeoutMS=5000,
+                serverSelectionTimeoutMS=2000,
+                appname='stability_samples_api'
+            )
+            self._db = self.client[self.database_name]
+            logging.info("✅ Stability Samples MongoDB client created")
+            # Index builds are round trips too; keep them off the first request
+            threading.Thread(target=self._ensure_indexes, daemon=True).start()
+            if CHANGE_STREAM_ENABLED:
+                threading.Thread(target=self._watch_changes, daemon=True).start()
         except Exception as e:
             logging.error(f"❌ Stability Samples MongoDB connection failed: {e}")
             self.client = None
-            self.db = None
+            self._db = None
+    
+    def _ensure_indexes(self):
+        """Create the indexes behind the sample queries (idempotent)"""
+        try:
+            collection = self.db.stability_samples
+            # Grid/active/history/remove-all: equality on status/testType/temperature; the trailing
+            # removed_at/_id serve get_history's keyset paging (the 3-field prefix covers the other queries)
+            collection.create_index(
+                [('status', 1), ('testType', 1), ('temperature', 1), ('removed_at', -1), ('_id', -1)],
+                name="samples_history"
+            )
+            # Superseded by samples_history (same prefix)
+            if 'samples_lookup' in collection.index_information():
+                collection.drop_index('samples_lookup')
+            # By-id/remove/update: deviceId (+ status)
+            collection.create_index([('deviceId', 1), ('status', 1)], name="sample_device")
+        except Exception as e:
+            logging.warning(f"⚠️ Could not create stability sample indexes: {e}")
+    
+    def _cached_response(self, key):
+        """Response for the body cached under key if still fresh, else None"""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < RESPONSE_CACHE_TTL:
+            return Response(entry[1], status=200, mimetype='application/json')
+        return None
+    
+    def _cache_response(self, key, payload):
+        """Serialize a read payload once, cache the body and return it as the response"""
+        body = dumps(payload)
+        with self._response_cache_lock:
+            # Keys come from query args, so the cache is bounded
+            if len(self._response_cache) >= RESPONSE_CACHE_SIZE:
+                self._response_cache.clear()
+            self._response_cache[key] = (time.monotonic(), body)
+        return Response(body, status=200, mimetype='application/json')
+    
+    def _invalidate_responses(self):
+        """Drop cached reads and bump the change version after a write"""
+        with self._response_cache_lock:
+            self._response_cache.clear()
+            self._data_version += 1
+    
+    def _watch_changes(self):
+        """Change-stream loop: treat every stability_samples change (from any process) as a write
+        
+        Reconnects with backoff after errors (network blips, failovers), resuming after the last seen
+        change; cached reads are dropped on every (re)connect since changes may have been missed.
+        """
+        resume_token = None
+        backoff = 1
+        while True:
+            try:
+                with self._db.stability_samples.watch(resume_after=resume_token) as stream:
+                    self._invalidate_responses()
+                    backoff = 1
+                    for _ in stream:
+                        resume_token = stream.resume_token
+                        self._invalidate_responses()
+            except Exception as e:
+                # A resume token that fell off the oplog (ChangeStreamHistoryLost) can't be resumed from
+                if isinstance(e, OperationFailure) and e.code == 286:
+                    resume_token = None
+                logging.warning(f"⚠️ Stability samples change stream interrupted, retrying in {backoff}s: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+    
+    def get_changes(self):
+        """Current change version; the dashboard reloads the grid only when it moves (no database access)"""
+        with self._response_cache_lock:
+            version = f"{self._version_prefix}-{self._data_version}"
+        return json_response({'success': True, 'version': version}, 200)
     
     def get_grid_data(self):
         """Get all stability grid data with counts (no positions)"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
-            
-            # Import device data API to check T80 status
-            try:
-                from stability_device_data_api import get_device_data_api
-                device_data_api = get_device_data_api()
-            except:
-                device_data_api = None
-            
-            # Query active samples grouped by test type and temperature
-            collection = self.db.stability_samples
-            
-            # Structure to return
-            grid_data = {
-                "LS w/Temp": {
-                    "37C": {"rows": 6, "cols": 4, "capacity": 24, "count": 0, "samples": []},
-                    "65C": {"rows": 6, "cols": 4, "capacity": 24, "count": 0, "samples": []},
-                    "85C": {"rows": 6, "cols": 4, "capacity": 24, "count": 0, "samples": []}
-                },
-                "Damp Heat": {
-                    "": {"rows": 6, "cols": 6, "capacity": 36, "count": 0, "samples": []}
-                },
-                "Outdoor Testing": {
-                    "": {"rows": 20, "cols": 15, "capacity": 300, "count": 0, "samples": []}
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
+            
+            cached = self._cached_response(('grid',))
+            if cached is not None:
+                return cached
+            
+            device_data_api = self._device_data_api
+            
+            # Active samples grouped by test type and temperature in one server-side pipeline:
+            # at most one row per grid cell comes back, each carrying its (projected) samples
+            cells = self.db.stability_samples.aggregate([
+                {'$match': {'status': 'active'}},
+                {'$project': {field: 1 for field in GRID_SAMPLE_FIELDS}},
+                {'$group': {
+                    '_id': {'testType': {'$ifNull': ['$testType', 'LS w/Temp']},
+                            'temperature': {'$ifNull': ['$temperature', '37C']}},
+                    'samples': {'$push': '$$ROOT'}
+                }}
+            ])
+            samples_by_cell = {}
+            for cell in cells:
+                cell_key = (cell['_id']['testType'], cell['_id']['temperature'])
+                if cell_key in _GRID_CONFIG:
+                    samples_by_cell[cell_key] = cell['samples']
+            
+            # T80 status for all samples in one lookup (the summary is loaded once, not per sample),
+            # flattened to deviceId -> bool so the pass below is a plain dict.get per sample
+            has_t80 = {}
+            if device_data_api:
+                device_ids = {sample['deviceId'] for samples in samples_by_cell.values() for sample in samples if 'deviceId' in sample}
+                has_t80 = {
+                    device_id: status.get('has_t80', False)
+                    for device_id, status in device_data_api.check_device_t80_status_bulk(list(device_ids)).items()
                 }
-            }
             
-            # Get all active samples
-            active_samples = list(collection.find({"status": "active"}))
-            
-            # Group by test type and temperature
-            for sample in active_samples:
-                test_type = sample.get('testType', 'LS w/Temp')
-                temperature = sample.get('temperature', '37C')
-                
-                # Add T80 status
-                if device_data_api and 'deviceId' in sample:
-                    t80_status = device_data_api.check_device_t80_status(sample['deviceId'])
-                    sample['has_t80'] = t80_status.get('has_t80', False)
-                else:
-                    sample['has_t80'] = False
-                
-                # Convert ObjectId to string
-                sample['_id'] = str(sample['_id'])
-                
-                # Add to appropriate section
-                if test_type in grid_data and temperature in grid_data[test_type]:
-                    grid_data[test_type][temperature]['samples'].append(sample)
-                    grid_data[test_type][temperature]['count'] += 1
-            
-            return jsonify({
+            for samples in samples_by_cell.values():
+                for sample in samples:
+                    sample['has_t80'] = has_t80.get(sample.get('deviceId'), False)
+            
+            counts = {cell_key: len(samples) for cell_key, samples in samples_by_cell.items()}
+            return self._cache_response(('grid',), {
                 "success": True,
-                "gridData": grid_data
-            }), 200
+                "gridData": _build_grid(counts, samples_by_cell)
+            })
             
         except Exception as e:
             logging.error(f"Error getting grid data: {e}")
             import traceback
             traceback.print_exc()
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
+    
+    def get_grid_counts(self):
+        """Get active sample counts per test type/temperature only (no sample lists)"""
+        try:
+            if self.db is None:
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
+            
+            cached = self._cached_response(('counts',))
+            if cached is not None:
+                return cached
+            
+            # Counted server-side: one row per (testType, temperature) comes back, whatever the sample count
+            counts = self.db.stability_samples.aggregate([
+                {'$match': {'status': 'active'}},
+                {'$group': {
+                    '_id': {'testType': {'$ifNull': ['$testType', 'LS w/Temp']},
+                            'temperature': {'$ifNull': ['$temperature', '37C']}},
+                    'count': {'$sum': 1}
+                }}
+            ])
+            counts = {(row['_id']['testType'], row['_id']['temperature']): row['count'] for row in counts}
+            
+            return self._cache_response(('counts',), {
+                "success": True,
+                "gridData": _build_grid(counts)
+            })
+            
+        except Exception as e:
+            logging.error(f"Error getting grid counts: {e}")
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def batch_add_samples(self):
         """Add multiple samples at once"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             data = request.get_json()
             samples_data = data.get('samples', [])
             
             if not samples_data:
-                return jsonify({'success': False, 'error': 'No samples provided'}), 400
+                return json_response({'success': False, 'error': 'No samples provided'}, 400)
             
             collection = self.db.stability_samples
-            inserted_ids = []
+            created_at = datetime.now()
             
-            for sample_data in samples_data:
-                # Use testType and temperature from each sample
-                sample = {
+            # Use testType and temperature from each sample
+            samples = [
+                {
                     'testType': sample_data.get('testType'),
                     'temperature': sample_data.get('temperature', ''),
                     'deviceId': sample_data.get('deviceId'),
                     'inDate': sample_data.get('inDate'),
                     'inTime': sample_data.get('inTime'),
+                    # Parsed once here so removal never has to
+                    'inDatetime': _parse_in_datetime(sample_data.get('inDate'), sample_data.get('inTime')),
                     'hours': sample_data.get('hours', 0),
                     'minutes': sample_data.get('minutes', 0),
                     'seconds': sample_data.get('seconds', 0),
@@ -136,32 +355,41 @@ class StabilitySamplesAPI:
                     'batchName': sample_data.get('batchName', ''),  # Batch name from home page
                     'motivation': sample_data.get('motivation', ''),  # Motivation from home page
                     'status': 'active',
-                    'created_at': datetime.now()
+                    'created_at': created_at
                 }
-                
-                result = collection.insert_one(sample)
-                inserted_ids.append(str(result.inserted_id))
+                for sample_data in samples_data
+            ]
+            
+            # One round trip for the whole batch
+            result = collection.insert_many(samples, ordered=False)
+            self._invalidate_responses()
+            inserted_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
             
             logging.info(f"✅ Added {len(inserted_ids)} samples")
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': f'Added {len(inserted_ids)} samples',
                 'inserted_ids': inserted_ids
-            }), 201
+            }, 201)
             
         except Exception as e:
             logging.error(f"Error batch adding samples: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def get_active_samples(self):
         """Get active samples for a specific temperature"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             temperature = request.args.get('temperature')
             test_type = request.args.get('testType', 'LS w/Temp')
             
+            cache_key = ('active', test_type, temperature)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                return cached
+            
             collection = self.db.stability_samples
             query = {
                 'status': 'active',
@@ -173,28 +401,34 @@ class StabilitySamplesAPI:
             
             samples = list(collection.find(query))
             
-            # Convert ObjectId to string
-            for sample in samples:
-                sample['_id'] = str(sample['_id'])
-            
-            return jsonify({
+            return self._cache_response(cache_key, {
                 'success': True,
                 'samples': samples,
                 'count': len(samples)
-            }), 200
+            })
             
         except Exception as e:
             logging.error(f"Error getting active samples: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def get_history(self):
         """Get historical samples for a specific temperature"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             temperature = request.args.get('temperature')
             test_type = request.args.get('testType', 'LS w/Temp')
+            try:
+                limit = min(max(int(request.args.get('limit', HISTORY_PAGE_SIZE)), 1), HISTORY_PAGE_MAX)
+            except ValueError:
+                return json_response({'success': False, 'error': 'limit must be an integer'}, 400)
+            before = request.args.get('before')
+            
+            cache_key = ('completed', test_type, temperature, limit, before)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                return cached
             
             collection = self.db.stability_samples
             query = {
@@ -205,184 +439,144 @@ class StabilitySamplesAPI:
             if temperature:
                 query['temperature'] = temperature
             
-            # Sort by removed_at descending (most recent first)
-            samples = list(collection.find(query).sort('removed_at', -1))
-            
-            # Convert ObjectId to string
-            for sample in samples:
-                sample['_id'] = str(sample['_id'])
-            
-            return jsonify({
+            if before:
+                # Keyset cursor "<removed_at iso>|<_id>": _id breaks ties between samples removed together
+                try:
+                    before_at, _, before_id = before.partition('|')
+                    before_at = datetime.fromisoformat(before_at)
+                    before_id = ObjectId(before_id)
+                except Exception:
+                    return json_response({'success': False, 'error': 'Invalid before cursor'}, 400)
+                query['$or'] = [
+                    {'removed_at': {'$lt': before_at}},
+                    {'removed_at': before_at, '_id': {'$lt': before_id}}
+                ]
+            
+            # Most recent first, one page per request (fetched in a single batch)
+            cursor = collection.find(query).sort([('removed_at', -1), ('_id', -1)]).limit(limit).batch_size(limit)
+            samples = list(cursor)
+            
+            next_cursor = None
+            if len(samples) == limit and samples[-1].get('removed_at') is not None:
+                last = samples[-1]
+                next_cursor = f"{last['removed_at'].isoformat()}|{last['_id']}"
+            
+            return self._cache_response(cache_key, {
                 'success': True,
                 'samples': samples,
-                'count': len(samples)
-            }), 200
+                'count': len(samples),
+                'next_cursor': next_cursor
+            })
             
         except Exception as e:
             logging.error(f"Error getting history: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def remove_samples(self):
         """Remove specific samples (move to history)"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             data = request.get_json()
             device_ids = data.get('deviceIds', [])
             
             if not device_ids:
-                return jsonify({'success': False, 'error': 'No deviceIds provided'}), 400
+                return json_response({'success': False, 'error': 'No deviceIds provided'}, 400)
             
             collection = self.db.stability_samples
             removed_at = datetime.now()
             
-            # Get all samples to calculate duration
-            samples_to_remove = list(collection.find({'deviceId': {'$in': device_ids}, 'status': 'active'}))
-            
-            # Update each sample with calculated duration
-            modified_count = 0
-            for sample in samples_to_remove:
-                # Calculate duration from inDate and inTime
-                in_datetime_str = f"{sample.get('inDate')} {sample.get('inTime')}"
-                try:
-                    in_datetime = datetime.strptime(in_datetime_str, "%m/%d/%Y %H:%M:%S")
-                    duration = removed_at - in_datetime
-                    total_seconds = int(duration.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                except:
-                    hours, minutes, seconds = 0, 0, 0
-                
-                # Update the sample
-                collection.update_one(
-                    {'_id': sample['_id']},
-                    {
-                        '$set': {
-                            'status': 'completed',
-                            'removed_at': removed_at,
-                            'removal_type': 'manual',
-                            'hours': hours,
-                            'minutes': minutes,
-                            'seconds': seconds
-                        }
-                    }
-                )
-                modified_count += 1
+            # Duration is computed server-side: no documents are read back
+            result = collection.update_many(
+                {'deviceId': {'$in': device_ids}, 'status': 'active'},
+                _completion_pipeline(removed_at, 'manual')
+            )
+            modified_count = result.modified_count
+            self._invalidate_responses()
             
             logging.info(f"✅ Removed {modified_count} samples")
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': f'Removed {modified_count} samples',
                 'removed_count': modified_count
-            }), 200
+            }, 200)
             
         except Exception as e:
             logging.error(f"Error removing samples: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def remove_all_samples(self):
         """Remove all samples from a temperature (move to history)"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             data = request.get_json()
             temperature = data.get('temperature')
             test_type = data.get('testType', 'LS w/Temp')
             
             if not temperature:
-                return jsonify({'success': False, 'error': 'No temperature provided'}), 400
+                return json_response({'success': False, 'error': 'No temperature provided'}, 400)
             
             collection = self.db.stability_samples
             removed_at = datetime.now()
             
-            # Get all samples to calculate duration
-            samples_to_remove = list(collection.find({
+            # Duration is computed server-side: no documents are read back
+            result = collection.update_many({
                 'testType': test_type,
                 'temperature': temperature,
                 'status': 'active'
-            }))
-            
-            # Update each sample with calculated duration
-            modified_count = 0
-            for sample in samples_to_remove:
-                # Calculate duration from inDate and inTime
-                in_datetime_str = f"{sample.get('inDate')} {sample.get('inTime')}"
-                try:
-                    in_datetime = datetime.strptime(in_datetime_str, "%m/%d/%Y %H:%M:%S")
-                    duration = removed_at - in_datetime
-                    total_seconds = int(duration.total_seconds())
-                    hours = total_seconds // 3600
-                    minutes = (total_seconds % 3600) // 60
-                    seconds = total_seconds % 60
-                except:
-                    hours, minutes, seconds = 0, 0, 0
-                
-                # Update the sample
-                collection.update_one(
-                    {'_id': sample['_id']},
-                    {
-                        '$set': {
-                            'status': 'completed',
-                            'removed_at': removed_at,
-                            'removal_type': 'manual_all',
-                            'hours': hours,
-                            'minutes': minutes,
-                            'seconds': seconds
-                        }
-                    }
-                )
-                modified_count += 1
+            }, _completion_pipeline(removed_at, 'manual_all'))
+            modified_count = result.modified_count
+            self._invalidate_responses()
             
             logging.info(f"✅ Removed all {modified_count} samples from {test_type}/{temperature}")
-            return jsonify({
+            return json_response({
                 'success': True,
                 'message': f'Removed all {modified_count} samples',
                 'removed_count': modified_count
-            }), 200
+            }, 200)
             
         except Exception as e:
             logging.error(f"Error removing all samples: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def get_sample_by_id(self):
         """Get a specific sample by deviceId"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             device_id = request.args.get('deviceId')
             
             if not device_id:
-                return jsonify({'success': False, 'error': 'No deviceId provided'}), 400
+                return json_response({'success': False, 'error': 'No deviceId provided'}, 400)
             
             collection = self.db.stability_samples
             sample = collection.find_one({'deviceId': device_id})
             
             if sample:
-                sample['_id'] = str(sample['_id'])
-                return jsonify({'success': True, 'sample': sample}), 200
+                return json_response({'success': True, 'sample': sample}, 200)
             else:
-                return jsonify({'success': False, 'error': 'Sample not found'}), 404
+                return json_response({'success': False, 'error': 'Sample not found'}, 404)
             
         except Exception as e:
             logging.error(f"Error getting sample: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def update_sample(self):
         """Update a sample"""
         try:
             if self.db is None:
-                return jsonify({'success': False, 'error': 'Database not connected'}), 500
+                return json_response({'success': False, 'error': 'Database not connected'}, 500)
             
             data = request.get_json()
             device_id = data.get('deviceId')
             updated_by = data.get('updated_by', 'Unknown')
             
             if not device_id:
-                return jsonify({'success': False, 'error': 'No deviceId provided'}), 400
+                return json_response({'success': False, 'error': 'No deviceId provided'}, 400)
             
             collection = self.db.stability_samples
             
@@ -406,19 +600,30 @@ class StabilitySamplesAPI:
             if 'timeHours' in data:
                 update_data['timeHours'] = data['timeHours']
             
-            result = collection.update_one(
+            update = {'$set': update_data}
+            if 'inDate' in data and 'inTime' in data:
+                update_data['inDatetime'] = _parse_in_datetime(data['inDate'], data['inTime'])
+            elif 'inDate' in data or 'inTime' in data:
+                # Only half of the in date/time changed; removal re-parses the stored pair
+                update['$unset'] = {'inDatetime': ''}
+            
+            # Returns the updated sample in the same round trip; None only when no active sample matched
+            sample = collection.find_one_and_update(
                 {'deviceId': device_id, 'status': 'active'},
-                {'$set': update_data}
+                update,
+                projection={field: 1 for field in GRID_SAMPLE_FIELDS + ('updated_at', 'updated_by')},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
-                return jsonify({'success': True, 'message': 'Sample updated'}), 200
+            if sample is not None:
+                self._invalidate_responses()
+                return json_response({'success': True, 'message': 'Sample updated', 'sample': sample}, 200)
             else:
-                return jsonify({'success': False, 'error': 'Sample not found or not modified'}), 404
+                return json_response({'success': False, 'error': 'Sample not found'}, 404)
             
         except Exception as e:
             logging.error(f"Error updating sample: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
 # Create global instance
 stability_samples_api = StabilitySamplesAPI()
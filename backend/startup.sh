@@ -30,4 +30,5 @@ fi
 
 # Start the application with Gunicorn
 echo "🌟 Starting Flask application with Gunicorn..."
-gunicorn --bind 0.0.0.0:$PORT --timeout 600 --workers 1 --preload app:app
\ No newline at end of file
+# One threaded worker: requests waiting on MongoDB/Azure overlap, and the in-process caches stay shared
+gunicorn --bind 0.0.0.0:$PORT --timeout 600 --workers 1 --worker-class gthread --threads 8 --preload app:app
\ No newline at end of file
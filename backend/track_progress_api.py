@@ -9,16 +9,28 @@ MongoDB Collections:
 import os
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional
-from flask import jsonify, request, Blueprint
-from pymongo import MongoClient
+from flask import jsonify, request, Blueprint, Response
+from pymongo import MongoClient, ReturnDocument, UpdateOne
 from bson import ObjectId
 from dotenv import load_dotenv
+from json_utils import dumps
 
 # Load environment variables
 load_dotenv()
 
+# Work packages per cursor batch (and per streamed chunk) in the list response; kept small because
+# each document carries its whole task/subtask tree
+LIST_BATCH_SIZE = 50
+
+# Single work package responses are reused for this many seconds; any write to the package drops its entry
+WORK_PACKAGE_CACHE_TTL = float(os.getenv('TRACK_PROGRESS_CACHE_TTL', '60'))
+WORK_PACKAGE_CACHE_SIZE = 1024
+
 # Create Blueprint for Track Progress API
 track_progress_bp = Blueprint('track_progress', __name__)
 
@@ -30,76 +42,246 @@ class TrackProgressAPI:
         self.connection_string = os.getenv('MONGODB_CONNECTION_STRING')
         self.database_name = os.getenv('DATABASE_NAME', 'passdown_db')
         self.client = None
-        self.db = None
-        self._connect_to_mongodb()
+        self._db = None
+        self._connect_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._counter_seeded = False
+        
+        # wp_id -> (cached at, response body), least recently used first
+        self._wp_cache = OrderedDict()
+        self._wp_cache_lock = threading.Lock()
+        self._wp_cache_version = 0
         
         # Collection names
         self.COLLECTION_WORK_PACKAGES = 'work_packages'
+        self.COLLECTION_COUNTERS = 'counters'
+        
+        if not self.connection_string:
+            logging.warning("MongoDB connection string not found. Using local fallback.")
+    
+    @property
+    def db(self):
+        """Database handle, connecting on first use (None without a connection string or on failure)"""
+        if self._db is None and self.connection_string:
+            with self._connect_lock:
+                if self._db is None:
+                    self._connect_to_mongodb()
+        return self._db
     
     def _connect_to_mongodb(self):
-        """Establish MongoDB connection"""
+        """Create the MongoDB client; no handshake here, connection problems surface on the first command"""
         try:
-            if not self.connection_string:
-                logging.warning("MongoDB connection string not found. Using local fallback.")
-                return
-            
-            self.client = MongoClient(self.connection_string)
-            self.db = self.client[self.database_name]
-            # Test connection
-            self.client.server_info()
-            logging.info("✅ MongoDB connection established for Track Progress API")
+            # Pooled client shared by all request threads; zlib wire compression shrinks the task arrays
+            # without extra packages (zstd/snappy would need zstandard/python-snappy installed)
+            self.client = MongoClient(
+                self.connection_string,
+                maxPoolSize=50,
+                minPoolSize=5,
+                compressors='zlib',
+                socketTimeoutMS=5000,
+                serverSelectionTimeoutMS=3000,
+                appname='track_progress_api'
+            )
+            self._db = self.client[self.database_name]
+            logging.info("✅ MongoDB client created for Track Progress API")
+            # Index builds are round trips too; keep them off the first request
+            threading.Thread(target=self._ensure_indexes, daemon=True).start()
         except Exception as e:
             logging.error(f"❌ MongoDB connection failed: {e}")
             self.client = None
-            self.db = None
+            self._db = None
+    
+    def _ensure_indexes(self):
+        """Create the indexes behind the work package lookups (idempotent)"""
+        try:
+            collection = self.db[self.COLLECTION_WORK_PACKAGES]
+            # Unique so a work package id can never be handed out twice
+            try:
+                collection.create_index('id', unique=True, name='wp_id')
+            except Exception as e:
+                logging.warning(f"⚠️ Could not create unique work package id index (duplicate ids?): {e}")
+            # Task/subtask updates match on {'id', 'tasks.id'}
+            collection.create_index([('id', 1), ('tasks.id', 1)], name='wp_task_id')
+            # List order
+            collection.create_index([('created_at', -1)], name='wp_created_at')
+        except Exception as e:
+            logging.warning(f"⚠️ Could not create work package indexes: {e}")
+    
+    def _seed_work_package_counter(self):
+        """Start the work package id counter at the highest existing wpN (no-op once it is ahead)
+        
+        Errors propagate: handing out ids from an unseeded counter would restart at wp1.
+        """
+        highest = 0
+        for wp in self.db[self.COLLECTION_WORK_PACKAGES].find({}, {'id': 1, '_id': 0}):
+            wp_id = str(wp.get('id', ''))
+            if wp_id.startswith('wp') and wp_id[2:].isdigit():
+                highest = max(highest, int(wp_id[2:]))
+        self.db[self.COLLECTION_COUNTERS].update_one(
+            {'_id': self.COLLECTION_WORK_PACKAGES},
+            {'$max': {'seq': highest}},
+            upsert=True
+        )
+    
+    def _next_work_package_id(self):
+        """Next wpN id from the atomic counter (one round-trip, independent of collection size)"""
+        if not self._counter_seeded:
+            with self._counter_lock:
+                if not self._counter_seeded:
+                    # Only marked seeded once the seed succeeded; a failed seed fails this create
+                    # and is retried by the next one
+                    self._seed_work_package_counter()
+                    self._counter_seeded = True
+        
+        counter = self.db[self.COLLECTION_COUNTERS].find_one_and_update(
+            {'_id': self.COLLECTION_WORK_PACKAGES},
+            {'$inc': {'seq': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return f"wp{counter['seq']}"
+    
+    def _cached_work_package(self, wp_id):
+        """Cached response body for wp_id if still fresh, else None"""
+        with self._wp_cache_lock:
+            entry = self._wp_cache.get(wp_id)
+            if entry is None or time.monotonic() - entry[0] >= WORK_PACKAGE_CACHE_TTL:
+                return None
+            self._wp_cache.move_to_end(wp_id)
+            return entry[1]
+    
+    def _cache_work_package(self, wp_id, body, version):
+        """Cache body for wp_id unless a write invalidated the cache since the read (version) began"""
+        with self._wp_cache_lock:
+            if version != self._wp_cache_version:
+                return
+            self._wp_cache[wp_id] = (time.monotonic(), body)
+            self._wp_cache.move_to_end(wp_id)
+            if len(self._wp_cache) > WORK_PACKAGE_CACHE_SIZE:
+                self._wp_cache.popitem(last=False)
     
-    def _serialize_doc(self, doc):
-        """Convert MongoDB document to JSON-serializable format"""
-        if doc and '_id' in doc:
-            doc['_id'] = str(doc['_id'])
-        return doc
+    def _invalidate_work_package(self, wp_id):
+        """Drop wp_id's cached response after a write"""
+        with self._wp_cache_lock:
+            self._wp_cache.pop(wp_id, None)
+            self._wp_cache_version += 1
     
-    def _sort_tasks_by_priority(self, tasks):
-        """Sort tasks by priority (P1=Critical, P2=High, P3=Medium, P4=Low, P5=Very Low)"""
-        if not tasks:
-            return []
-        # Sort by priority ascending (1=Critical, 2=High, 3=Medium, 4=Low, 5=Very Low)
-        return sorted(tasks, key=lambda task: task.get('priority', 3))
+    def _not_found(self, wp_id, item):
+        """404 for a missed task/subtask update, naming the work package if that is what is missing"""
+        if self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id}, {'_id': 1}) is None:
+            return jsonify({"success": False, "error": "Work package not found"}), 404
+        return jsonify({"success": False, "error": f"{item} not found"}), 404
+    
+    def _stream_list(self, cursor):
+        """{"success": true, "data": [...]} response streamed from cursor one batch at a time"""
+        # Pull the first document before committing to a 200, so query errors still get a 500
+        first = next(cursor, None)
+        
+        def generate():
+            try:
+                yield b'{"success":true,"data":['
+                if first is not None:
+                    separator, chunk = b'', [dumps(first)]
+                    for doc in cursor:
+                        chunk.append(dumps(doc))
+                        if len(chunk) >= LIST_BATCH_SIZE:
+                            yield separator + b','.join(chunk)
+                            separator, chunk = b',', []
+                    if chunk:
+                        yield separator + b','.join(chunk)
+                yield b']}'
+            finally:
+                cursor.close()
+        
+        return Response(generate(), mimetype='application/json'), 200
     
     # ==================== WORK PACKAGES ====================
     
-    def get_all_work_packages(self):
-        """Get all work packages with their tasks sorted by priority"""
+    def get_all_work_packages(self, fields=None):
+        """Get all work packages with their tasks sorted by priority
+        
+        fields: optional comma-separated list (e.g. "id,name,status") to return only those fields
+        """
         try:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            work_packages = list(self.db[self.COLLECTION_WORK_PACKAGES].find().sort('created_at', -1))
-            
-            # Sort tasks within each work package by priority
-            for wp in work_packages:
-                if 'tasks' in wp and wp['tasks']:
-                    wp['tasks'] = self._sort_tasks_by_priority(wp['tasks'])
-            
-            serialized = [self._serialize_doc(wp) for wp in work_packages]
-            
-            return jsonify({"success": True, "data": serialized}), 200
+            # Only ship the requested fields; _id is never read by the client unless asked for
+            requested = [field.strip() for field in (fields or '').split(',') if field.strip()]
+            projection = {field: 1 for field in requested}
+            if '_id' not in projection:
+                projection['_id'] = 0
+            
+            cursor = self.db[self.COLLECTION_WORK_PACKAGES].aggregate([
+                {'$sort': {'created_at': -1}},
+                {'$project': projection},
+                # Tasks sorted by priority server-side (1=Critical .. 5=Very Low; unset counts as P3 - Medium):
+                # sort on a temporary _sort_priority key, then drop it so tasks come back as stored
+                {'$addFields': {'tasks': {'$cond': [
+                    {'$isArray': '$tasks'},
+                    {'$sortArray': {
+                        'input': {'$map': {'input': '$tasks', 'in': {'$mergeObjects': [
+                            '$$this', {'_sort_priority': {'$ifNull': ['$$this.priority', 3]}}
+                        ]}}},
+                        'sortBy': {'_sort_priority': 1}
+                    }},
+                    '$tasks'
+                ]}}},
+                {'$unset': 'tasks._sort_priority'}
+            ], batchSize=LIST_BATCH_SIZE)
+            
+            return self._stream_list(cursor)
         except Exception as e:
             logging.error(f"Error getting work packages: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
     
+    def get_work_package_summaries(self):
+        """Get id/name/status plus task counts for every work package (no task trees)"""
+        try:
+            if self.db is None:
+                return jsonify({"success": False, "error": "Database not connected"}), 500
+            
+            # Counts computed server-side so only a few small fields per work package cross the wire
+            cursor = self.db[self.COLLECTION_WORK_PACKAGES].aggregate([
+                {'$sort': {'created_at': -1}},
+                {'$project': {
+                    '_id': 0,
+                    'id': 1,
+                    'name': 1,
+                    'status': 1,
+                    'task_count': {'$size': {'$ifNull': ['$tasks', []]}},
+                    'open_task_count': {'$size': {'$filter': {
+                        'input': {'$ifNull': ['$tasks', []]},
+                        'as': 't',
+                        'cond': {'$lt': ['$$t.progress', 100]}
+                    }}}
+                }}
+            ], batchSize=LIST_BATCH_SIZE)
+            
+            return self._stream_list(cursor)
+        except Exception as e:
+            logging.error(f"Error getting work package summaries: {e}")
+            return jsonify({"success": False, "error": str(e)}), 500
+    
     def get_work_package_by_id(self, wp_id):
         """Get a specific work package by ID"""
         try:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
+            body = self._cached_work_package(wp_id)
+            if body is not None:
+                return Response(body, mimetype='application/json'), 200
+            
+            version = self._wp_cache_version
+            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id}, {'_id': 0})
             
             if not work_package:
                 return jsonify({"success": False, "error": "Work package not found"}), 404
             
-            return jsonify({"success": True, "data": self._serialize_doc(work_package)}), 200
+            body = dumps({"success": True, "data": work_package})
+            self._cache_work_package(wp_id, body, version)
+            return Response(body, mimetype='application/json'), 200
         except Exception as e:
             logging.error(f"Error getting work package: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -111,15 +293,9 @@ class TrackProgressAPI:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
             # Generate unique ID
-            existing_packages = list(self.db[self.COLLECTION_WORK_PACKAGES].find())
-            next_number = len(existing_packages) + 1
-            wp_id = f"wp{next_number}"
-            
-            # Ensure unique ID
-            while self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id}):
-                next_number += 1
-                wp_id = f"wp{next_number}"
+            wp_id = self._next_work_package_id()
             
+            now_iso = datetime.now().isoformat()
             work_package = {
                 'id': wp_id,
                 'name': data.get('name'),
@@ -128,15 +304,15 @@ class TrackProgressAPI:
                 'partnership': data.get('partnership', ''),
                 'deadline': data.get('deadline', ''),
                 'tasks': [],
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
+                'created_at': now_iso,
+                'updated_at': now_iso
             }
             
-            result = self.db[self.COLLECTION_WORK_PACKAGES].insert_one(work_package)
-            work_package['_id'] = str(result.inserted_id)
+            # Insert a copy so the returned document stays as constructed (without the generated _id)
+            self.db[self.COLLECTION_WORK_PACKAGES].insert_one(dict(work_package))
             
             logging.info(f"✅ Created work package: {wp_id}")
-            return jsonify({"success": True, "data": self._serialize_doc(work_package)}), 201
+            return jsonify({"success": True, "data": work_package}), 201
         except Exception as e:
             logging.error(f"Error creating work package: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
@@ -162,6 +338,8 @@ class TrackProgressAPI:
                 {'$set': update_data}
             )
             
+            self._invalidate_work_package(wp_id)
+            
             if result.matched_count == 0:
                 return jsonify({"success": False, "error": "Work package not found"}), 404
             
@@ -179,6 +357,8 @@ class TrackProgressAPI:
             
             result = self.db[self.COLLECTION_WORK_PACKAGES].delete_one({'id': wp_id})
             
+            self._invalidate_work_package(wp_id)
+            
             if result.deleted_count == 0:
                 return jsonify({"success": False, "error": "Work package not found"}), 404
             
@@ -190,40 +370,46 @@ class TrackProgressAPI:
     
     # ==================== TASKS ====================
     
+    @staticmethod
+    def _new_task(task_data, now, seq=0):
+        """Task document for task_data; a missing id is generated from now (ms, + seq within one request)"""
+        return {
+            'id': task_data.get('id', f"t{int(now.timestamp() * 1000) + seq}"),
+            'title': task_data.get('title'),
+            'responsible': task_data.get('responsible', 'TBD'),
+            'accountable': task_data.get('accountable', 'TBD'),
+            'consulted': task_data.get('consulted', 'TBD'),
+            'informed': task_data.get('informed', 'TBD'),
+            'priority': task_data.get('priority', 3),  # Default to P3 - Medium
+            'progress': task_data.get('progress', 0),
+            'subtasks': task_data.get('subtasks', []),
+            'created_at': now.isoformat()
+        }
+    
     def add_task_to_package(self, wp_id, task_data):
         """Add a task to a work package"""
         try:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            # Get the work package
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
-            if not work_package:
-                return jsonify({"success": False, "error": "Work package not found"}), 404
+            # One clock read per request: the generated id and both timestamps share it
+            now = datetime.now()
+            now_iso = now.isoformat()
             
             # Create new task
-            task = {
-                'id': task_data.get('id', f"t{int(datetime.now().timestamp() * 1000)}"),
-                'title': task_data.get('title'),
-                'responsible': task_data.get('responsible', 'TBD'),
-                'accountable': task_data.get('accountable', 'TBD'),
-                'consulted': task_data.get('consulted', 'TBD'),
-                'informed': task_data.get('informed', 'TBD'),
-                'priority': task_data.get('priority', 3),  # Default to P3 - Medium
-                'progress': task_data.get('progress', 0),
-                'subtasks': task_data.get('subtasks', []),
-                'created_at': datetime.now().isoformat()
-            }
+            task = self._new_task(task_data, now)
             
             # Add task to work package
             result = self.db[self.COLLECTION_WORK_PACKAGES].update_one(
                 {'id': wp_id},
                 {
                     '$push': {'tasks': task},
-                    '$set': {'updated_at': datetime.now().isoformat()}
+                    '$set': {'updated_at': now_iso}
                 }
             )
             
+            self._invalidate_work_package(wp_id)
+            
             if result.matched_count == 0:
                 return jsonify({"success": False, "error": "Work package not found"}), 404
             
@@ -239,38 +425,20 @@ class TrackProgressAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            # Get the work package
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
-            if not work_package:
-                return jsonify({"success": False, "error": "Work package not found"}), 404
-            
-            # Find and update the task
-            tasks = work_package.get('tasks', [])
-            task_found = False
-            
-            for i, task in enumerate(tasks):
-                if task['id'] == task_id:
-                    # Update task fields
-                    for key, value in task_data.items():
-                        if key != 'id':  # Don't update ID
-                            tasks[i][key] = value
-                    task_found = True
-                    break
-            
-            if not task_found:
-                return jsonify({"success": False, "error": "Task not found"}), 404
+            # Update the task's fields in place (positional $ targets the matched task)
+            update_data = {f'tasks.$.{key}': value for key, value in task_data.items() if key != 'id'}
+            update_data['updated_at'] = datetime.now().isoformat()
             
-            # Update the work package with modified tasks
             result = self.db[self.COLLECTION_WORK_PACKAGES].update_one(
-                {'id': wp_id},
-                {
-                    '$set': {
-                        'tasks': tasks,
-                        'updated_at': datetime.now().isoformat()
-                    }
-                }
+                {'id': wp_id, 'tasks.id': task_id},
+                {'$set': update_data}
             )
             
+            self._invalidate_work_package(wp_id)
+            
+            if result.matched_count == 0:
+                return self._not_found(wp_id, "Task")
+            
             logging.info(f"✅ Updated task {task_id} in work package {wp_id}")
             return jsonify({"success": True, "message": "Task updated"}), 200
         except Exception as e:
@@ -291,6 +459,8 @@ class TrackProgressAPI:
                 }
             )
             
+            self._invalidate_work_package(wp_id)
+            
             if result.matched_count == 0:
                 return jsonify({"success": False, "error": "Work package not found"}), 404
             
@@ -300,6 +470,65 @@ class TrackProgressAPI:
             logging.error(f"Error deleting task: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
     
+    def bulk_task_ops(self, wp_id, ops):
+        """Apply several task adds/updates/deletes to one work package in a single bulk_write
+        
+        ops: [{'op': 'add', 'data': {...}} | {'op': 'update', 'task_id': ..., 'data': {...}} |
+              {'op': 'delete', 'task_id': ...}, ...], applied in order
+        """
+        try:
+            if self.db is None:
+                return jsonify({"success": False, "error": "Database not connected"}), 500
+            
+            if not isinstance(ops, list) or not ops:
+                return jsonify({"success": False, "error": "Expected a non-empty list of task operations"}), 400
+            
+            now = datetime.now()
+            now_iso = now.isoformat()
+            requests, added = [], []
+            
+            for seq, op in enumerate(ops):
+                kind = op.get('op') if isinstance(op, dict) else None
+                data = (op.get('data') or {}) if kind else {}
+                
+                if kind == 'add':
+                    task = self._new_task(data, now, seq)
+                    added.append(task)
+                    requests.append(UpdateOne(
+                        {'id': wp_id},
+                        {'$push': {'tasks': task}, '$set': {'updated_at': now_iso}}
+                    ))
+                elif kind == 'update' and op.get('task_id'):
+                    update_data = {f'tasks.$.{key}': value for key, value in data.items() if key != 'id'}
+                    update_data['updated_at'] = now_iso
+                    requests.append(UpdateOne({'id': wp_id, 'tasks.id': op['task_id']}, {'$set': update_data}))
+                elif kind == 'delete' and op.get('task_id'):
+                    requests.append(UpdateOne(
+                        {'id': wp_id},
+                        {'$pull': {'tasks': {'id': op['task_id']}}, '$set': {'updated_at': now_iso}}
+                    ))
+                else:
+                    return jsonify({"success": False, "error": f"Invalid task operation at index {seq}"}), 400
+            
+            # Ordered: every op targets the same document, so keep the client's sequence (add, then update)
+            result = self.db[self.COLLECTION_WORK_PACKAGES].bulk_write(requests, ordered=True)
+            
+            self._invalidate_work_package(wp_id)
+            
+            if result.matched_count == 0:
+                return self._not_found(wp_id, "Task")
+            
+            logging.info(f"✅ Applied {len(requests)} task operations to work package {wp_id}")
+            return jsonify({
+                "success": True,
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "data": added
+            }), 200
+        except Exception as e:
+            logging.error(f"Error applying task operations: {e}")
+            return jsonify({"success": False, "error": str(e)}), 500
+    
     # ==================== SUBTASKS ====================
     
     def add_subtask_to_task(self, wp_id, task_id, subtask_data):
@@ -308,50 +537,37 @@ class TrackProgressAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            # Get the work package
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
-            if not work_package:
-                return jsonify({"success": False, "error": "Work package not found"}), 404
+            # One clock read per request: the generated id and both timestamps share it
+            now = datetime.now()
+            now_iso = now.isoformat()
+            
+            subtask = {
+                'id': subtask_data.get('id', f"st{int(now.timestamp() * 1000)}"),
+                'title': subtask_data.get('title'),
+                'completed': subtask_data.get('completed', False),
+                'progress': subtask_data.get('progress', 0),
+                'responsible': subtask_data.get('responsible', ''),
+                'accountable': subtask_data.get('accountable', ''),
+                'consulted': subtask_data.get('consulted', ''),
+                'informed': subtask_data.get('informed', ''),
+                'deadline': subtask_data.get('deadline', ''),
+                'created_at': now_iso
+            }
             
-            # Find the task and add subtask
-            tasks = work_package.get('tasks', [])
-            task_found = False
-            
-            for i, task in enumerate(tasks):
-                if task['id'] == task_id:
-                    subtask = {
-                        'id': subtask_data.get('id', f"st{int(datetime.now().timestamp() * 1000)}"),
-                        'title': subtask_data.get('title'),
-                        'completed': subtask_data.get('completed', False),
-                        'progress': subtask_data.get('progress', 0),
-                        'responsible': subtask_data.get('responsible', ''),
-                        'accountable': subtask_data.get('accountable', ''),
-                        'consulted': subtask_data.get('consulted', ''),
-                        'informed': subtask_data.get('informed', ''),
-                        'deadline': subtask_data.get('deadline', ''),
-                        'created_at': datetime.now().isoformat()
-                    }
-                    
-                    if 'subtasks' not in tasks[i]:
-                        tasks[i]['subtasks'] = []
-                    tasks[i]['subtasks'].append(subtask)
-                    task_found = True
-                    break
-            
-            if not task_found:
-                return jsonify({"success": False, "error": "Task not found"}), 404
-            
-            # Update the work package
+            # Append to the matched task's subtasks (created if missing)
             result = self.db[self.COLLECTION_WORK_PACKAGES].update_one(
-                {'id': wp_id},
+                {'id': wp_id, 'tasks.id': task_id},
                 {
-                    '$set': {
-                        'tasks': tasks,
-                        'updated_at': datetime.now().isoformat()
-                    }
+                    '$push': {'tasks.$.subtasks': subtask},
+                    '$set': {'updated_at': now_iso}
                 }
             )
             
+            self._invalidate_work_package(wp_id)
+            
+            if result.matched_count == 0:
+                return self._not_found(wp_id, "Task")
+            
             logging.info(f"✅ Added subtask to task {task_id} in work package {wp_id}")
             return jsonify({"success": True, "data": subtask}), 201
         except Exception as e:
@@ -364,43 +580,21 @@ class TrackProgressAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            # Get the work package
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
-            if not work_package:
-                return jsonify({"success": False, "error": "Work package not found"}), 404
+            # Update the subtask's fields in place (arrayFilters pick the task and subtask)
+            update_data = {f'tasks.$[t].subtasks.$[s].{key}': value for key, value in subtask_data.items() if key != 'id'}
+            update_data['updated_at'] = datetime.now().isoformat()
             
-            # Find and update the subtask
-            tasks = work_package.get('tasks', [])
-            subtask_found = False
-            
-            for i, task in enumerate(tasks):
-                if task['id'] == task_id:
-                    subtasks = task.get('subtasks', [])
-                    for j, subtask in enumerate(subtasks):
-                        if subtask['id'] == subtask_id:
-                            # Update subtask fields
-                            for key, value in subtask_data.items():
-                                if key != 'id':  # Don't update ID
-                                    tasks[i]['subtasks'][j][key] = value
-                            subtask_found = True
-                            break
-                    if subtask_found:
-                        break
-            
-            if not subtask_found:
-                return jsonify({"success": False, "error": "Subtask not found"}), 404
-            
-            # Update the work package
             result = self.db[self.COLLECTION_WORK_PACKAGES].update_one(
-                {'id': wp_id},
-                {
-                    '$set': {
-                        'tasks': tasks,
-                        'updated_at': datetime.now().isoformat()
-                    }
-                }
+                {'id': wp_id, 'tasks': {'$elemMatch': {'id': task_id, 'subtasks.id': subtask_id}}},
+                {'$set': update_data},
+                array_filters=[{'t.id': task_id}, {'s.id': subtask_id}]
             )
             
+            self._invalidate_work_package(wp_id)
+            
+            if result.matched_count == 0:
+                return self._not_found(wp_id, "Subtask")
+            
             logging.info(f"✅ Updated subtask {subtask_id} in task {task_id}")
             return jsonify({"success": True, "message": "Subtask updated"}), 200
         except Exception as e:
@@ -413,36 +607,20 @@ class TrackProgressAPI:
             if self.db is None:
                 return jsonify({"success": False, "error": "Database not connected"}), 500
             
-            # Get the work package
-            work_package = self.db[self.COLLECTION_WORK_PACKAGES].find_one({'id': wp_id})
-            if not work_package:
-                return jsonify({"success": False, "error": "Work package not found"}), 404
-            
-            # Find and remove the subtask
-            tasks = work_package.get('tasks', [])
-            subtask_found = False
-            
-            for i, task in enumerate(tasks):
-                if task['id'] == task_id:
-                    subtasks = task.get('subtasks', [])
-                    tasks[i]['subtasks'] = [st for st in subtasks if st['id'] != subtask_id]
-                    subtask_found = True
-                    break
-            
-            if not subtask_found:
-                return jsonify({"success": False, "error": "Task not found"}), 404
-            
-            # Update the work package
+            # Pull the subtask from the matched task
             result = self.db[self.COLLECTION_WORK_PACKAGES].update_one(
-                {'id': wp_id},
+                {'id': wp_id, 'tasks.id': task_id},
                 {
-                    '$set': {
-                        'tasks': tasks,
-                        'updated_at': datetime.now().isoformat()
-                    }
+                    '$pull': {'tasks.$.subtasks': {'id': subtask_id}},
+                    '$set': {'updated_at': datetime.now().isoformat()}
                 }
             )
             
+            self._invalidate_work_package(wp_id)
+            
+            if result.matched_count == 0:
+                return self._not_found(wp_id, "Task")
+            
             logging.info(f"✅ Deleted subtask {subtask_id} from task {task_id}")
             return jsonify({"success": True, "message": "Subtask deleted"}), 200
         except Exception as e:
@@ -458,8 +636,14 @@ track_progress_api = TrackProgressAPI()
 
 @track_progress_bp.route('/work-packages', methods=['GET'])
 def get_work_packages():
-    """GET all work packages"""
-    return track_progress_api.get_all_work_packages()
+    """GET all work packages (?fields=id,name,... for a projected list)"""
+    return track_progress_api.get_all_work_packages(request.args.get('fields'))
+
+
+@track_progress_bp.route('/work-packages/summary', methods=['GET'])
+def get_work_package_summaries():
+    """GET id/name/status and task counts for all work packages"""
+    return track_progress_api.get_work_package_summaries()
 
 
 @track_progress_bp.route('/work-packages/<wp_id>', methods=['GET'])
@@ -492,6 +676,12 @@ def add_task(wp_id):
     return track_progress_api.add_task_to_package(wp_id, request.get_json())
 
 
+@track_progress_bp.route('/work-packages/<wp_id>/tasks/bulk', methods=['POST'])
+def bulk_tasks(wp_id):
+    """POST several task add/update/delete operations in one request"""
+    return track_progress_api.bulk_task_ops(wp_id, request.get_json())
+
+
 @track_progress_bp.route('/work-packages/<wp_id>/tasks/<task_id>', methods=['PUT'])
 def update_task(wp_id, task_id):
     """PUT update a task"""
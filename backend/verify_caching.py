@@ -4,8 +4,32 @@ Verifies that all caching components are properly configured
 """
 import sys
 import os
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime
 
+# Upper bound for the Azure blob probe so a hung endpoint can't stall the verification run
+AZURE_PROBE_TIMEOUT = 10
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout/stderr stand-in that sends each check thread's output to that thread's buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def capture(self, buffer):
+        self._local.buffer = buffer
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+
 def print_header(title):
     print(f"\n{'='*80}")
     print(f"  {title}")
@@ -37,8 +61,8 @@ def check_mongodb_connection():
         # Check cache collection
         db = client[db_name]
         cache_collection = db['graph_cache']
-        count = cache_collection.count_documents({})
-        print(f"✅ Cache collection exists with {count} documents")
+        count = cache_collection.estimated_document_count()  # collection metadata, no scan
+        print(f"✅ Cache collection exists with ~{count} documents")
         
         return True
         
@@ -144,16 +168,25 @@ def check_azure_connection():
         print(f"   Blob: {blob_name}")
         
         from azure.storage.blob import BlobServiceClient
-        blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+        blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string, connection_timeout=3, read_timeout=5, retry_total=0
+        )
         blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
         
-        # Check if blob exists
-        properties = blob_client.get_blob_properties()
+        # Check if blob exists (time-bounded on top of the socket timeouts)
+        probe = ThreadPoolExecutor(max_workers=1)
+        try:
+            properties = probe.submit(blob_client.get_blob_properties).result(timeout=AZURE_PROBE_TIMEOUT)
+        finally:
+            probe.shutdown(wait=False)
         size_mb = properties.size / (1024 * 1024)
         print(f"✅ Azure blob accessible (Size: {size_mb:.2f} MB)")
         
         return True
         
+    except FutureTimeout:
+        print(f"❌ Azure connection check failed: no response within {AZURE_PROBE_TIMEOUT}s")
+        return False
     except Exception as e:
         print(f"❌ Azure connection check failed: {e}")
         return False
@@ -196,14 +229,47 @@ def main():
     print("  Checking all caching components...")
     print("="*80)
     
-    results = {
-        "MongoDB Connection": check_mongodb_connection(),
-        "Cache Manager": check_cache_manager(),
-        "Scheduler": check_scheduler(),
-        "Data Processor": check_data_processor(),
-        "Azure Blob Storage": check_azure_connection(),
-        "API Endpoints": check_api_endpoints()
-    }
+    checks = [
+        ("MongoDB Connection", check_mongodb_connection),
+        ("Cache Manager", check_cache_manager),
+        ("Scheduler", check_scheduler),
+        ("Data Processor", check_data_processor),
+        ("Azure Blob Storage", check_azure_connection),
+        ("API Endpoints", check_api_endpoints)
+    ]
+    
+    # The MongoDB and Azure checks only wait on the network, so each gets its own worker; the checks
+    # that import the app's own modules share one sequential worker so those imports never race
+    network_only = {"MongoDB Connection", "Azure Blob Storage"}
+    groups = [[check] for check in checks if check[0] in network_only]
+    groups.append([check for check in checks if check[0] not in network_only])
+    
+    # Each check's output is buffered and printed in the usual order once all are done
+    stdout, stderr = _ThreadOutput(sys.stdout), _ThreadOutput(sys.stderr)
+    
+    def run_group(group):
+        outcomes = {}
+        for name, check in group:
+            buffer = io.StringIO()
+            stdout.capture(buffer)
+            stderr.capture(buffer)
+            outcomes[name] = (check(), buffer.getvalue())
+        return outcomes
+    
+    outcomes = {}
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            for group_outcomes in executor.map(run_group, groups):
+                outcomes.update(group_outcomes)
+    finally:
+        sys.stdout, sys.stderr = stdout._stream, stderr._stream
+    
+    results = {}
+    for name, _ in checks:
+        passed, output = outcomes[name]
+        print(output, end='')
+        results[name] = passed
     
     # Summary
     print_header("VERIFICATION SUMMARY")
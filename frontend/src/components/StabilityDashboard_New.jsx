@@ -966,10 +966,10 @@ const StabilityDashboard = () => {
   const [deviceModal, setDeviceModal] = useState({ open: false, device: null });
   const [removeAllDialog, setRemoveAllDialog] = useState({ open: false, testType: null, temperature: null });
 
-  // Load grid data
-  const loadGridData = async () => {
+  // Load grid data (silent: refresh in place without the loading state)
+  const loadGridData = async ({ silent = false } = {}) => {
     try {
-      setLoading(true);
+      if (!silent) setLoading(true);
       setError(null);
       console.log("📊 Fetching grid data...");
       const data = await stabilitySamplesAPI.getGridData();
@@ -998,10 +998,31 @@ const StabilityDashboard = () => {
       console.error("❌ Error loading grid data:", err);
       setError(err.message || "Failed to load grid data");
     } finally {
-      setLoading(false);
+      if (!silent) setLoading(false);
     }
   };
 
+  // Reload the grid when samples change elsewhere (another user/tab); the version check is a tiny request
+  useEffect(() => {
+    let lastVersion = null;
+    const checkForChanges = async () => {
+      try {
+        const version = await stabilitySamplesAPI.getChanges();
+        if (lastVersion !== null && version !== lastVersion) {
+          await loadGridData({ silent: true });
+        }
+        lastVersion = version;
+      } catch (err) {
+        // Keep the current grid; try again on the next tick
+      }
+    };
+    
+    checkForChanges();
+    const interval = setInterval(checkForChanges, 15000);
+    
+    return () => clearInterval(interval);
+  }, []);
+
   useEffect(() => {
     loadGridData();
     
@@ -14,6 +14,8 @@ const StabilityHistory = () => {
   
   const [history, setHistory] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedSamples, setSelectedSamples] = useState([]);
 
   useEffect(() => {
@@ -23,8 +25,9 @@ const StabilityHistory = () => {
   const loadHistory = async () => {
     try {
       setLoading(true);
-      const data = await stabilitySamplesAPI.getHistory(testType, temperature);
-      setHistory(data);
+      const page = await stabilitySamplesAPI.getHistory(testType, temperature);
+      setHistory(page.samples);
+      setNextCursor(page.nextCursor);
     } catch (err) {
       console.error("Error loading history:", err);
       alert(`Failed to load history: ${err.message}`);
@@ -33,6 +36,20 @@ const StabilityHistory = () => {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await stabilitySamplesAPI.getHistory(testType, temperature, nextCursor);
+      setHistory(prev => [...prev, ...page.samples]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Error loading more history:", err);
+      alert(`Failed to load more history: ${err.message}`);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const toggleSampleSelection = (deviceId) => {
     setSelectedSamples(prev => 
       prev.includes(deviceId)
@@ -83,7 +100,7 @@ const StabilityHistory = () => {
             <div>
               <h1 className="text-3xl font-bold">Stability History Analysis</h1>
               <p className="text-muted-foreground mt-1">
-                {testType} - {temperature || "Standard"} | {history.length} samples
+                {testType} - {temperature || "Standard"} | {history.length}{nextCursor ? "+" : ""} samples
               </p>
             </div>
             
@@ -179,6 +196,13 @@ const StabilityHistory = () => {
                     </tbody>
                   </table>
                 </div>
+                {nextCursor && (
+                  <div className="flex justify-center mt-4">
+                    <Button onClick={loadMore} variant="outline" disabled={loadingMore}>
+                      {loadingMore ? "Loading..." : "Load More"}
+                    </Button>
+                  </div>
+                )}
               </CardContent>
             </Card>
 
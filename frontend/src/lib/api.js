@@ -795,6 +795,23 @@ export const stabilitySamplesAPI = {
     }
   },
 
+  // Get the samples change version (changes whenever samples are added, updated or removed)
+  getChanges: async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/stability/samples/changes`);
+      const result = await response.json();
+      
+      if (!result.success) {
+        throw new Error(result.error || 'Failed to fetch samples change version');
+      }
+      
+      return result.version;
+    } catch (error) {
+      console.error('Error fetching samples change version:', error);
+      throw error;
+    }
+  },
+
   // Batch add multiple samples at once
   batchAddSamples: async (samples) => {
     try {
@@ -841,12 +858,14 @@ export const stabilitySamplesAPI = {
     }
   },
 
-  // Get history for a specific temperature (all completed samples)
-  getHistory: async (testType, temperature) => {
+  // Get one page of history for a specific temperature (completed samples, newest first)
+  // Pass the returned nextCursor as `before` to fetch the next page; it is null on the last page
+  getHistory: async (testType, temperature, before = null) => {
     try {
       const params = new URLSearchParams();
       params.append('testType', testType);
       if (temperature) params.append('temperature', temperature);
+      if (before) params.append('before', before);
       
       const response = await fetch(`${API_BASE_URL}/stability/samples/history?${params.toString()}`);
       const result = await response.json();
@@ -855,7 +874,7 @@ export const stabilitySamplesAPI = {
         throw new Error(result.error || 'Failed to fetch history');
       }
       
-      return result.samples || [];
+      return { samples: result.samples || [], nextCursor: result.next_cursor || null };
     } catch (error) {
       console.error('Error fetching sample history:', error);
       throw error;
@@ -1119,6 +1138,13 @@ export const trackProgressAPI = {
     return result.data || result;
   },
 
+  // id/name/status plus task_count/open_task_count per work package (no task trees)
+  getWorkPackageSummaries: async () => {
+    const response = await fetch(`${API_BASE_URL}/track-progress/work-packages/summary`);
+    const result = await handleResponse(response);
+    return result.data || result;
+  },
+
   getWorkPackage: async (wpId) => {
     const response = await fetch(`${API_BASE_URL}/track-progress/work-packages/${wpId}`);
     const result = await handleResponse(response);